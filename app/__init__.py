@@ -15,8 +15,9 @@ def init_package():
     print(f"Initializing {__description__} v{__version__}")
     ensure_directories()
 
-# Jalankan inisialisasi dasar
-init_package()
+# init_package() TIDAK dijalankan saat import: `import app` harus bebas efek
+# samping (tanpa print / membuat folder di CWD). Entry point (GUI, daemon)
+# memanggil ensure_directories() sendiri.
 
 # Ekspor modul (LAZY IMPORT untuk menghindari import-recursion)
 __all__ = [
@@ -0,0 +1,532 @@
+"""
+app/alerts.py
+Subsistem peringatan non-blocking dengan level bertingkat.
+
+AlertEngine.update() dipanggil setiap frame dari thread inferensi dan hanya
+membandingkan beberapa angka; peringatan yang perlu dikirim dimasukkan ke
+antrian terbatas milik setiap sink dan dikirim oleh thread worker sink itu
+sendiri, sehingga capture / render tidak pernah menunggu suara, jaringan,
+atau disk, dan banner / nada tidak menunggu webhook yang lambat.
+
+Level:
+ - BANNER : kantuk terdeteksi -> banner visual
+ - TONE   : masih mengantuk setelah tone_after detik -> nada peringatan
+ - ALARM  : masih mengantuk setelah alarm_after detik -> alarm berulang
+ - CLEAR  : kondisi normal kembali (banner disembunyikan)
+
+Sink bawaan: SoundSink (nada dibangkitkan di proses), WebhookSink (HTTP atau
+UNIX socket lokal), LogSink (file), CallbackSink (mis. GUI). Penerima
+webhook sederhana untuk uji: python -m app.alerts serve
+"""
+
+import argparse
+import io
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import wave
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from app.pipeline import StageStats
+
+LEVEL_CLEAR = 0
+LEVEL_BANNER = 1
+LEVEL_TONE = 2
+LEVEL_ALARM = 3
+LEVEL_NAMES = {LEVEL_CLEAR: "clear", LEVEL_BANNER: "banner", LEVEL_TONE: "tone", LEVEL_ALARM: "alarm"}
+
+
+class Alert:
+    """Satu peringatan yang dikirim ke sink"""
+
+    __slots__ = ("level", "reason", "detected_at", "created_at", "wall_time", "latency")
+
+    def __init__(self, level, reason, detected_at):
+        self.level = level
+        self.reason = reason
+        self.detected_at = detected_at          # time.perf_counter() saat frame ditangkap/dideteksi
+        self.created_at = time.perf_counter()
+        self.wall_time = time.time()
+        self.latency = None                     # detik, diisi saat sink pertama selesai
+
+    @property
+    def level_name(self):
+        return LEVEL_NAMES.get(self.level, str(self.level))
+
+    def as_dict(self):
+        return {
+            "level": self.level_name,
+            "reason": self.reason,
+            "time": datetime.fromtimestamp(self.wall_time).isoformat(timespec="milliseconds"),
+        }
+
+
+class AlertEngine:
+    """
+    Args:
+        sinks (list): Objek dengan handle(alert)
+        tone_after (float): Lama mengantuk (detik) sebelum naik ke TONE
+        alarm_after (float): Lama mengantuk (detik) sebelum naik ke ALARM
+        repeat_interval (float): Interval pengulangan ALARM (detik)
+        clear_after (float): Kondisi normal selama ini (detik) mengakhiri episode
+        max_queue (int): Batas antrian per sink (peringatan berlebih dibuang)
+    """
+
+    def __init__(self, sinks=None, tone_after=2.0, alarm_after=5.0, repeat_interval=2.0,
+                 clear_after=2.0, max_queue=16):
+        self.sinks = list(sinks or [])
+        self.tone_after = tone_after
+        self.alarm_after = alarm_after
+        self.repeat_interval = repeat_interval
+        self.clear_after = clear_after
+
+        self.max_queue = max_queue
+        self._workers = []
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._running = False
+
+        self.level = LEVEL_CLEAR
+        self._episode_start = None
+        self._last_drowsy = None
+        self._last_sent = 0.0
+
+        # Latensi deteksi -> sink pertama selesai (peringatan pertama kali tampil)
+        self.latency_stats = StageStats()
+        self.max_latency = 0.0
+        self.sent = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._workers = []
+        for sink in self.sinks:
+            worker = _SinkWorker(sink, self)
+            if any(w.name == worker.name for w in self._workers):
+                # Dua sink sejenis (mis. dua webhook): nama stats dibedakan
+                worker.name += f"-{len(self._workers)}"
+            self._workers.append(worker)
+            worker.start()
+        return self
+
+    def close(self, timeout=2.0):
+        """Hentikan worker; peringatan yang masih antre tetap dikirim"""
+        if not self._running:
+            return
+        self._running = False
+        for worker in self._workers:
+            worker.stop()
+        deadline = time.perf_counter() + timeout
+        for worker in self._workers:
+            if not worker.join(max(0.0, deadline - time.perf_counter())):
+                # Worker masih di dalam handle(): jangan tutup sink di bawahnya
+                print(f"Alert sink {worker.name} belum selesai, tidak ditutup")
+                continue
+            close = getattr(worker.sink, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print("Alert sink close error:", e)
+
+    # ------------------------------------------------------------------
+    # Deteksi -> level (dipanggil di thread inferensi, O(1))
+    # ------------------------------------------------------------------
+    def update(self, drowsy, reason=None, detected_at=None):
+        """
+        Args:
+            drowsy (bool): Hasil analisis kantuk frame ini
+            reason (str): Alasan (mis. "mata tertutup 0.8 detik")
+            detected_at (float): time.perf_counter() frame terkait
+                (default: sekarang) untuk mengukur latensi deteksi -> alert
+
+        Returns:
+            int: Level peringatan saat ini
+        """
+        now = time.perf_counter()
+        detected_at = detected_at if detected_at is not None else now
+
+        with self._lock:
+            if drowsy:
+                self._last_drowsy = now
+                if self._episode_start is None:
+                    self._episode_start = now
+                elapsed = now - self._episode_start
+                if elapsed >= self.alarm_after:
+                    level = LEVEL_ALARM
+                elif elapsed >= self.tone_after:
+                    level = LEVEL_TONE
+                else:
+                    level = LEVEL_BANNER
+
+                repeat = level == LEVEL_ALARM and now - self._last_sent >= self.repeat_interval
+                if level > self.level or repeat:
+                    self.level = level
+                    self._last_sent = now
+                    self._enqueue(Alert(level, reason, detected_at))
+            elif self._episode_start is not None and now - self._last_drowsy >= self.clear_after:
+                self._episode_start = None
+                self.level = LEVEL_CLEAR
+                self._enqueue(Alert(LEVEL_CLEAR, None, detected_at))
+            return self.level
+
+    def reset(self):
+        """Akhiri episode (mis. kamera dimatikan); banner dibersihkan lewat CLEAR"""
+        with self._lock:
+            was_active = self.level != LEVEL_CLEAR
+            self._episode_start = None
+            self.level = LEVEL_CLEAR
+        if was_active:
+            self._enqueue(Alert(LEVEL_CLEAR, None, time.perf_counter()))
+
+    def trigger(self, level, reason=None):
+        """Kirim peringatan manual (mis. tes suara)"""
+        self._enqueue(Alert(level, reason, time.perf_counter()))
+
+    def _enqueue(self, alert):
+        for worker in self._workers:
+            worker.put(alert)
+
+    def _delivered(self, alert, latency):
+        """Dipanggil worker sink setelah handle(); yang pertama menentukan latensi alert"""
+        with self._stats_lock:
+            if alert.latency is not None:
+                return
+            alert.latency = latency
+            self.latency_stats.add(latency)
+            self.max_latency = max(self.max_latency, latency)
+            self.sent += 1
+
+    @property
+    def dropped(self):
+        return sum(worker.dropped for worker in self._workers)
+
+    @property
+    def sink_errors(self):
+        return sum(worker.errors for worker in self._workers)
+
+    def stats(self):
+        return {
+            "level": LEVEL_NAMES[self.level],
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "sink_errors": self.sink_errors,
+            "queue": sum(worker.queue.qsize() for worker in self._workers),
+            "latency_ms": self.latency_stats.mean_ms,
+            "max_latency_ms": self.max_latency * 1000.0,
+            "sinks": {worker.name: worker.stats() for worker in self._workers},
+        }
+
+
+class _SinkWorker:
+    """
+    Antrian & thread dispatch milik satu sink: sink yang lambat (webhook
+    bertimeout, disk) hanya menunda dirinya sendiri. Latensi dicatat per sink.
+    """
+
+    def __init__(self, sink, engine):
+        self.sink = sink
+        self.engine = engine
+        self.name = type(sink).__name__
+        self.queue = queue.Queue(maxsize=engine.max_queue)
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.latency_stats = StageStats()
+        self.max_latency = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name=f"alert-{self.name}", daemon=True)
+        self._thread.start()
+
+    def put(self, alert):
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """
+        Minta worker berhenti setelah antrian kosong: peringatan yang masih
+        antre tetap dikirim. Memakai Event (bukan sentinel di antrian) agar
+        permintaan berhenti tidak hilang saat antrian penuh.
+        """
+        self._stop.set()
+
+    def join(self, timeout):
+        """Returns: True jika thread sudah selesai"""
+        if self._thread is None:
+            return True
+        self._thread.join(timeout=timeout)
+        return not self._thread.is_alive()
+
+    def _loop(self):
+        while True:
+            try:
+                alert = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    break
+                continue
+            try:
+                self.sink.handle(alert)
+            except Exception as e:
+                self.errors += 1
+                print(f"Alert sink {self.name} error:", e)
+                continue
+            latency = time.perf_counter() - alert.detected_at
+            self.latency_stats.add(latency)
+            self.max_latency = max(self.max_latency, latency)
+            self.sent += 1
+            self.engine._delivered(alert, latency)
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queue": self.queue.qsize(),
+            "latency_ms": self.latency_stats.mean_ms,
+            "max_latency_ms": self.max_latency * 1000.0,
+        }
+
+
+# ----------------------------------------------------------------------
+# Sinks
+# ----------------------------------------------------------------------
+def make_tone(freqs, duration=0.4, sample_rate=22050, volume=0.6, gap=0.08):
+    """WAV mono 16-bit (bytes) berisi nada berurutan; dibangkitkan tanpa file aset"""
+    n = int(sample_rate * duration)
+    t = np.arange(n) / sample_rate
+    # Fade in/out 10 ms agar tidak ada bunyi klik
+    env = np.minimum(1.0, np.minimum(np.arange(n), n - np.arange(n)) / (sample_rate * 0.01))
+    silence = np.zeros(int(sample_rate * gap))
+    parts = []
+    for freq in freqs:
+        parts += [volume * env * np.sin(2 * np.pi * freq * t), silence]
+    samples = (np.concatenate(parts) * 32767).astype("<i2")
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+class SoundSink:
+    """
+    Nada peringatan yang dibangkitkan di proses: winsound (Windows),
+    aplay/paplay (Linux), afplay (macOS), atau bel terminal sebagai cadangan.
+    Pemutaran asinkron sehingga worker tidak tertahan selama suara berbunyi.
+    """
+
+    TONES = {
+        LEVEL_TONE: (880,),
+        LEVEL_ALARM: (880, 1320, 880, 1320),
+    }
+
+    def __init__(self, player=None):
+        self._dir = tempfile.mkdtemp(prefix="ear_alert_")
+        self._files = {}
+        for level, freqs in self.TONES.items():
+            path = os.path.join(self._dir, f"{LEVEL_NAMES[level]}.wav")
+            with open(path, "wb") as f:
+                f.write(make_tone(freqs, duration=0.35 if level == LEVEL_ALARM else 0.4))
+            self._files[level] = path
+        self.player = player or self._find_player()
+        self._proc = None
+
+    @staticmethod
+    def _find_player():
+        if sys.platform.startswith("win"):
+            return "winsound"
+        for cmd in ("aplay", "paplay", "afplay"):
+            if shutil.which(cmd):
+                return cmd
+        return "bell"
+
+    def handle(self, alert):
+        path = self._files.get(alert.level)
+        if path is None:
+            return
+        if self.player == "winsound":
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+        elif self.player == "bell":
+            sys.stdout.write("\a")
+            sys.stdout.flush()
+        else:
+            # Suara sebelumnya yang masih berbunyi dihentikan
+            if self._proc is not None and self._proc.poll() is None:
+                self._proc.terminate()
+            args = [self.player, "-q", path] if self.player == "aplay" else [self.player, path]
+            self._proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def close(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+class WebhookSink:
+    """
+    POST JSON peringatan ke endpoint lokal.
+
+    Args:
+        url (str): "http://127.0.0.1:8765/alert" atau "unix:///run/ear/alert.sock"
+        timeout (float): Batas waktu koneksi (detik)
+        min_level (int): Level minimum yang dikirim (CLEAR selalu dikirim)
+    """
+
+    def __init__(self, url, timeout=1.0, min_level=LEVEL_BANNER):
+        self.url = url
+        self.timeout = timeout
+        self.min_level = min_level
+
+    def handle(self, alert):
+        if alert.level != LEVEL_CLEAR and alert.level < self.min_level:
+            return
+        body = json.dumps(alert.as_dict()).encode("utf-8")
+        if self.url.startswith("unix://"):
+            self._post_unix(self.url[len("unix://"):], body)
+        else:
+            req = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+
+    def _post_unix(self, path, body):
+        request = (b"POST /alert HTTP/1.0\r\nHost: localhost\r\n"
+                   b"Content-Type: application/json\r\n"
+                   b"Content-Length: %d\r\n\r\n" % len(body)) + body
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(path)
+            sock.sendall(request)
+            sock.recv(1024)
+
+
+class LogSink:
+    """Tulis setiap peringatan sebagai satu baris ke file (dan opsional ke stdout)"""
+
+    def __init__(self, path=os.path.join("data", "alerts.log"), echo=True):
+        self.path = path
+        self.echo = echo
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def handle(self, alert):
+        line = (f"{datetime.fromtimestamp(alert.wall_time).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} "
+                f"{alert.level_name.upper():6s} {alert.reason or '-'} "
+                f"(deteksi -> dispatch {(time.perf_counter() - alert.detected_at) * 1000:.1f} ms)")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        if self.echo:
+            print("ALERT", line)
+
+
+class CallbackSink:
+    """Teruskan peringatan ke callable, mis. mailbox GUI (harus cepat & thread-safe)"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def handle(self, alert):
+        self.callback(alert)
+
+
+def sinks_from_env(environ=None):
+    """
+    Sink default dari variabel lingkungan:
+        EAR_ALERT_SOUND    1 (default) | 0
+        EAR_ALERT_LOG      path log peringatan ('' = nonaktif), default data/alerts.log
+        EAR_ALERT_WEBHOOK  http://127.0.0.1:8765/alert | unix:///path/alert.sock
+    """
+    env = os.environ if environ is None else environ
+    sinks = []
+    if env.get("EAR_ALERT_SOUND", "1") == "1":
+        sinks.append(SoundSink())
+    log_path = env.get("EAR_ALERT_LOG", os.path.join("data", "alerts.log"))
+    if log_path:
+        sinks.append(LogSink(log_path))
+    if env.get("EAR_ALERT_WEBHOOK"):
+        sinks.append(WebhookSink(env["EAR_ALERT_WEBHOOK"]))
+    return sinks
+
+
+# ----------------------------------------------------------------------
+# Penerima webhook stub (untuk uji lokal)
+# ----------------------------------------------------------------------
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = self.rfile.read(length)
+        print("Webhook:", payload.decode("utf-8", "replace"))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_stub(host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    print(f"Penerima webhook stub di http://{host}:{port}/alert (Ctrl+C untuk berhenti)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Utilitas peringatan kantuk")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Jalankan penerima webhook stub")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+
+    p_test = sub.add_parser("test", help="Bunyikan semua level peringatan lewat sink default")
+    p_test.add_argument("--webhook", help="URL webhook tambahan")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve_stub(args.host, args.port)
+        return
+
+    sinks = sinks_from_env()
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    engine = AlertEngine(sinks).start()
+    for level in (LEVEL_BANNER, LEVEL_TONE, LEVEL_ALARM, LEVEL_CLEAR):
+        engine.trigger(level, "tes peringatan")
+        time.sleep(1.5)
+    engine.close()
+    print(engine.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+app/calibration.py
+Kalibrasi threshold EAR per pengemudi.
+
+Selama N detik pertama sesi, EAR mata terbuka dikumpulkan dengan statistik
+streaming bermemori O(1): rata-rata/varian (Welford) dan kuantil (algoritma
+P²). Dari situ diturunkan threshold pribadi yang disimpan sebagai profil JSON
+per pengemudi di data/profiles/.
+"""
+
+import json
+import math
+import os
+import re
+import time
+from datetime import datetime
+
+PROFILE_DIR = os.path.join("data", "profiles")
+
+
+class RunningStats:
+    """Rata-rata & varian streaming (algoritma Welford)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """
+    Estimasi kuantil streaming tanpa menyimpan sampel (Jain & Chlamtac, P²).
+    Memakai 5 marker sehingga memori tetap konstan.
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self._q = []                         # tinggi marker
+        self._n = [0, 1, 2, 3, 4]            # posisi marker
+        self._np = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._dn = [0, p / 2, p, (1 + p) / 2, 1]
+
+    @property
+    def count(self):
+        return len(self._q) if len(self._q) < 5 else self._n[4] + 1
+
+    def add(self, x):
+        q, n = self._q, self._n
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._np[i] += self._dn[i]
+
+        for i in range(1, 4):
+            d = self._np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = self._parabolic(i, d)
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self._q, self._n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    @property
+    def value(self):
+        q = self._q
+        if not q:
+            return None
+        if len(q) < 5:
+            return sorted(q)[min(len(q) - 1, int(round(self.p * (len(q) - 1))))]
+        return q[2]
+
+
+class Calibrator:
+    """
+    Mengumpulkan statistik EAR selama `duration` detik lalu menurunkan threshold.
+
+    threshold = median EAR mata terbuka * ratio, dibatasi [min_threshold,
+    max_threshold]. Median dipakai (bukan rata-rata) agar kedipan selama
+    kalibrasi tidak menggeser baseline.
+    """
+
+    def __init__(self, duration=30.0, ratio=0.75, min_samples=50,
+                 min_threshold=0.12, max_threshold=0.32):
+        self.duration = duration
+        self.ratio = ratio
+        self.min_samples = min_samples
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+
+        self.stats = RunningStats()
+        self.median = P2Quantile(0.5)
+        self.p10 = P2Quantile(0.1)
+        self.started_at = None
+        self._now = None
+
+    def add(self, ear, now=None):
+        now = time.time() if now is None else now
+        if self.started_at is None:
+            self.started_at = now
+        self._now = now
+        if ear is None:
+            return
+        self.stats.add(ear)
+        self.median.add(ear)
+        self.p10.add(ear)
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return self._now - self.started_at
+
+    @property
+    def progress(self):
+        return min(1.0, self.elapsed / self.duration) if self.duration > 0 else 1.0
+
+    @property
+    def done(self):
+        return self.elapsed >= self.duration and self.stats.count >= self.min_samples
+
+    def derive_threshold(self):
+        baseline = self.median.value
+        if baseline is None:
+            return None
+        return max(self.min_threshold, min(self.max_threshold, baseline * self.ratio))
+
+    def build_profile(self, name):
+        return DriverProfile(
+            name=name,
+            threshold=self.derive_threshold(),
+            baseline_median=self.median.value,
+            baseline_mean=self.stats.mean,
+            baseline_std=self.stats.std,
+            baseline_p10=self.p10.value,
+            samples=self.stats.count,
+        )
+
+
+class DriverProfile:
+    """Profil kalibrasi satu pengemudi (disimpan sebagai JSON)"""
+
+    FIELDS = ("name", "threshold", "baseline_median", "baseline_mean", "baseline_std",
+              "baseline_p10", "samples", "created")
+
+    def __init__(self, name, threshold, baseline_median=None, baseline_mean=None,
+                 baseline_std=None, baseline_p10=None, samples=0, created=None):
+        self.name = name
+        self.threshold = threshold
+        self.baseline_median = baseline_median
+        self.baseline_mean = baseline_mean
+        self.baseline_std = baseline_std
+        self.baseline_p10 = baseline_p10
+        self.samples = samples
+        self.created = created or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def path_for(name, directory=PROFILE_DIR):
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", name.strip()).strip("_").lower() or "default"
+        return os.path.join(directory, f"{slug}.json")
+
+    def save(self, directory=PROFILE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = self.path_for(self.name, directory)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({k: getattr(self, k) for k in self.FIELDS}, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, name, directory=PROFILE_DIR):
+        """Muat profil; return None jika belum ada"""
+        path = cls.path_for(name, directory)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(**{k: data.get(k) for k in cls.FIELDS if k in data})
@@ -0,0 +1,127 @@
+"""
+app/camera.py
+Pengelola sesi kamera bersama.
+
+Kamera dibuka sekali (di thread latar, sehingga mainloop Tk tidak pernah
+terblokir) lalu handle capture yang sama dipakai oleh halaman mana pun yang
+aktif. Pengecekan izin kamera memakai sesi yang sudah terbuka, bukan membuka
+perangkat untuk kedua kalinya. Sumber frame (backend, resolusi, FOURCC, file,
+sintetis) diatur lewat CaptureConfig, lihat app.frame_source.
+"""
+
+import threading
+
+from app.frame_source import CaptureConfig, create_source
+
+
+class CameraManager:
+    """
+    Menyimpan satu FrameSource yang tetap terbuka antar pergantian halaman.
+
+    Args:
+        config (CaptureConfig): Konfigurasi sumber frame. Default dari
+            variabel lingkungan (kamera 0, backend sesuai platform)
+    """
+
+    def __init__(self, config=None):
+        self.config = config or CaptureConfig.from_env()
+
+        self.cap = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._opening = None
+        self._callbacks = []
+
+    @property
+    def is_open(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    @property
+    def is_opening(self):
+        return self._opening is not None
+
+    def open_async(self, callback=None):
+        """
+        Buka kamera di thread latar.
+
+        callback(ok, error) dipanggil dari thread pembuka (atau langsung jika
+        kamera sudah terbuka). Pemanggil GUI harus meneruskannya ke thread Tk
+        sendiri, mis. via master.after(0, ...).
+        """
+        with self._lock:
+            if self.is_open:
+                ready = True
+            else:
+                ready = False
+                if callback is not None:
+                    self._callbacks.append(callback)
+                if self._opening is None:
+                    self._opening = threading.Thread(target=self._open, name="camera-open",
+                                                     daemon=True)
+                    self._opening.start()
+
+        if ready and callback is not None:
+            callback(True, None)
+
+    def open(self, timeout=None):
+        """Buka kamera dan tunggu sampai selesai. Return True jika berhasil."""
+        self.open_async()
+        opening = self._opening
+        if opening is not None:
+            opening.join(timeout)
+        return self.is_open
+
+    def _open(self):
+        cap, error = None, None
+        try:
+            cap = create_source(self.config)
+            if not cap.open():
+                error = "Gagal membuka kamera."
+            else:
+                ret, _ = cap.read()
+                if not ret:
+                    error = "Kamera terbuka tetapi tidak mengirim frame."
+        except Exception as e:
+            error = f"Gagal membuka kamera: {e}"
+
+        if error is not None and cap is not None:
+            cap.release()
+            cap = None
+
+        with self._lock:
+            self.cap = cap
+            self.error = error
+            callbacks, self._callbacks = self._callbacks, []
+            self._opening = None
+
+        for callback in callbacks:
+            try:
+                callback(error is None, error)
+            except Exception as e:
+                print("Camera callback error:", e)
+
+    def probe(self):
+        """
+        Cek akses kamera memakai sesi yang ada (membuka jika belum terbuka).
+        Jangan dipanggil saat pipeline sedang membaca dari kamera.
+        """
+        if not self.is_open:
+            return self.open()
+        try:
+            ret, _ = self.cap.read()
+            return ret
+        except Exception:
+            return False
+
+    def close(self):
+        """Lepas perangkat kamera (saat aplikasi ditutup)"""
+        opening = self._opening
+        if opening is not None:
+            opening.join(timeout=2.0)
+        with self._lock:
+            cap, self.cap = self.cap, None
+        try:
+            if cap is not None:
+                cap.release()
+        except Exception:
+            pass
@@ -0,0 +1,349 @@
+"""
+app/daemon.py
+Mode layanan headless untuk unit dalam kendaraan tanpa layar.
+
+Alur: FrameSource -> CameraPipeline (FaceDetector) -> EarLogger + analisis
+temporal -> AlertEngine. Modul ini sengaja tidak meng-import tkinter,
+PIL.ImageTk, maupun matplotlib.
+
+Endpoint metrik lokal (JSON):
+    GET /metrics  EAR & status terakhir, FPS, latensi per tahap, kedalaman antrian
+    GET /health   200 jika pipeline berjalan, 503 jika belum / kamera gagal
+
+Jalankan:
+    python -m app.daemon --port 8787
+    python -m app.daemon --unix /run/ear/metrics.sock
+SIGTERM / SIGINT menghentikan layanan dengan rapi (log di-flush).
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.alerts import AlertEngine, LEVEL_NAMES, sinks_from_env
+from app.camera import CameraManager
+from app.ear_logger import EarLogger
+from app.face_detector import TIERS, FaceDetector
+from app.frame_source import CaptureConfig
+from app.pipeline import CameraPipeline
+from app.scheduler import AdaptiveScheduler
+from app.temporal import NodDetector, TemporalAnalyzer
+from app.utils import default_detector_roi, default_detector_tier, default_log_path, ensure_directories
+
+# Modul GUI yang tidak boleh ikut termuat di mode headless
+GUI_MODULES = ("tkinter", "PIL.ImageTk", "matplotlib")
+
+
+class DetectionService:
+    """
+    Args:
+        config (CaptureConfig): Sumber frame (default dari variabel lingkungan)
+        log_file (str): File log EAR (ekstensi menentukan backend)
+        threshold (float): Ambang EAR (diganti profil pengemudi jika ada)
+        tier (str): Tier deteksi FaceDetector
+        roi_mode (bool): FaceMesh hanya di ROI wajah setelah wajah ditemukan
+        adaptive (bool): Pakai AdaptiveScheduler (hemat CPU saat EAR stabil)
+        alert_sinks (list): Sink AlertEngine (default: sinks_from_env())
+        retry_interval (float): Jeda antar percobaan membuka kamera (detik)
+        max_read_failures (int): Gagal baca berturut-turut sebelum kamera
+            dibuka ulang
+    """
+
+    def __init__(self, config=None, log_file=None, threshold=0.21, tier="mesh", adaptive=True,
+                 alert_sinks=None, retry_interval=5.0, roi_mode=False, max_read_failures=100):
+        self.camera = CameraManager(config)
+        self.detector = FaceDetector(threshold=threshold, draw_overlay=False, tier=tier,
+                                     roi_mode=roi_mode)
+        self.logger = EarLogger(log_file or default_log_path())
+        self.temporal = TemporalAnalyzer(threshold=threshold)
+        self.nods = NodDetector()
+        self.alerts = AlertEngine(alert_sinks if alert_sinks is not None else sinks_from_env())
+        self.adaptive = adaptive
+        self.retry_interval = retry_interval
+        self.max_read_failures = max_read_failures
+
+        self.pipeline = None
+        self._session_open = False
+        self.started_at = None
+        self._stop = threading.Event()
+        self._state_lock = threading.Lock()
+        self._state = {"ear": None, "status": None, "smoothed": None, "perclos": None,
+                       "reason": None, "updated_at": None}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def run(self):
+        """Blok sampai stop() dipanggil (mis. dari handler SIGTERM)"""
+        self.started_at = time.time()
+        self.alerts.start()
+        # Graph FaceMesh diinisialisasi sebelum kamera, bukan di frame pertama
+        warmup = self.detector.warmup()
+        print(f"Detektor siap (pemanasan {warmup * 1000:.0f} ms)")
+
+        while not self._stop.is_set():
+            camera_started = self._open_camera()
+            if camera_started is None:
+                return
+
+            pipeline = CameraPipeline(self.camera.cap, self.detector,
+                                      on_result=self._handle_result,
+                                      scheduler=AdaptiveScheduler() if self.adaptive else None,
+                                      max_read_failures=self.max_read_failures)
+            # Sesi dibuka sebelum frame pertama agar baris awal ikut sesi ini
+            self.logger.start_session("daemon")
+            self._session_open = True
+            self.pipeline = pipeline
+            pipeline.start(started_at=camera_started)
+            print("Layanan deteksi berjalan:", self.camera.cap.describe())
+            # wait() bertimeout agar sinyal tetap diproses (lock Windows tidak bisa diinterupsi)
+            while not self._stop.wait(0.5):
+                if not pipeline.is_running:
+                    break
+            if self._stop.is_set():
+                return
+
+            # Pipeline berhenti sendiri (kamera hilang): tutup sesi, buka ulang kamera
+            print("Pipeline berhenti; membuka ulang kamera")
+            # Kamera / detector baru boleh dipakai lagi setelah thread lama selesai
+            joined = self._stop_pipeline()
+            while not joined and not self._stop.is_set():
+                print("Thread pipeline belum berhenti; menunggu")
+                joined = self.pipeline.stop(timeout=2.0)
+            if not joined:
+                return
+            self.camera.close()
+            self.temporal.reset()
+            self.nods.reset()
+            self.detector.reset_tracking()
+
+    def _open_camera(self):
+        """Coba buka kamera sampai berhasil; return perf_counter awal percobaan atau None"""
+        while not self._stop.is_set():
+            camera_started = time.perf_counter()
+            if self.camera.open(timeout=10.0):
+                return camera_started
+            print(f"Kamera belum tersedia ({self.camera.error}); coba lagi {self.retry_interval:.0f} s")
+            self._stop.wait(self.retry_interval)
+        return None
+
+    def _stop_pipeline(self):
+        """Hentikan pipeline & tutup sesi log; return True jika thread pipeline selesai"""
+        joined = self.pipeline.stop(timeout=2.0) if self.pipeline is not None else True
+        if self._session_open:
+            self._session_open = False
+            try:
+                self.logger.end_session()
+            except Exception as e:
+                print("Logger session error:", e)
+        return joined
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        """Hentikan pipeline, kirim sisa peringatan, flush log, lepas kamera"""
+        joined = self._stop_pipeline()
+        self.alerts.close()
+        try:
+            self.logger.close()
+        except Exception as e:
+            print("Logger close error:", e)
+        if joined:
+            self.camera.close()
+            self.detector.close()
+        else:
+            # Thread inferensi masih di dalam process_frame: dilepas saat proses keluar
+            print("Thread pipeline belum berhenti; kamera & detector tidak ditutup")
+        print(f"Layanan berhenti: {self.logger.written_rows} baris log ditulis, "
+              f"{self.logger.dropped_rows} dibuang")
+
+    # ------------------------------------------------------------------
+    # Thread inferensi
+    # ------------------------------------------------------------------
+    def _handle_result(self, result):
+        # Sampel temporal memakai waktu tangkap frame, bukan waktu penanganan
+        captured_at = result.captured_at
+        state = self.temporal.update(result.ear, captured_at, self.detector.threshold)
+        features = result.features
+        self.nods.update(features.pitch if features is not None else None, captured_at)
+
+        reason = state.reason or self.nods.reason
+        self.alerts.update(reason is not None, reason, result.captured_at)
+
+        with self._state_lock:
+            self._state.update(ear=result.ear, status=result.status, smoothed=state.smoothed,
+                               perclos=state.perclos, reason=reason, updated_at=time.time())
+        if result.ear is None:
+            return
+        try:
+            self.logger.append(result.ear, result.status)
+        except Exception as e:
+            print("Logger append error:", e)
+
+    # ------------------------------------------------------------------
+    # Metrik
+    # ------------------------------------------------------------------
+    @property
+    def healthy(self):
+        return self.pipeline is not None and self.pipeline.is_running
+
+    def metrics(self):
+        with self._state_lock:
+            state = dict(self._state)
+        pipeline = self.pipeline.stats() if self.pipeline is not None else {}
+        alerts = self.alerts.stats()
+        return {
+            "healthy": self.healthy,
+            "uptime_s": time.time() - self.started_at if self.started_at else 0.0,
+            "camera_error": self.camera.error,
+            "ear": state["ear"],
+            "ear_smoothed": state["smoothed"],
+            "status": state["status"],
+            "perclos": state["perclos"],
+            "drowsy_reason": state["reason"],
+            "age_s": time.time() - state["updated_at"] if state["updated_at"] else None,
+            "blinks": self.temporal.blink_count,
+            "threshold": self.detector.threshold,
+            "detector_warmup_ms": (self.detector.warmup_seconds * 1000.0
+                                   if self.detector.warmup_seconds is not None else None),
+            "first_ear_ms": pipeline.get("first_ear_ms"),
+            "alert_level": LEVEL_NAMES[self.alerts.level],
+            "pipeline": pipeline,
+            "queues": {
+                "frame": pipeline.get("frame_queue", 0),
+                "render": pipeline.get("render_queue", 0),
+                "log_buffer": self.logger.pending_rows,
+                "alert": alerts["queue"],
+            },
+            "alerts": alerts,
+            "log": {"written": self.logger.written_rows, "dropped": self.logger.dropped_rows},
+        }
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._send_json(200, self.service.metrics())
+        elif path == "/health":
+            healthy = self.service.healthy
+            self._send_json(200 if healthy else 503, {"healthy": healthy})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _send_json(self, code, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if hasattr(socket, "AF_UNIX"):
+    class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def get_request(self):
+            request, _ = super().get_request()
+            # BaseHTTPRequestHandler mengharapkan alamat (host, port)
+            return request, ("unix", 0)
+
+
+def start_metrics_server(service, host="127.0.0.1", port=8787, unix_path=None):
+    """Server metrik di thread latar; return objek server (panggil shutdown())"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"service": service})
+    if unix_path:
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("UNIX socket tidak didukung di platform ini")
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = _UnixHTTPServer(unix_path, handler)
+        where = f"unix://{unix_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        where = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Endpoint metrik: {where}/metrics")
+    return server
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Layanan deteksi kantuk headless")
+    parser.add_argument("--host", default="127.0.0.1", help="Alamat endpoint metrik")
+    parser.add_argument("--port", type=int, default=8787, help="Port endpoint metrik (0 = nonaktif)")
+    parser.add_argument("--unix", help="Pakai UNIX socket di path ini, bukan TCP")
+    parser.add_argument("--log", default=None, help="File log EAR (default: EAR_LOG_FILE / data/ear_log.csv)")
+    parser.add_argument("--threshold", type=float, default=0.21, help="Ambang batas EAR")
+    parser.add_argument("--driver", help="Nama profil pengemudi (threshold hasil kalibrasi)")
+    parser.add_argument("--tier", choices=TIERS, default=None,
+                        help="Tier deteksi (default: EAR_DETECTOR_TIER / mesh)")
+    parser.add_argument("--roi", action="store_true", default=None,
+                        help="FaceMesh hanya di ROI wajah (default: EAR_DETECTOR_ROI)")
+    parser.add_argument("--no-adaptive", action="store_true", help="Matikan AdaptiveScheduler")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    ensure_directories()
+
+    threshold = args.threshold
+    if args.driver:
+        from app.calibration import DriverProfile
+
+        profile = DriverProfile.load(args.driver)
+        if profile is not None and profile.threshold is not None:
+            threshold = profile.threshold
+            print(f"Profil {profile.name}: threshold {threshold:.3f}")
+        else:
+            print(f"Profil {args.driver} tidak ditemukan, threshold {threshold:.3f}")
+
+    service = DetectionService(CaptureConfig.from_env(), log_file=args.log, threshold=threshold,
+                               tier=args.tier or default_detector_tier(),
+                               roi_mode=args.roi if args.roi is not None else default_detector_roi(),
+                               adaptive=not args.no_adaptive)
+
+    leaked = [name for name in GUI_MODULES if name in sys.modules]
+    if leaked:
+        print("Peringatan: modul GUI ikut termuat di mode headless:", ", ".join(leaked))
+
+    # Handler sinyal hanya menyalakan event; penghentian dilakukan di thread utama
+    def _on_signal(signum, frame):
+        print(f"Sinyal {signum} diterima, menghentikan layanan...")
+        service.stop()
+
+    signal.signal(signal.SIGINT, _on_signal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _on_signal)
+
+    server = None
+    if args.unix or args.port:
+        server = start_metrics_server(service, args.host, args.port, args.unix)
+    try:
+        service.run()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            if args.unix and os.path.exists(args.unix):
+                os.unlink(args.unix)
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+app/display.py
+Jalur tampilan frame kamera ke Tkinter tanpa PIL.
+
+Frame BGR di-resize dengan cv2.INTER_AREA dan dikonversi ke RGB langsung ke
+buffer PPM yang dipakai ulang (thread render), lalu satu tk.PhotoImage
+persisten diperbarui di tempat oleh thread Tk. Jika thread Tk tertinggal,
+update digabung: hanya frame terbaru yang digambar. draw() bisa dijadwalkan
+otomatis (schedule=True) atau dipanggil oleh loop refresh Tk sendiri.
+"""
+
+import threading
+import tkinter as tk
+
+import cv2
+import numpy as np
+
+
+class FrameDisplay:
+    """
+    Args:
+        master: Root Tk (untuk menjadwalkan gambar di thread Tk)
+        label (tk.Label): Label tujuan; gambar dipasang saat frame pertama tiba
+        size (tuple): (lebar, tinggi) tampilan
+        schedule (bool): True = submit() menjadwalkan draw() via after(0)
+            (paling banyak satu antre); False = pemanggil me-poll draw()
+    """
+
+    def __init__(self, master, label, size, schedule=True):
+        self.master = master
+        self.schedule = schedule
+        self.label = label
+        self.width, self.height = size
+
+        # Buffer PPM biner: header tetap + piksel RGB. Area piksel sekaligus
+        # menjadi dst cvtColor sehingga satu-satunya salinan per frame adalah
+        # tobytes() (Tcl butuh objek bytes yang immutable)
+        header = b"P6\n%d %d\n255\n" % (self.width, self.height)
+        self._ppm = np.empty(len(header) + self.width * self.height * 3, dtype=np.uint8)
+        self._ppm[:len(header)] = np.frombuffer(header, dtype=np.uint8)
+        self._rgb = self._ppm[len(header):].reshape(self.height, self.width, 3)
+        self._resized = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        # PhotoImage dibuat di thread Tk (konstruktor dipanggil saat halaman dibangun)
+        self.photo = tk.PhotoImage(master=master, width=self.width, height=self.height)
+
+        self._lock = threading.Lock()
+        self._pending = None
+        self._scheduled = False
+        self._attached = False
+        self.closed = False
+        self.submitted = 0
+        self.drawn = 0
+
+    @property
+    def coalesced(self):
+        """Frame yang tidak digambar karena sudah ada frame lebih baru"""
+        return max(0, self.submitted - self.drawn)
+
+    def submit(self, frame):
+        """Dipanggil di thread render: siapkan frame & jadwalkan satu kali gambar"""
+        if self.closed:
+            return
+        if frame.shape[0] == self.height and frame.shape[1] == self.width:
+            src = frame
+        else:
+            cv2.resize(frame, (self.width, self.height), dst=self._resized,
+                       interpolation=cv2.INTER_AREA)
+            src = self._resized
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        data = self._ppm.tobytes()
+
+        with self._lock:
+            self._pending = data
+            self.submitted += 1
+            if self._scheduled or not self.schedule:
+                # Gambar sebelumnya belum dieksekusi Tk: cukup ganti datanya
+                return
+            self._scheduled = True
+        try:
+            self.master.after(0, self.draw)
+        except (RuntimeError, tk.TclError):
+            # Mainloop sudah berhenti (aplikasi ditutup)
+            self.closed = True
+
+    def draw(self):
+        """
+        Dipanggil di thread Tk: perbarui PhotoImage dengan frame terbaru.
+        Return True jika ada frame baru yang digambar.
+        """
+        with self._lock:
+            data, self._pending = self._pending, None
+            self._scheduled = False
+        if data is None or self.closed:
+            return False
+        try:
+            self.photo.configure(data=data)
+            if not self._attached:
+                # width/height label dalam piksel begitu berisi gambar
+                self.label.configure(image=self.photo, text="",
+                                     width=self.width, height=self.height)
+                self.label.image = self.photo
+                self._attached = True
+            self.drawn += 1
+            return True
+        except tk.TclError:
+            # Label sudah dihancurkan (pindah halaman)
+            self.close()
+            return False
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._pending = None
@@ -1,74 +1,203 @@
 """
 Modul untuk logging data EAR ke CSV
 Kompatibel dengan GUI Sistem Deteksi Mengantuk (developer & user)
+
+append() hanya memasukkan baris ke buffer di memori; thread flusher menulis
+baris ke disk secara batch (berdasarkan jumlah baris atau interval waktu).
+Penyimpanan dilakukan oleh backend (lihat app.log_backends): CSV (default),
+biner memmap (.bin / .earlog), atau SQLite (.db / .sqlite) yang mendukung sesi.
 """
 
-import pandas as pd
 import os
-from datetime import datetime
-import csv
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+from app.log_backends import create_backend, empty_frame
 
 class EarLogger:
     """Kelas untuk menangani logging data EAR"""
 
-    def __init__(self, filename="data/ear_log.csv"):
+    def __init__(self, filename="data/ear_log.csv", backend=None, batch_size=64,
+                 flush_interval=1.0, max_buffer=10000):
+        """
+        Args:
+            filename (str): Lokasi file log
+            backend (str | object): "csv", "binary", atau objek backend.
+                None = dipilih dari ekstensi file
+            batch_size (int): Flush segera jika buffer mencapai jumlah baris ini
+            flush_interval (float): Flush periodik (detik)
+            max_buffer (int): Batas baris di memori. Jika disk macet dan buffer
+                penuh, baris tertua dibuang (dihitung di dropped_rows)
+        """
         self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
         self.ensure_directory_exists()
 
-        # Jika file belum ada → buat baru dengan header standar
-        if not os.path.exists(self.filename):
-            self.create_csv_file()
+        self.backend = create_backend(self.filename, backend)
 
-    def ensure_directory_exists(self):
-        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        self._buffer = deque(maxlen=max_buffer)
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._flusher = None
+        self.dropped_rows = 0
+        self.written_rows = 0
 
-    def create_csv_file(self):
-        """Buat CSV baru dengan header sesuai struktur GUI"""
-        with open(self.filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['timestamp', 'ear', 'status'])
+    def ensure_directory_exists(self):
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
 
     def append(self, ear, status="Normal"):
         """
-        Tambah satu data EAR
+        Tambah satu data EAR (non-blocking, ditulis oleh thread flusher)
         
         Args:
             ear (float): Nilai EAR
             status (str): Status ("Normal" / "Mengantuk")
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = time.time_ns()
+
+        with self._buffer_lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped_rows += 1
+            self._buffer.append((timestamp, ear, status))
+            pending = len(self._buffer)
+
+        if self._flusher is None and not self._closed:
+            self._start_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    @property
+    def pending_rows(self):
+        """Baris di buffer yang belum ditulis ke backend"""
+        return len(self._buffer)
+
+    def flush(self):
+        """Tulis semua baris di buffer ke backend"""
+        with self._write_lock:
+            with self._buffer_lock:
+                rows = list(self._buffer)
+                self._buffer.clear()
+            if not rows:
+                return 0
+
+            try:
+                self.backend.write_rows(rows)
+            except Exception:
+                self._requeue(rows)
+                raise
+            self.written_rows += len(rows)
+            return len(rows)
+
+    def _requeue(self, rows):
+        """Kembalikan baris gagal tulis ke depan buffer (yang tertua dibuang jika penuh)"""
+        with self._buffer_lock:
+            combined = rows + list(self._buffer)
+            self.dropped_rows += max(0, len(combined) - self._buffer.maxlen)
+            self._buffer.clear()
+            self._buffer.extend(combined)
+
+    def close(self):
+        """Hentikan flusher, tulis sisa buffer, dan tutup backend"""
+        self._closed = True
+        self._wakeup.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=2.0)
+        self._flusher = None
 
-        with open(self.filename, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([timestamp, ear, status])
+        try:
+            self.flush()
+        finally:
+            with self._write_lock:
+                self.backend.close()
+
+    def _start_flusher(self):
+        with self._buffer_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="ear-logger-flusher",
+                                             daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Disk bermasalah: baris tetap di buffer (dibatasi max_buffer)
+                print("Logger flush error:", e)
+
+    # ------------------------------------------------------------------
+    # Sesi kamera (hanya backend yang mendukung, mis. SQLite)
+    # ------------------------------------------------------------------
+    def start_session(self, label=None):
+        """Mulai sesi baru; baris berikutnya ditautkan ke sesi ini"""
+        if not hasattr(self.backend, "start_session"):
+            return None
+        # Baris yang masih di buffer milik periode sebelum sesi dimulai
+        self.flush()
+        return self.backend.start_session(label)
+
+    def end_session(self):
+        """Akhiri sesi aktif (baris di buffer ditulis dulu ke sesi tersebut)"""
+        if not hasattr(self.backend, "end_session"):
+            return None
+        self.flush()
+        return self.backend.end_session()
+
+    def list_sessions(self):
+        """Daftar sesi (DataFrame kosong jika backend tidak mendukung sesi)"""
+        if not hasattr(self.backend, "list_sessions"):
+            return pd.DataFrame(columns=['id', 'label', 'rows', 'started', 'ended'])
+        return self.backend.list_sessions()
+
+    def get_session_data(self, session_id):
+        """Semua baris milik satu sesi"""
+        if not hasattr(self.backend, "read_session"):
+            return empty_frame()
+        self.flush()
+        return self.backend.read_session(session_id)
 
     def read_all(self):
-        """Membaca seluruh data"""
+        """Membaca seluruh data (kolom timestamp, ear, status)"""
 
         try:
-            df = pd.read_csv(self.filename)
+            # Pastikan baris yang masih di buffer ikut terbaca
+            self.flush()
+            return self.backend.read_all()
+
+        except Exception as e:
+            print(f"Error reading log: {e}")
+            return empty_frame()
 
-            # Backward Compatibility:
-            # Jika file lama pakai ear_value, rename agar GUI tidak error
-            if "ear" not in df.columns:
-                if "ear_value" in df.columns:
-                    df.rename(columns={"ear_value": "ear"}, inplace=True)
-                else:
-                    raise KeyError("Kolom 'ear' tidak ditemukan.")
+    def tail(self, n=100):
+        """Mengambil n baris terakhir"""
 
-            return df
+        try:
+            self.flush()
+            return self.backend.tail(n)
 
         except Exception as e:
-            print(f"Error reading CSV: {e}")
-            return pd.DataFrame(columns=['timestamp', 'ear', 'status'])
+            print(f"Error reading log: {e}")
+            return empty_frame()
 
     def get_recent_data(self, minutes=10):
         """Mengambil data terbaru dalam rentang menit tertentu"""
 
-        df = self.read_all()
-        if df.empty:
-            return df
+        try:
+            self.flush()
+            cutoff = pd.Timestamp.now() - pd.Timedelta(minutes=minutes)
+            return self.backend.read_since(cutoff)
 
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        cutoff = pd.Timestamp.now() - pd.Timedelta(minutes=minutes)
-        return df[df['timestamp'] >= cutoff]
+        except Exception as e:
+            print(f"Error reading log: {e}")
+            return empty_frame()
@@ -1,28 +1,245 @@
+import dataclasses
+import importlib
+import importlib.metadata
+import sys
+import time
+import types
+
 import cv2
 import numpy as np
-import mediapipe as mp
-from scipy.spatial import distance as dist
+
+from app.presence import HaarFacePresence
+
+
+def _import_face_mesh():
+    """
+    Import mediapipe.solutions.face_mesh tanpa matplotlib.
+
+    `import mediapipe` (0.10) memuat mediapipe.python.solutions, yang
+    meng-import drawing_utils -> matplotlib.pyplot. Detector tidak memakai
+    drawing_utils (overlay digambar dengan cv2), jadi selama import modul
+    itu diganti placeholder yang hanya berisi DrawingSpec (dipakai
+    drawing_styles saat import). Setelahnya placeholder dan drawing_styles
+    (yang memegang DrawingSpec palsu) dilepas, dan mediapipe.solutions
+    memuat keduanya lagi dari modul asli saat pertama kali diakses.
+
+    Trik ini hanya untuk tata letak paket mediapipe 0.10.x; versi lain
+    di-import biasa (matplotlib ikut termuat).
+    """
+    name = "mediapipe.python.solutions.drawing_utils"
+    if "mediapipe" in sys.modules:
+        from mediapipe.python.solutions import face_mesh
+        return face_mesh
+
+    try:
+        version = importlib.metadata.version("mediapipe")
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+    if version is None or not version.startswith("0.10."):
+        print(f"Peringatan: mediapipe {version or '?'} tidak dikenal, "
+              "import biasa (matplotlib ikut termuat)")
+        from mediapipe.python.solutions import face_mesh
+        return face_mesh
+
+    @dataclasses.dataclass
+    class DrawingSpec:
+        color: tuple = (224, 224, 224)
+        thickness: int = 2
+        circle_radius: int = 2
+
+    placeholder = types.ModuleType(name)
+    placeholder.DrawingSpec = DrawingSpec
+    sys.modules[name] = placeholder
+    try:
+        import mediapipe.python.solutions as solutions
+        from mediapipe.python.solutions import face_mesh
+    finally:
+        if sys.modules.get(name) is placeholder:
+            del sys.modules[name]
+
+    # drawing_styles sudah terikat ke DrawingSpec palsu: buang juga agar
+    # import berikutnya memuat ulang keduanya dari modul asli
+    lazy = ("drawing_utils", "drawing_styles")
+    for attr in lazy:
+        module = sys.modules.get(f"{solutions.__name__}.{attr}")
+        if module is placeholder or getattr(module, "DrawingSpec", None) is DrawingSpec:
+            del sys.modules[f"{solutions.__name__}.{attr}"]
+            if vars(solutions).get(attr) is module:
+                delattr(solutions, attr)
+
+    def __getattr__(attr):
+        # mp.solutions.drawing_utils tetap bisa dipakai (dimuat saat diakses)
+        if attr in lazy:
+            return importlib.import_module(f"{solutions.__name__}.{attr}")
+        raise AttributeError(f"module {solutions.__name__!r} has no attribute {attr!r}")
+
+    solutions.__getattr__ = __getattr__
+    return face_mesh
+
+
+mp_face_mesh = _import_face_mesh()
+
+# Tingkat deteksi: "mesh" = FaceMesh setiap frame, "tiered" = cek Haar murah
+# dulu saat wajah belum/tidak terlacak, "haar" = hanya keberadaan wajah
+# (mode darurat hardware lemah, tanpa EAR)
+TIERS = ("mesh", "tiered", "haar")
+
+class FaceFeatures:
+    """
+    Fitur kantuk tambahan dari pass FaceMesh yang sama dengan EAR.
+
+    Sudut dalam derajat: pitch positif = kepala menunduk, yaw positif =
+    menoleh ke kanan (gambar), roll positif = kepala miring searah jarum jam.
+    """
+
+    __slots__ = ("ear", "left_ear", "right_ear", "mar", "yawning", "pitch", "yaw", "roll")
+
+    def __init__(self, ear, left_ear, right_ear, mar, yawning, pitch=None, yaw=None, roll=None):
+        self.ear = ear
+        self.left_ear = left_ear
+        self.right_ear = right_ear
+        self.mar = mar
+        self.yawning = yawning
+        self.pitch = pitch
+        self.yaw = yaw
+        self.roll = roll
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class DetectedFace:
+    """
+    Hasil satu wajah dalam frame (lihat FaceDetector.last_faces).
+
+    box = (x0, y0, x1, y1) piksel dari landmark yang diambil; track_id diisi
+    oleh pelacak wajah (mis. app.multi_stream.FaceTracker).
+    """
+
+    __slots__ = ("ear", "status", "features", "box", "track_id")
+
+    def __init__(self, ear, status, features, box, track_id=None):
+        self.ear = ear
+        self.status = status
+        self.features = features
+        self.box = box
+        self.track_id = track_id
+
+    @property
+    def area(self):
+        x0, y0, x1, y1 = self.box
+        return max(0.0, x1 - x0) * max(0.0, y1 - y0)
+
 
 class FaceDetector:
     """
     Deteksi wajah & mata menggunakan MediaPipe FaceMesh,
-    serta menghitung EAR (Eye Aspect Ratio).
+    serta menghitung EAR (Eye Aspect Ratio), MAR (menguap) dan pose kepala.
     """
 
-    def __init__(self, threshold=0.21):
+    # Kontur wajah (FACEMESH_FACE_OVAL) untuk bounding box ROI
+    FACE_OVAL_IDX = (10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
+                     397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136,
+                     172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109)
+
+    # Mulut (8 titik) untuk MAR: sudut kiri, bibir atas (3), sudut kanan, bibir bawah (3)
+    MOUTH_IDX = (61, 81, 13, 311, 291, 402, 14, 178)
+
+    # Titik pose kepala: hidung, dagu, sudut luar mata kiri/kanan, sudut mulut kiri/kanan
+    POSE_IDX = (1, 152, 33, 263, 61, 291)
+    # Model wajah 3D generik (mm), sumbu kamera: x kanan, y bawah, z menjauh
+    POSE_MODEL = np.array([
+        (0.0, 0.0, 0.0),
+        (0.0, 330.0, 65.0),
+        (-225.0, -170.0, 135.0),
+        (225.0, -170.0, 135.0),
+        (-150.0, 150.0, 125.0),
+        (150.0, 150.0, 125.0),
+    ], dtype=np.float64)
+
+    def __init__(self, threshold=0.21, draw_overlay=True, static_image_mode=False,
+                 roi_mode=False, roi_padding=0.35, roi_size=256, extra_features=True,
+                 mar_threshold=0.6, max_num_faces=1, tier="mesh", recheck_interval=15):
         """
         Inisialisasi FaceMesh dan parameter EAR
+
+        Args:
+            threshold (float): Ambang batas EAR untuk status "Mengantuk"
+            draw_overlay (bool): Gambar titik mata & teks EAR pada frame.
+                Matikan untuk analisis offline/headless.
+            static_image_mode (bool): False = mode video/tracking FaceMesh
+                (landmark frame sebelumnya dipakai sebagai ROI frame berikutnya)
+            roi_mode (bool): Setelah wajah ditemukan, frame berikutnya dipotong
+                ke kotak di sekitar landmark terakhir dan hanya potongan itu
+                yang diproses FaceMesh. Kembali ke frame penuh jika wajah hilang.
+            roi_padding (float): Padding kotak ROI relatif terhadap ukuran wajah
+            roi_size (int): Potongan ROI di-resize ke persegi berukuran ini
+            extra_features (bool): Hitung MAR & pose kepala (solvePnP) dari
+                landmark yang sama; hasil di last_features
+            mar_threshold (float): MAR di atas nilai ini dianggap menguap
+            max_num_faces (int): Jumlah wajah maksimum per frame. Jika > 1,
+                semua wajah tersedia di last_faces dan nilai yang dikembalikan
+                process_frame adalah wajah terbesar. Tidak bisa digabung
+                dengan roi_mode (ROI hanya melacak satu wajah)
+            tier (str): "mesh", "tiered", atau "haar" (lihat TIERS)
+            recheck_interval (int): Pada tier "tiered", FaceMesh tetap
+                dijalankan setiap sekian frame walau Haar tidak menemukan
+                wajah (Haar lemah untuk wajah miring / menunduk)
         """
+        if max_num_faces > 1 and roi_mode:
+            raise ValueError("roi_mode hanya mendukung max_num_faces=1")
+        if tier not in TIERS:
+            raise ValueError(f"Tier deteksi tidak dikenal: {tier}")
+
         self.threshold = threshold
+        self.draw_overlay = draw_overlay
+        self.roi_mode = roi_mode
+        self.roi_padding = roi_padding
+        self.roi_size = roi_size
+        self.extra_features = extra_features
+        self.mar_threshold = mar_threshold
+        self.max_num_faces = max_num_faces
+        self.last_features = None
+        self.last_faces = []
+        self._pose_rvec = None
+        self._pose_tvec = None
+
+        # Tier deteksi & penghitung FaceMesh yang dihindari
+        self.tier = tier
+        self.recheck_interval = recheck_interval
+        self.presence = HaarFacePresence() if tier != "mesh" else None
+        self.mesh_frames = 0
+        self.mesh_skipped = 0
+        self._tracking = False
+        self._since_mesh = 0
 
-        # MediaPipe FaceMesh
-        self.mp_face = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        # MediaPipe FaceMesh (tidak dibuat sama sekali pada tier "haar")
+        self.mp_face = mp_face_mesh
+        self.face_mesh = None
+        if tier != "haar":
+            self.face_mesh = self.mp_face.FaceMesh(
+                static_image_mode=static_image_mode,
+                max_num_faces=max_num_faces,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        # FaceMesh terpisah untuk input ROI: koordinat tracking-nya relatif
+        # terhadap potongan, tidak boleh tercampur dengan mesh frame penuh
+        self.roi_mesh = None
+        if roi_mode and tier != "haar":
+            self.roi_mesh = self.mp_face.FaceMesh(
+                static_image_mode=static_image_mode,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        self._roi = None            # (x0, y0, x1, y1) piksel, None = frame penuh
+        self.roi_hits = 0
+        self.full_frame_runs = 0
+        self.warmup_seconds = None  # durasi warmup(); None = belum dipanaskan
+        self.closed = False
 
         # Indeks landmark mata dari MediaPipe
         # Mata kiri (6 titik)
@@ -30,89 +247,394 @@ class FaceDetector:
         # Mata kanan (6 titik)
         self.right_eye_idx = [362, 385, 387, 263, 373, 380]
 
+        # Semua indeks yang dibutuhkan digabung tanpa duplikat dan diambil
+        # dalam satu pass ke buffer float32 yang dipakai ulang setiap frame.
+        # Baris 0-11 selalu titik mata (kiri lalu kanan)
+        self.eye_idx = tuple(self.left_eye_idx + self.right_eye_idx)
+        groups = [self.eye_idx]
+        if extra_features:
+            groups += [self.MOUTH_IDX, self.POSE_IDX]
+        if roi_mode:
+            groups.append(self.FACE_OVAL_IDX)
+
+        rows = {}
+        for idx in (i for group in groups for i in group):
+            rows.setdefault(idx, len(rows))
+        self.point_idx = tuple(rows)
+        self._points = np.empty((len(self.point_idx), 2), dtype=np.float32)
+
+        self._eye_slice = slice(0, len(self.eye_idx))
+        self._mouth_rows = np.array([rows[i] for i in self.MOUTH_IDX]) if extra_features else None
+        self._pose_rows = np.array([rows[i] for i in self.POSE_IDX]) if extra_features else None
+        self._oval_rows = np.array([rows[i] for i in self.FACE_OVAL_IDX]) if roi_mode else None
+
     # -------------------------------------------------------------------------
     # FRAME PROCESSING
     # -------------------------------------------------------------------------
-    def process_frame(self, frame):
+    def process_frame(self, frame, return_features=False):
         """
         Memproses 1 frame kamera untuk deteksi wajah & EAR.
 
         Return:
         --------
         processed_frame, ear_value, status
+        (+ FaceFeatures | None jika return_features=True; selalu tersedia
+        juga di self.last_features)
         """
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb)
-
         ear_value = None
         status = "Tidak Terdeteksi"
+        self.last_features = None
+        self.last_faces = []
+
+        if self.tier == "haar":
+            self.mesh_skipped += 1
+            self._process_presence(frame)
+        elif self.tier == "tiered" and not self._mesh_needed(frame):
+            self.mesh_skipped += 1
+            self._since_mesh += 1
+        else:
+            self.mesh_frames += 1
+            self._since_mesh = 0
+            if self.max_num_faces > 1:
+                face = self._process_multi(frame)
+            else:
+                face = self._process_single(frame)
+            self._tracking = face is not None
+            if face is not None:
+                ear_value, status = face.ear, face.status
+
+        if return_features:
+            return frame, ear_value, status, self.last_features
+        return frame, ear_value, status
+
+    def _mesh_needed(self, frame):
+        """Tier "tiered": FaceMesh hanya jika wajah sedang terlacak atau Haar menemukannya"""
+        if self._tracking or self._since_mesh >= self.recheck_interval:
+            return True
+        return self.presence.present(frame)
+
+    def _process_presence(self, frame):
+        """Tier "haar": hanya keberadaan wajah (tanpa landmark / EAR)"""
+        boxes = self.presence.detect(frame)
+        self.last_faces = [DetectedFace(None, "Tidak Terdeteksi", None, box) for box in boxes]
+        if self.draw_overlay:
+            for x0, y0, x1, y1 in boxes:
+                cv2.rectangle(frame, (int(x0), int(y0)), (int(x1), int(y1)), (0, 255, 255), 2)
+            cv2.putText(frame, f"Mode Haar: {len(boxes)} wajah (tanpa EAR)", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
+
+    def _process_single(self, frame):
+        """Satu wajah via FaceMesh (frame penuh / ROI); mengembalikan DetectedFace atau None"""
+        face_landmarks, transform = self._detect(frame)
+        if face_landmarks is None:
+            return None
+
+        # Ambil koordinat semua titik sekaligus (sub-pixel, koordinat frame penuh)
+        all_points = self._get_points(face_landmarks, *transform)
+        points = all_points[self._eye_slice]
+
+        if self.roi_mode:
+            self._update_roi(all_points[self._oval_rows], frame.shape)
 
+        # EAR kedua mata dihitung dalam satu operasi vektor
+        left_ear, right_ear = compute_ear(points.reshape(2, 6, 2))
+        ear_value = float(left_ear + right_ear) / 2.0
+
+        # Tentukan status
+        status = "Mengantuk" if ear_value <= self.threshold else "Normal"
+
+        if self.extra_features:
+            self.last_features = self._compute_features(
+                all_points, frame.shape, ear_value, float(left_ear), float(right_ear))
+        face = DetectedFace(ear_value, status, self.last_features, self._box(all_points))
+        self.last_faces = [face]
+
+        if self.draw_overlay:
+            # Gambar titik-titik landmark mata
+            self._draw_points(frame, points, (0, 255, 0))
+
+            # Tampilkan EAR & status di frame
+            cv2.putText(frame, f"EAR: {ear_value:.3f}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
+            cv2.putText(frame, f"Status: {status}", (10, 60),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
+            feats = self.last_features
+            if feats is not None and feats.pitch is not None:
+                cv2.putText(frame, f"MAR: {feats.mar:.2f}  Pitch: {feats.pitch:.0f}  Yaw: {feats.yaw:.0f}",
+                            (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1)
+        return face
+
+    def _process_multi(self, frame):
+        """
+        Semua wajah dalam satu pass FaceMesh frame penuh; mengisi last_faces
+        dan mengembalikan wajah terbesar (atau None).
+        """
+        self.full_frame_runs += 1
+        h, w = frame.shape[:2]
+        results = self.face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        faces = []
+        for landmarks in results.multi_face_landmarks or ():
+            points = self._get_points(landmarks, w, h)
+            left_ear, right_ear = compute_ear(points[self._eye_slice].reshape(2, 6, 2))
+            ear_value = float(left_ear + right_ear) / 2.0
+            status = "Mengantuk" if ear_value <= self.threshold else "Normal"
+
+            features = None
+            if self.extra_features:
+                # Pose wajah lain tidak boleh jadi tebakan awal solvePnP
+                self._pose_rvec = self._pose_tvec = None
+                features = self._compute_features(points, frame.shape, ear_value,
+                                                  float(left_ear), float(right_ear))
+            face = DetectedFace(ear_value, status, features, self._box(points))
+            faces.append(face)
+
+            if self.draw_overlay:
+                self._draw_points(frame, points[self._eye_slice], (0, 255, 0))
+                x0, y0 = int(face.box[0]), int(face.box[1])
+                cv2.putText(frame, f"EAR: {ear_value:.3f} {status}", (x0, max(15, y0 - 10)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1)
+
+        self.last_faces = faces
+        if not faces:
+            return None
+        primary = max(faces, key=lambda f: f.area)
+        self.last_features = primary.features
+        return primary
+
+    @staticmethod
+    def _box(points):
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        return float(x0), float(y0), float(x1), float(y1)
+
+    def _compute_features(self, points, frame_shape, ear, left_ear, right_ear):
+        """MAR & pose kepala dari buffer titik yang sama (tanpa inferensi tambahan)"""
+        mar = float(compute_mar(points[self._mouth_rows]))
+        pitch, yaw, roll = self._head_pose(points[self._pose_rows], frame_shape)
+        return FaceFeatures(ear, left_ear, right_ear, mar, mar >= self.mar_threshold,
+                            pitch, yaw, roll)
+
+    def _head_pose(self, image_points, frame_shape):
+        """
+        Estimasi pitch/yaw/roll (derajat) via solvePnP terhadap model wajah
+        generik. Hasil frame sebelumnya dipakai sebagai tebakan awal.
+        """
+        h, w = frame_shape[:2]
+        camera = np.array([[w, 0, w / 2.0], [0, w, h / 2.0], [0, 0, 1]], dtype=np.float64)
+        use_guess = self._pose_rvec is not None
+        try:
+            ok, rvec, tvec = cv2.solvePnP(
+                self.POSE_MODEL, image_points.astype(np.float64), camera, None,
+                rvec=self._pose_rvec.copy() if use_guess else None,
+                tvec=self._pose_tvec.copy() if use_guess else None,
+                useExtrinsicGuess=use_guess, flags=cv2.SOLVEPNP_ITERATIVE)
+        except cv2.error:
+            ok = False
+        if not ok:
+            self._pose_rvec = self._pose_tvec = None
+            return None, None, None
+
+        self._pose_rvec, self._pose_tvec = rvec, tvec
+        rot, _ = cv2.Rodrigues(rvec)
+        sy = np.hypot(rot[0, 0], rot[1, 0])
+        pitch = np.degrees(np.arctan2(rot[2, 1], rot[2, 2]))
+        yaw = np.degrees(np.arctan2(-rot[2, 0], sy))
+        roll = np.degrees(np.arctan2(rot[1, 0], rot[0, 0]))
+        return float(-pitch), float(yaw), float(roll)
+
+    def _detect(self, frame):
+        """
+        Jalankan FaceMesh pada ROI (jika ada) atau frame penuh.
+
+        Return:
+            (face_landmarks | None, (sx, sy, ox, oy)) dengan transformasi
+            koordinat ternormalisasi → piksel frame penuh: x * sx + ox
+        """
+        h, w = frame.shape[:2]
+
+        if self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            crop = frame[y0:y1, x0:x1]
+            crop = cv2.resize(crop, (self.roi_size, self.roi_size), interpolation=cv2.INTER_AREA)
+            results = self.roi_mesh.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+            if results.multi_face_landmarks:
+                self.roi_hits += 1
+                return results.multi_face_landmarks[0], (x1 - x0, y1 - y0, x0, y0)
+            # Tracking hilang → deteksi ulang di frame penuh (frame yang sama)
+            self._roi = None
+            self.roi_mesh.reset()
+
+        self.full_frame_runs += 1
+        results = self.face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
         if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0]
+            return results.multi_face_landmarks[0], (w, h, 0, 0)
+        return None, None
 
-            # Ambil koordinat mata kiri & kanan
-            left_eye = self._get_eye_points(face_landmarks, self.left_eye_idx, frame)
-            right_eye = self._get_eye_points(face_landmarks, self.right_eye_idx, frame)
+    def _update_roi(self, oval_points, frame_shape):
+        """Kotak persegi ber-padding di sekitar kontur wajah untuk frame berikutnya"""
+        h, w = frame_shape[:2]
+        (x_min, y_min), (x_max, y_max) = oval_points.min(axis=0), oval_points.max(axis=0)
+        cx, cy = (x_min + x_max) / 2.0, (y_min + y_max) / 2.0
+        half = max(x_max - x_min, y_max - y_min) * (1.0 + self.roi_padding) / 2.0
 
-            # Jika kedua mata valid
-            if left_eye and right_eye:
-                left_ear = self._calculate_ear(left_eye)
-                right_ear = self._calculate_ear(right_eye)
+        # Kotak digeser masuk ke dalam frame (bukan dipotong) agar tetap persegi;
+        # crop non-persegi akan teregang saat di-resize ke roi_size x roi_size
+        side = min(int(2 * half), w, h)
+        if side <= 16:
+            self._roi = None
+            return
+        x0 = min(max(0, int(cx - side / 2.0)), w - side)
+        y0 = min(max(0, int(cy - side / 2.0)), h - side)
+        self._roi = (x0, y0, x0 + side, y0 + side)
 
-                ear_value = (left_ear + right_ear) / 2.0
+    def reset_tracking(self):
+        """Lupakan ROI & state tracking (mis. saat sumber video berganti)"""
+        self._roi = None
+        self._pose_rvec = self._pose_tvec = None
+        self._tracking = False
+        self._since_mesh = 0
+        if self.face_mesh is not None:
+            self.face_mesh.reset()
+        if self.roi_mesh is not None:
+            self.roi_mesh.reset()
 
-                # Tentukan status
-                status = "Mengantuk" if ear_value <= self.threshold else "Normal"
+    def warmup(self, size=(480, 640)):
+        """
+        Jalankan graph pada frame kosong agar inisialisasi FaceMesh (memuat
+        model, membangun graph) tidak terjadi di frame kamera pertama.
+        State tracking & penghitung dikembalikan seperti semula.
 
-                # Gambar titik-titik landmark mata
-                self._draw_points(frame, left_eye, (0, 255, 0))
-                self._draw_points(frame, right_eye, (0, 255, 0))
+        Args:
+            size (tuple): (tinggi, lebar) frame dummy, samakan dengan kamera
 
-                # Tampilkan EAR & status di frame
-                cv2.putText(frame, f"EAR: {ear_value:.3f}", (10, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
-                cv2.putText(frame, f"Status: {status}", (10, 60),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
+        Return:
+            float: durasi pemanasan (detik)
+        """
+        started = time.perf_counter()
+        # Frame hitam: urutan kanal BGR/RGB tidak berpengaruh
+        dummy = np.zeros((size[0], size[1], 3), dtype=np.uint8)
+        if self.face_mesh is not None:
+            self.face_mesh.process(dummy)
+        if self.roi_mesh is not None:
+            self.roi_mesh.process(np.zeros((self.roi_size, self.roi_size, 3), dtype=np.uint8))
+        if self.presence is not None:
+            runs, hits = self.presence.runs, self.presence.hits
+            self.presence.detect(dummy)
+            self.presence.runs, self.presence.hits = runs, hits
+        self.reset_tracking()
+        self.warmup_seconds = time.perf_counter() - started
+        return self.warmup_seconds
 
-        return frame, ear_value, status
+    def close(self):
+        """Lepas graph MediaPipe; detector tidak bisa dipakai lagi setelahnya"""
+        if self.closed:
+            return
+        self.closed = True
+        for mesh in (self.face_mesh, self.roi_mesh):
+            if mesh is not None:
+                try:
+                    mesh.close()
+                except Exception as e:
+                    print("FaceMesh close error:", e)
+        self.face_mesh = None
+        self.roi_mesh = None
+
+    def tier_stats(self):
+        """Jumlah frame yang diproses FaceMesh vs yang dihindari tier deteksi"""
+        total = self.mesh_frames + self.mesh_skipped
+        return {
+            "tier": self.tier,
+            "mesh_frames": self.mesh_frames,
+            "mesh_skipped": self.mesh_skipped,
+            "mesh_skip_ratio": self.mesh_skipped / total if total else 0.0,
+            "presence_runs": self.presence.runs if self.presence is not None else 0,
+        }
 
     # -------------------------------------------------------------------------
     # HELPER FUNCTIONS
     # -------------------------------------------------------------------------
-    def _get_eye_points(self, landmarks, indexes, frame):
+    def _get_points(self, landmarks, sx, sy, ox=0.0, oy=0.0):
         """
-        Mengubah landmark MediaPipe ke koordinat pixel frame.
+        Mengubah landmark MediaPipe ke koordinat pixel frame (float32).
+
+        Semua titik (mata, dan kontur wajah pada roi_mode) diambil dalam satu
+        loop ke buffer yang sama, lalu diskalakan & digeser sekaligus. Tidak
+        ada pembulatan ke int sehingga presisi sub-pixel tetap terjaga.
         """
-        h, w, _ = frame.shape
-        points = []
+        buf = self._points
+        lms = landmarks.landmark
 
-        for idx in indexes:
-            lm = landmarks.landmark[idx]
-            x, y = int(lm.x * w), int(lm.y * h)
-            points.append((x, y))
+        for i, idx in enumerate(self.point_idx):
+            lm = lms[idx]
+            buf[i, 0] = lm.x
+            buf[i, 1] = lm.y
 
-        return points
+        buf *= (sx, sy)
+        if ox or oy:
+            buf += (ox, oy)
+        return buf
 
     def _calculate_ear(self, eye_points):
         """
-        Menghitung Eye Aspect Ratio (EAR).
+        Menghitung Eye Aspect Ratio (EAR) untuk satu mata (6 titik).
 
         EAR = (||p2 - p6|| + ||p3 - p5||) / (2 * ||p1 - p4||)
         """
-        p1, p2, p3, p4, p5, p6 = eye_points
+        return float(compute_ear(np.asarray(eye_points, dtype=np.float32)))
 
-        # Hitung jarak Euclidean antar titik
-        vertical_1 = dist.euclidean(p2, p6)
-        vertical_2 = dist.euclidean(p3, p5)
-        horizontal = dist.euclidean(p1, p4)
+    def _draw_points(self, frame, points, color):
+        """Menggambar titik landmark mata pada frame"""
+        for x, y in np.rint(points).astype(np.int32):
+            cv2.circle(frame, (int(x), int(y)), 2, color, -1)
 
-        if horizontal == 0:
-            return 0.0
 
-        ear = (vertical_1 + vertical_2) / (2.0 * horizontal)
-        return ear
+# Pasangan titik (a, b) untuk jarak EAR: p2-p6, p3-p5, p1-p4
+_EAR_A = np.array([1, 2, 0])
+_EAR_B = np.array([5, 4, 3])
 
-    def _draw_points(self, frame, points, color):
-        """Menggambar titik landmark mata pada frame"""
-        for (x, y) in points:
-            cv2.circle(frame, (x, y), 2, color, -1)
+
+# Pasangan titik MAR: (p2-p8, p3-p7, p4-p6) / (2 * p1-p5)
+_MAR_A = np.array([1, 2, 3, 0])
+_MAR_B = np.array([7, 6, 5, 4])
+
+
+def compute_mar(mouth_points):
+    """
+    Mouth Aspect Ratio secara vektor.
+
+    MAR = (||p2 - p8|| + ||p3 - p7|| + ||p4 - p6||) / (2 * ||p1 - p5||)
+
+    Args:
+        mouth_points (np.ndarray): Array (..., 8, 2) sesuai FaceDetector.MOUTH_IDX
+    """
+    diff = mouth_points[..., _MAR_A, :] - mouth_points[..., _MAR_B, :]
+    d = np.sqrt(np.einsum("...ij,...ij->...i", diff, diff))
+
+    vertical = d[..., 0] + d[..., 1] + d[..., 2]
+    horizontal = 2.0 * d[..., 3]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mar = np.where(horizontal > 0, vertical / horizontal, 0.0)
+    return mar
+
+
+def compute_ear(eye_points):
+    """
+    Menghitung EAR secara vektor untuk satu atau banyak mata.
+
+    Args:
+        eye_points (np.ndarray): Array (..., 6, 2) berisi p1..p6 tiap mata
+
+    Returns:
+        np.ndarray | float: EAR dengan bentuk (...). Nilai 0.0 jika jarak
+        horizontal mata = 0.
+    """
+    diff = eye_points[..., _EAR_A, :] - eye_points[..., _EAR_B, :]
+    d = np.sqrt(np.einsum("...ij,...ij->...i", diff, diff))
+
+    vertical = d[..., 0] + d[..., 1]
+    horizontal = 2.0 * d[..., 2]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ear = np.where(horizontal > 0, vertical / horizontal, 0.0)
+    return ear
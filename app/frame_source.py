@@ -0,0 +1,351 @@
+"""
+app/frame_source.py
+Lapisan sumber frame yang bisa dikonfigurasi.
+
+Semua sumber punya antarmuka yang sama dengan cv2.VideoCapture
+(read() -> (ret, frame), isOpened(), release()) sehingga bisa langsung
+dipakai CameraPipeline / CameraManager:
+
+ - OpenCVCameraSource : kamera via backend OpenCV (dshow, msmf, v4l2, ...)
+ - GStreamerSource    : pipeline GStreamer (mis. v4l2src + jpegdec di Linux)
+ - FileSource         : replay file video (opsional real-time & loop)
+ - SyntheticSource    : generator frame sintetis untuk benchmark/tes headless
+
+Konfigurasi default dibaca dari variabel lingkungan (lihat CaptureConfig.from_env).
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Nama backend → konstanta OpenCV ("auto" dipilih per platform)
+BACKENDS = {
+    "any": cv2.CAP_ANY,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "v4l2": cv2.CAP_V4L2,
+    "gstreamer": cv2.CAP_GSTREAMER,
+    "ffmpeg": cv2.CAP_FFMPEG,
+    "avfoundation": cv2.CAP_AVFOUNDATION,
+}
+
+
+def default_backend():
+    """Backend kamera bawaan per platform"""
+    if sys.platform == "win32":
+        return "dshow"      # lebih stabil di Windows
+    if sys.platform.startswith("linux"):
+        return "v4l2"
+    return "any"
+
+
+class CaptureConfig:
+    """
+    Parameter sumber frame.
+
+    Args:
+        kind (str): "camera", "gstreamer", "file", atau "synthetic"
+        device: Indeks kamera, path file, atau string pipeline GStreamer
+        backend (str): Nama backend OpenCV (lihat BACKENDS) atau "auto"
+        width, height (int): Resolusi yang diminta (None = default driver)
+        fps (float): FPS yang diminta / FPS replay & sintetis
+        fourcc (str): Format piksel kamera, mis. "MJPG" atau "YUYV"
+        buffer_size (int): Ukuran buffer driver (1 = latensi minimum)
+        loop (bool): Ulang file dari awal saat habis
+        realtime (bool): File/sintetis mengikuti FPS (False = secepat mungkin)
+    """
+
+    def __init__(self, kind="camera", device=0, backend="auto", width=None, height=None,
+                 fps=None, fourcc=None, buffer_size=1, loop=False, realtime=True):
+        self.kind = kind
+        self.device = device
+        self.backend = backend
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+        self.loop = loop
+        self.realtime = realtime
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        Konfigurasi dari variabel lingkungan:
+            EAR_SOURCE   camera:0 | file:rekaman.mp4 | synthetic | gstreamer:<pipeline>
+            EAR_BACKEND  auto | dshow | msmf | v4l2 | gstreamer | any
+            EAR_WIDTH, EAR_HEIGHT, EAR_FPS, EAR_FOURCC, EAR_BUFFER_SIZE, EAR_LOOP
+        """
+        env = os.environ if environ is None else environ
+        kind, _, device = env.get("EAR_SOURCE", "camera:0").partition(":")
+        if kind == "camera":
+            device = int(device or 0) if str(device or 0).isdigit() else device
+
+        def _num(name, type_):
+            value = env.get(name)
+            return type_(value) if value else None
+
+        return cls(
+            kind=kind,
+            device=device,
+            backend=env.get("EAR_BACKEND", "auto"),
+            width=_num("EAR_WIDTH", int),
+            height=_num("EAR_HEIGHT", int),
+            fps=_num("EAR_FPS", float),
+            fourcc=env.get("EAR_FOURCC") or None,
+            buffer_size=_num("EAR_BUFFER_SIZE", int) or 1,
+            loop=env.get("EAR_LOOP", "0") == "1",
+        )
+
+    def __repr__(self):
+        return (f"CaptureConfig(kind={self.kind!r}, device={self.device!r}, backend={self.backend!r}, "
+                f"size={self.width}x{self.height}, fps={self.fps}, fourcc={self.fourcc!r}, "
+                f"buffer_size={self.buffer_size})")
+
+
+class FrameSource:
+    """Antarmuka dasar sumber frame (kompatibel dengan cv2.VideoCapture)"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def open(self):
+        """Buka sumber. Return True jika berhasil."""
+        raise NotImplementedError
+
+    def read(self):
+        """Return (ret, frame)"""
+        raise NotImplementedError
+
+    def isOpened(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def describe(self):
+        """Info sumber setelah dibuka (resolusi/FPS/FOURCC sebenarnya)"""
+        return {"kind": self.config.kind, "device": self.config.device}
+
+
+class OpenCVCameraSource(FrameSource):
+    """Kamera melalui cv2.VideoCapture dengan backend & format yang bisa dipilih"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.cap = None
+
+    def _api_preference(self):
+        name = self.config.backend
+        if name == "auto":
+            name = default_backend()
+        if name not in BACKENDS:
+            raise ValueError(f"Backend kamera tidak dikenal: {name}")
+        return BACKENDS[name]
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.config.device, self._api_preference())
+        if not self.cap.isOpened():
+            return False
+        self._apply_settings()
+        return True
+
+    def _apply_settings(self):
+        cfg = self.config
+        # FOURCC harus di-set sebelum resolusi agar driver memilih mode yang benar
+        if cfg.fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*cfg.fourcc))
+        if cfg.width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, cfg.width)
+        if cfg.height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cfg.height)
+        if cfg.fps:
+            self.cap.set(cv2.CAP_PROP_FPS, cfg.fps)
+        if cfg.buffer_size:
+            # Buffer driver sekecil mungkin agar frame yang dibaca selalu baru
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, cfg.buffer_size)
+
+    def read(self):
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def describe(self):
+        info = super().describe()
+        if self.isOpened():
+            code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+            info.update({
+                "backend": self.cap.getBackendName(),
+                "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                "fps": self.cap.get(cv2.CAP_PROP_FPS),
+                "fourcc": "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)),
+            })
+        return info
+
+
+# FOURCC V4L2 -> nama format video/x-raw GStreamer (yang tidak ada di sini
+# dipakai apa adanya, mis. UYVY/NV12/I420 yang namanya sama)
+GST_RAW_FORMATS = {
+    "YUYV": "YUY2",
+    "YUNV": "YUY2",
+    "YU12": "I420",
+    "GREY": "GRAY8",
+    "Y800": "GRAY8",
+    "RGB3": "RGB",
+    "BGR3": "BGR",
+}
+
+
+class GStreamerSource(OpenCVCameraSource):
+    """
+    Sumber GStreamer. Jika device berupa string pipeline, dipakai apa adanya;
+    jika berupa indeks/path perangkat, pipeline v4l2src dibangun otomatis
+    (appsink drop=true max-buffers=1 → selalu frame terbaru).
+    """
+
+    def build_pipeline(self):
+        cfg = self.config
+        if isinstance(cfg.device, str) and "!" in cfg.device:
+            return cfg.device
+
+        device = cfg.device if isinstance(cfg.device, str) else f"/dev/video{cfg.device}"
+        caps = []
+        if cfg.width:
+            caps.append(f"width={cfg.width}")
+        if cfg.height:
+            caps.append(f"height={cfg.height}")
+        if cfg.fps:
+            caps.append(f"framerate={int(cfg.fps)}/1")
+        caps = "," + ",".join(caps) if caps else ""
+
+        if (cfg.fourcc or "MJPG").upper() == "MJPG":
+            decode = f"image/jpeg{caps} ! jpegdec"
+        else:
+            fmt = cfg.fourcc.upper()
+            decode = f"video/x-raw,format={GST_RAW_FORMATS.get(fmt, fmt)}{caps}"
+        return (f"v4l2src device={device} ! {decode} ! videoconvert ! "
+                f"video/x-raw,format=BGR ! appsink drop=true max-buffers={cfg.buffer_size or 1} sync=false")
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.build_pipeline(), cv2.CAP_GSTREAMER)
+        return self.cap.isOpened()
+
+
+class FileSource(OpenCVCameraSource):
+    """Replay file video; real-time mengikuti FPS file, opsional loop"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._interval = 0.0
+        self._next_due = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(str(self.config.device))
+        if not self.cap.isOpened():
+            return False
+        fps = self.config.fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._interval = 1.0 / fps if self.config.realtime else 0.0
+        self._next_due = None
+        return True
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.config.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+
+        if ret and self._interval:
+            now = time.perf_counter()
+            if self._next_due is None:
+                self._next_due = now
+            delay = self._next_due - now
+            if delay > 0:
+                time.sleep(delay)
+            self._next_due = max(self._next_due, now) + self._interval
+        return ret, frame
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generator frame sintetis (gradien bergerak + elips "wajah") dengan
+    resolusi & FPS yang dikonfigurasi. Tidak butuh kamera; cocok untuk
+    benchmark dan tes headless seluruh pipeline.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.width = config.width or 640
+        self.height = config.height or 480
+        self.fps = config.fps or 30.0
+        self._opened = False
+        self._index = 0
+        self._next_due = None
+        self._base = None
+
+    def open(self):
+        x = np.linspace(0, 255, self.width, dtype=np.float32)
+        y = np.linspace(0, 255, self.height, dtype=np.float32)[:, None]
+        gray = ((x + y) / 2).astype(np.uint8)
+        self._base = np.dstack([gray, gray, gray])
+        self._opened = True
+        self._index = 0
+        self._next_due = None
+        return True
+
+    def read(self):
+        if not self._opened:
+            return False, None
+
+        if self.config.realtime:
+            now = time.perf_counter()
+            if self._next_due is None:
+                self._next_due = now
+            delay = self._next_due - now
+            if delay > 0:
+                time.sleep(delay)
+            self._next_due = max(self._next_due, now) + 1.0 / self.fps
+
+        frame = np.roll(self._base, self._index * 4, axis=1)
+        center = (self.width // 2 + int(20 * np.sin(self._index / 15.0)), self.height // 2)
+        axes = (self.width // 6, self.height // 4)
+        cv2.ellipse(frame, center, axes, 0, 0, 360, (180, 200, 230), -1)
+        self._index += 1
+        return True, frame
+
+    def isOpened(self):
+        return self._opened
+
+    def release(self):
+        self._opened = False
+        self._base = None
+
+    def describe(self):
+        info = super().describe()
+        info.update({"width": self.width, "height": self.height, "fps": self.fps})
+        return info
+
+
+SOURCES = {
+    "camera": OpenCVCameraSource,
+    "gstreamer": GStreamerSource,
+    "file": FileSource,
+    "synthetic": SyntheticSource,
+}
+
+
+def create_source(config=None):
+    """Buat FrameSource (belum dibuka) dari CaptureConfig"""
+    config = config or CaptureConfig.from_env()
+    if config.kind not in SOURCES:
+        raise ValueError(f"Jenis sumber frame tidak dikenal: {config.kind}")
+    return SOURCES[config.kind](config)
@@ -4,27 +4,38 @@ Sistem Deteksi Mengantuk - GUI lengkap (Home / Developer / User)
 Kompatibel dengan:
  - face_detector.FaceDetector (process_frame -> (frame, ear, status))
  - ear_logger.EarLogger (append(ear,status), read_all())
- - plotter.Plotter (generate_plot -> writes ear_plot.png)
- - utils.resource_path, ensure_directories, check_camera_permission
+ - plotter.Plotter (render -> gambar RGBA di memori), plotter.LivePlot (grafik realtime)
+ - pipeline.CameraPipeline (capture -> inferensi -> render, frame terbaru saja)
+ - camera.CameraManager (satu sesi kamera dipakai ulang antar halaman)
+ - display.FrameDisplay (frame kamera ke satu PhotoImage persisten)
+ - mailbox.UiMailbox (state terbaru dari thread pipeline, di-poll thread Tk)
+ - alerts.AlertEngine (peringatan bertingkat non-blocking: banner, nada, alarm)
+ - utils.resource_path, ensure_directories
+
+Modul berat (cv2, mediapipe, pandas, matplotlib, PIL) tidak di-import di level
+atas: halaman utama langsung tampil, lalu _load_components memuatnya di thread
+latar selagi user memilih mode.
 """
 
 import os
 import time
 import threading
+from collections import deque
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
-import cv2                                # OpenCV: wajib untuk akses kamera
-from PIL import Image, ImageTk
-
-from app.face_detector import FaceDetector
-from app.ear_logger import EarLogger
-from app.plotter import Plotter
+from app.pipeline import CameraPipeline
+from app.scheduler import AdaptiveScheduler
+from app.calibration import Calibrator, DriverProfile
+from app.temporal import TemporalAnalyzer, NodDetector
+from app.mailbox import UiMailbox
 from app.utils import (
     resource_path,
     ensure_directories,
-    check_camera_permission
+    default_log_path,
+    default_detector_tier,
+    default_detector_roi
 )
 
 
@@ -40,20 +51,59 @@ class MainApplication(tk.Frame):
         # Pastikan direktori data/resources ada
         ensure_directories()
 
-        # Core components (dependensi harus ada)
-        self.face_detector = FaceDetector()                        # process_frame(frame) -> (frame, ear, status)
-        self.ear_logger = EarLogger(os.path.join("data", "ear_log.csv"))
-        self.plotter = Plotter(self.ear_logger, out_path="ear_plot.png")
+        # Core components: dibangun di thread latar oleh _load_components
+        # (import cv2/mediapipe/pandas/matplotlib), None sampai siap
+        self.face_detector = None          # process_frame(frame) -> (frame, ear, status)
+        self.ear_logger = None
+        self.plotter = None
+        self.components_ready = False
+        self.load_error = None
+        self.load_seconds = None
+        self.load_stage = "Memuat detektor..."
+        self._pending_page = None          # halaman yang diminta sebelum komponen siap
+        self._closing = False
+        self._logo_images = {}             # ukuran -> gambar PIL yang sudah di-resize
+        self.live_plot = None
+        self.display = None                 # FrameDisplay halaman aktif (dev/user)
+        # Thread pipeline hanya menulis ke mailbox; thread Tk me-poll-nya
+        # pada laju tampilan dan menerapkan semua perubahan sekaligus
+        self.mailbox = UiMailbox(history=20)
+        self.ui_refresh_ms = 30
+        self._history_seq = 0
+        self._history_items = deque(maxlen=20)   # item id Treeview (lama -> baru)
+        self.plot_refresh_ms = 250
+        # Riwayat EAR (seq, ear) di memori untuk grafik realtime; ditulis
+        # thread inferensi, dibaca Tk tanpa menyentuh file log
+        self._plot_samples = deque(maxlen=1000)
+        self._plot_seq = 0
+        self._plot_drawn = 0
+        self._plot_photo = None             # PhotoImage grafik yang dipakai ulang
 
         # Camera / thread control
+        # Kamera dibuka sekali di background dan dipakai ulang antar halaman
+        self.camera = None
         self.cap = None
-        self.camera_thread = None
+        self.pipeline = None
+        # Pipeline yang stop()-nya timeout: thread inferensi mungkin masih
+        # memakai face_detector / kamera
+        self._stopping_pipeline = None
         self.is_camera_running = False
+        self._camera_started_at = None   # perf_counter saat kamera diminta (waktu ke EAR pertama)
         self.current_frame = None    # "home" / "developer" / "user"
-        self.last_alert_time = 0
-        self.alert_cooldown = 30     # detik, cooldown popup
-        self.low_ear_counter = 0
-        self.consecutive_threshold = 3  # butuh 3 frame berturut-turut (atau sampling) untuk alert
+        # Peringatan bertingkat (banner -> nada -> alarm) di thread dispatch
+        # sendiri; banner GUI menerima peringatan lewat mailbox
+        self.alerts = None
+        # Smoothing, kedipan & PERCLOS berbasis waktu (tidak tergantung FPS);
+        # threshold dikirim per update() dari detector
+        self.temporal = TemporalAnalyzer()
+        self.temporal_state = None
+        self.nods = NodDetector()
+        self.last_features = None
+
+        # Kalibrasi threshold per pengemudi
+        self.calibrator = None
+        self.calibration_seconds = 30
+        self.driver_profile = None
 
         # Tk placeholders
         self.logo_photo = None
@@ -64,13 +114,167 @@ class MainApplication(tk.Frame):
         self._build_base_ui()
         self.show_home_page()
 
+        # Muat komponen berat & buka kamera selagi user memilih mode (tidak memblokir Tk)
+        self._poll_ui()
+        threading.Thread(target=self._load_components, name="component-loader", daemon=True).start()
+
         # Handle close
         self.master.protocol("WM_DELETE_WINDOW", self._on_close)
 
+    # ---------------------------------------------------------------------
+    # Komponen berat (thread latar)
+    # ---------------------------------------------------------------------
+    def _load_components(self):
+        """Import modul berat & bangun komponen inti, lalu kabari thread Tk"""
+        started = time.perf_counter()
+        self._prepare_logos()
+        self.mailbox.push_event("assets_ready")
+        try:
+            from app.camera import CameraManager
+            from app.ear_logger import EarLogger
+            from app.face_detector import FaceDetector
+            from app.plotter import Plotter
+            from app.alerts import AlertEngine, CallbackSink, sinks_from_env
+            import app.display  # noqa: F401  (cv2 sudah termuat, halaman kamera tidak menunggu)
+
+            camera = CameraManager()
+            camera.open_async()
+            ear_logger = EarLogger(default_log_path())
+            plotter = Plotter(ear_logger, out_path="ear_plot.png")
+            face_detector = FaceDetector(tier=default_detector_tier(),
+                                         roi_mode=default_detector_roi())
+            alerts = AlertEngine(
+                [CallbackSink(lambda alert: self.mailbox.push_event("alert", alert))] + sinks_from_env()
+            ).start()
+
+            # Inisialisasi graph FaceMesh di sini, bukan di frame kamera pertama
+            self.mailbox.push_event("load_stage", "Memanaskan detektor...")
+            face_detector.warmup()
+        except Exception as e:
+            print("Component load error:", e)
+            self.mailbox.push_event("components_failed", str(e))
+            return
+
+        self.camera, self.ear_logger, self.plotter = camera, ear_logger, plotter
+        self.face_detector, self.alerts = face_detector, alerts
+        if self._closing:
+            # Jendela ditutup selagi memuat: mainloop tidak akan mengambil event lagi
+            self._close_components()
+            return
+        self.mailbox.push_event("components_ready", time.perf_counter() - started)
+
+    def _prepare_logos(self):
+        """Resize logo sekali (thread latar); PhotoImage dibuat di thread Tk"""
+        logo_path = resource_path(os.path.join("app", "resources", "logo_pens.png"))
+        if not os.path.exists(logo_path):
+            return
+        try:
+            from PIL import Image
+
+            img = Image.open(logo_path)
+            for size in (120, 80, 60):
+                self._logo_images[size] = img.resize((size, size), Image.Resampling.LANCZOS)
+        except Exception as e:
+            print("Logo load error:", e)
+
+    def _logo_photo(self, size):
+        """PhotoImage logo ukuran size, atau None jika belum / tidak tersedia"""
+        img = self._logo_images.get(size)
+        if img is None:
+            return None
+        from PIL import ImageTk
+
+        return ImageTk.PhotoImage(img)
+
+    def _on_components_ready(self, seconds):
+        self.components_ready = True
+        self.load_seconds = seconds
+        print(f"Komponen siap dalam {seconds:.2f} s "
+              f"(pemanasan detektor {self.face_detector.warmup_seconds * 1000:.0f} ms)")
+        self._update_ready_label()
+        page, self._pending_page = self._pending_page, None
+        if page is not None:
+            page()
+
+    def _on_components_failed(self, error):
+        self.load_error = error
+        self._pending_page = None
+        self._update_ready_label()
+        messagebox.showerror("Error", f"Gagal memuat komponen deteksi: {error}")
+
+    def _require_components(self, show_page):
+        """
+        True jika komponen sudah siap. Jika belum, show_page dijalankan
+        otomatis setelah _load_components selesai.
+        """
+        if self.components_ready:
+            return True
+        if self.load_error:
+            messagebox.showerror("Error", f"Komponen deteksi tidak tersedia: {self.load_error}")
+            return False
+        self._pending_page = show_page
+        self._update_ready_label()
+        return False
+
+    def _readiness_text(self):
+        if self.components_ready:
+            return (f"Detektor siap ({self.load_seconds:.1f} s, pemanasan "
+                    f"{self.face_detector.warmup_seconds * 1000:.0f} ms)"), "green"
+        if self.load_error:
+            return "Detektor gagal dimuat", "red"
+        if self._pending_page is not None:
+            return f"{self.load_stage} halaman dibuka otomatis setelah siap", "#E65100"
+        return self.load_stage, "gray"
+
+    def _reset_tracking_state(self):
+        """
+        Reset state per sesi saat pindah halaman. Graph FaceMesh tidak
+        dibangun ulang: hanya ROI/tracking detector yang dilupakan.
+        """
+        self.temporal.reset()
+        self.nods.reset()
+        self.last_features = None
+        if self.face_detector is not None:
+            if self._pipeline_idle():
+                self.face_detector.reset_tracking()
+            else:
+                print("Thread inferensi belum berhenti; reset tracking dilewati")
+
+    def _pipeline_idle(self, timeout=0.0):
+        """True jika tidak ada thread pipeline lama yang masih berjalan"""
+        if self._stopping_pipeline is None:
+            return True
+        if not self._stopping_pipeline.stop(timeout=timeout):
+            return False
+        self._stopping_pipeline = None
+        return True
+
+    def _update_ready_label(self):
+        if self.current_frame != "home":
+            return
+        text, fg = self._readiness_text()
+        try:
+            self.ready_label.config(text=text, fg=fg)
+        except tk.TclError:
+            pass
+
+    def _show_home_logo(self):
+        if self.current_frame != "home" or self.logo_photo is not None:
+            return
+        self.logo_photo = self._logo_photo(120)
+        if self.logo_photo is not None:
+            try:
+                self.home_logo_label.config(image=self.logo_photo)
+            except tk.TclError:
+                pass
+
     # ---------------------------------------------------------------------
     # Base UI
     # ---------------------------------------------------------------------
     def _build_base_ui(self):
+        # Banner peringatan (non-modal) di atas semua halaman; disembunyikan saat normal
+        self.alert_banner = tk.Label(self, text="", font=("Arial", 16, "bold"),
+                                     bg="orange", fg="white", pady=8)
         self.container = tk.Frame(self)
         self.container.pack(fill=tk.BOTH, expand=True)
 
@@ -82,18 +286,13 @@ class MainApplication(tk.Frame):
         self._stop_camera_if_running()
         self._clear_container()
         self.current_frame = "home"
-        self.low_ear_counter = 0
+        self._reset_tracking_state()
 
-        # Logo (resource_path untuk PyInstaller)
-        logo_path = resource_path(os.path.join("app", "resources", "logo_pens.png"))
-        if os.path.exists(logo_path):
-            try:
-                img = Image.open(logo_path).resize((120, 120), Image.Resampling.LANCZOS)
-                self.logo_photo = ImageTk.PhotoImage(img)
-                lbl = tk.Label(self.container, image=self.logo_photo)
-                lbl.pack(pady=10)
-            except Exception as e:
-                print("Logo load error:", e)
+        # Logo dipasang begitu _prepare_logos selesai (event "assets_ready")
+        self.home_logo_label = tk.Label(self.container)
+        self.home_logo_label.pack(pady=10)
+        self.logo_photo = None
+        self._show_home_logo()
 
         title = tk.Label(self.container, text="SISTEM DETEKSI MENGANTUK", font=("Arial", 22, "bold"))
         title.pack(pady=8)
@@ -101,6 +300,10 @@ class MainApplication(tk.Frame):
         sub = tk.Label(self.container, text="Politeknik Elektronika Negeri Surabaya", font=("Arial", 12))
         sub.pack(pady=2)
 
+        text, fg = self._readiness_text()
+        self.ready_label = tk.Label(self.container, text=text, fg=fg, font=("Arial", 10))
+        self.ready_label.pack(pady=(6, 0))
+
         btn_frame = tk.Frame(self.container)
         btn_frame.pack(pady=30)
 
@@ -130,25 +333,22 @@ class MainApplication(tk.Frame):
 
     def show_developer_page(self):
         """Halaman Developer lengkap: status, histori, kamera besar, grafik"""
+        if not self._require_components(self.show_developer_page):
+            return
         self._stop_camera_if_running()
         self._clear_container()
         self.current_frame = "developer"
-        self.low_ear_counter = 0
+        self._reset_tracking_state()
 
         # Header
         header = tk.Frame(self.container)
         header.pack(fill=tk.X, padx=10, pady=6)
 
         # logo small
-        logo_path = resource_path(os.path.join("app", "resources", "logo_pens.png"))
-        if os.path.exists(logo_path):
-            try:
-                img = Image.open(logo_path).resize((80, 80), Image.Resampling.LANCZOS)
-                self.dev_logo_photo = ImageTk.PhotoImage(img)
-                logo_lbl = tk.Label(header, image=self.dev_logo_photo)
-                logo_lbl.pack(side="left", padx=6)
-            except Exception as e:
-                print("Dev logo load error:", e)
+        self.dev_logo_photo = self._logo_photo(80)
+        if self.dev_logo_photo is not None:
+            logo_lbl = tk.Label(header, image=self.dev_logo_photo)
+            logo_lbl.pack(side="left", padx=6)
 
         title = tk.Label(header, text="MODE DEVELOPER - SISTEM DETEKSI MENGANTUK",
                          font=("Arial", 16, "bold"))
@@ -178,6 +378,12 @@ class MainApplication(tk.Frame):
         self.time_label = tk.Label(status_frame, text="", font=("Arial", 12))
         self.time_label.pack(anchor="w", padx=6, pady=2)
 
+        self.perf_label = tk.Label(status_frame, text="FPS: --", font=("Arial", 9), fg="gray")
+        self.perf_label.pack(anchor="w", padx=6, pady=2)
+
+        self.features_label = tk.Label(status_frame, text="MAR: --  Pose: --", font=("Arial", 9), fg="gray")
+        self.features_label.pack(anchor="w", padx=6, pady=2)
+
         history_frame = tk.LabelFrame(left_panel, text="Histori Kondisi (20 Terakhir)")
         history_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
@@ -191,6 +397,10 @@ class MainApplication(tk.Frame):
         self.history_tree.configure(yscrollcommand=scroll.set)
         self.history_tree.pack(side="left", fill=tk.BOTH, expand=True)
         scroll.pack(side="right", fill="y")
+        # Isi ulang dari histori mailbox (tabel baru setiap halaman dibangun)
+        self._history_items.clear()
+        rows, self._history_seq = self.mailbox.snapshot_history()
+        self._insert_history(rows)
 
         # Left control buttons
         control_frame = tk.Frame(left_panel)
@@ -204,12 +414,19 @@ class MainApplication(tk.Frame):
                                 bg="#FF9800", fg="white", width=18)
         refresh_btn.pack(side="left", padx=4)
 
+        calib_btn = tk.Button(control_frame, text="Kalibrasi", command=self.start_calibration,
+                              bg="#9C27B0", fg="white", width=12)
+        calib_btn.pack(side="left", padx=4)
+
         # Right: camera display and plot
         camera_frame = tk.LabelFrame(right_panel, text="Kamera Live - Deteksi Wajah")
         camera_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         self.camera_label = tk.Label(camera_frame, text="Kamera tidak aktif", bg="black", fg="white")
         self.camera_label.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
+        from app.display import FrameDisplay
+
+        self.display = FrameDisplay(self.master, self.camera_label, (480, 360), schedule=False)
 
         plot_frame = tk.LabelFrame(right_panel, text="Grafik EAR Realtime")
         plot_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -221,26 +438,24 @@ class MainApplication(tk.Frame):
         self._start_camera_thread()
         self._schedule_update_time()
         self.update_plot()
+        self._schedule_plot_refresh()
 
     def show_user_page(self):
         """Halaman User: indikator besar, preview kecil, tombol data"""
+        if not self._require_components(self.show_user_page):
+            return
         self._stop_camera_if_running()
         self._clear_container()
         self.current_frame = "user"
-        self.low_ear_counter = 0
+        self._reset_tracking_state()
 
         header = tk.Frame(self.container)
         header.pack(pady=(6, 12))
 
-        logo_path = resource_path(os.path.join("app", "resources", "logo_pens.png"))
-        if os.path.exists(logo_path):
-            try:
-                img = Image.open(logo_path).resize((60, 60), Image.Resampling.LANCZOS)
-                self.user_logo_photo = ImageTk.PhotoImage(img)
-                logo_lbl = tk.Label(header, image=self.user_logo_photo)
-                logo_lbl.pack(side="left", padx=6)
-            except Exception as e:
-                print("User logo load error:", e)
+        self.user_logo_photo = self._logo_photo(60)
+        if self.user_logo_photo is not None:
+            logo_lbl = tk.Label(header, image=self.user_logo_photo)
+            logo_lbl.pack(side="left", padx=6)
 
         title = tk.Label(header, text="MODE PENGGUNA", font=("Arial", 18, "bold"))
         title.pack(side="left", padx=6)
@@ -263,6 +478,9 @@ class MainApplication(tk.Frame):
         self.user_camera_label = tk.Label(cam_frame, text="Kamera belum aktif", bg="black", fg="white",
                                           width=40, height=10)
         self.user_camera_label.pack(padx=6, pady=6)
+        from app.display import FrameDisplay
+
+        self.display = FrameDisplay(self.master, self.user_camera_label, (320, 240), schedule=False)
 
         # Buttons
         btn_frame = tk.Frame(self.container)
@@ -276,14 +494,20 @@ class MainApplication(tk.Frame):
                              bg="#4CAF50", fg="white", width=16)
         data_btn.grid(row=0, column=1, padx=8)
 
+        calib_btn = tk.Button(btn_frame, text="Kalibrasi", command=self.start_calibration,
+                              bg="#9C27B0", fg="white", width=16)
+        calib_btn.grid(row=0, column=2, padx=8)
+
         # Start camera and user-time update
         self._start_camera_thread()
         self._schedule_update_user_time()
 
     def show_user_data(self):
         """Popup yang menampilkan grafik & log terbaru (Mode user)"""
+        from PIL import Image, ImageTk
+
         try:
-            self.plotter.generate_plot()
+            plot_rgba = self.plotter.render(dpi=90)
             win = tk.Toplevel(self.master)
             win.title("Data Deteksi Mengantuk - Mode User")
             win.geometry("760x560")
@@ -291,8 +515,8 @@ class MainApplication(tk.Frame):
             header = tk.Label(win, text="DATA HISTORIS DETEKSI MENGANTUK", font=("Arial", 14, "bold"))
             header.pack(pady=8)
 
-            if os.path.exists("ear_plot.png"):
-                img = Image.open("ear_plot.png").resize((720, 360), Image.Resampling.LANCZOS)
+            if plot_rgba is not None:
+                img = Image.fromarray(plot_rgba).resize((720, 360), Image.Resampling.LANCZOS)
                 photo = ImageTk.PhotoImage(img)
                 lbl = tk.Label(win, image=photo)
                 lbl.image = photo
@@ -329,158 +553,196 @@ class MainApplication(tk.Frame):
     # Camera management & loop
     # ---------------------------------------------------------------------
     def _start_camera_thread(self):
-        """Start camera thread kalau belum jalan"""
+        """Start camera pipeline kalau belum jalan (kamera dibuka async bila perlu)"""
         if self.is_camera_running:
             return
 
-        # quick camera permission check
-        if not check_camera_permission():
-            messagebox.showerror("Error Kamera", "Tidak dapat mengakses kamera. Tutup aplikasi lain yang menggunakan kamera atau cek permission.")
+        page = self.current_frame
+        self._camera_started_at = time.perf_counter()
+        if self.camera.is_open:
+            self._start_pipeline()
             return
 
-        try:
-            # CAP_DSHOW lebih stabil di Windows
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            if not self.cap.isOpened():
-                messagebox.showerror("Error Kamera", "Gagal membuka kamera.")
-                return
+        self._set_camera_placeholder("Membuka kamera...")
+        # Callback datang dari thread pembuka → teruskan ke thread Tk lewat mailbox
+        self.camera.open_async(
+            lambda ok, error: self.mailbox.push_event("camera_opened", ok, error, page))
 
+    def _on_camera_opened(self, ok, error, page):
+        """Dipanggil di thread Tk setelah kamera selesai dibuka"""
+        if page != self.current_frame or self.is_camera_running:
+            # User sudah pindah halaman selama kamera dibuka
+            return
+        if not ok:
+            self._set_camera_placeholder("Kamera tidak aktif")
+            messagebox.showerror("Error Kamera",
+                                 f"{error}\nTutup aplikasi lain yang menggunakan kamera atau cek permission.")
+            return
+        self._start_pipeline()
+
+    def _start_pipeline(self):
+        session_started = False
+        try:
+            # Dua thread inferensi tidak boleh memakai face_detector bersamaan
+            if not self._pipeline_idle(timeout=2.0):
+                raise RuntimeError("thread inferensi sebelumnya belum berhenti")
+            # Sesi dibuka sebelum pipeline jalan: start_session() mem-flush
+            # buffer dulu, jadi hasil pertama harus sudah masuk sesi baru
+            self.ear_logger.start_session(self.current_frame)
+            session_started = True
+            self.cap = self.camera.cap
             self.is_camera_running = True
-            self.camera_thread = threading.Thread(target=self._camera_loop, daemon=True)
-            self.camera_thread.start()
-            print("Camera thread started")
+            self.pipeline = CameraPipeline(self.cap, self.face_detector,
+                                           on_result=self._handle_result,
+                                           on_render=self._render_result,
+                                           scheduler=AdaptiveScheduler())
+            self.pipeline.start(started_at=self._camera_started_at)
+            print("Camera pipeline started")
 
         except Exception as e:
-            messagebox.showerror("Error", f"Gagal memulai kamera: {e}")
+            # Jangan tinggalkan thread pipeline yatim / sesi terbuka
+            if self.pipeline is not None:
+                if not self.pipeline.stop(timeout=1.0):
+                    self._stopping_pipeline = self.pipeline
+                self.pipeline = None
+            if session_started:
+                try:
+                    self.ear_logger.end_session()
+                except Exception as end_error:
+                    print("Logger session error:", end_error)
+            self.cap = None
             self.is_camera_running = False
+            messagebox.showerror("Error", f"Gagal memulai kamera: {e}")
+
+    def _set_camera_placeholder(self, text):
+        label = {"developer": "camera_label", "user": "user_camera_label"}.get(self.current_frame)
+        if label and hasattr(self, label):
+            try:
+                getattr(self, label).config(text=text)
+            except tk.TclError:
+                pass
 
     def _stop_camera_if_running(self):
-        """Stop camera safely when switching pages"""
+        """Stop pipeline saat pindah halaman (sesi kamera tetap terbuka)"""
         if self.is_camera_running:
             self.is_camera_running = False
-            # Wait a little for thread to finish
-            if self.camera_thread and self.camera_thread.is_alive():
-                self.camera_thread.join(timeout=1.0)
-            # Release capture
-            try:
-                if self.cap:
-                    self.cap.release()
-            except Exception:
-                pass
+            # Hentikan semua thread pipeline; capture dipakai lagi halaman berikutnya
+            if self.pipeline:
+                if not self.pipeline.stop(timeout=1.0):
+                    self._stopping_pipeline = self.pipeline
+                self.pipeline = None
             self.cap = None
-            print("Camera stopped via _stop_camera_if_running")
-
-    def _camera_loop(self):
-        """Loop capture & processing. Menjalankan face_detector dan update UI via master.after"""
-        last_plot_update = 0
-
-        while self.is_camera_running and self.cap:
+            self.alerts.reset()
             try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    # kalau read gagal, coba delay dan ulang
-                    print("Camera read failed")
-                    time.sleep(0.1)
-                    continue
-
-                processed, ear_value, status = self.face_detector.process_frame(frame)
-
-                # Logging & alert logic
-                if ear_value is not None:
-                    # Append to CSV (include status)
-                    try:
-                        self.ear_logger.append(ear_value, status)
-                    except Exception as e:
-                        print("Logger append error:", e)
-
-                    # Consecutive logic (menggunakan status agar lebih robust)
-                    if status == "Mengantuk":
-                        self.low_ear_counter += 1
-                    else:
-                        self.low_ear_counter = 0
-
-                    # Trigger alert only when threshold of consecutive frames reached and cooldown passed
-                    now_ts = time.time()
-                    if self.low_ear_counter >= self.consecutive_threshold and (now_ts - self.last_alert_time) >= self.alert_cooldown:
-                        # schedule alert on main thread
-                        self.master.after(0, self._trigger_alert_ui)
-                        self.last_alert_time = now_ts
-                        self.low_ear_counter = 0
-
-                    # schedule GUI status update
-                    self.master.after(0, self._update_status_ui, ear_value, status)
-
-                # Prepare image for display (RGB)
-                try:
-                    rgb = cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
-                    img = Image.fromarray(rgb)
-                except Exception as e:
-                    print("Error converting frame for display:", e)
-                    time.sleep(0.05)
-                    continue
-
-                # size selection by mode
-                if self.current_frame == "developer":
-                    img = img.resize((480, 360), Image.Resampling.LANCZOS)
-                else:
-                    img = img.resize((320, 240), Image.Resampling.LANCZOS)
+                self.ear_logger.end_session()
+            except Exception as e:
+                print("Logger session error:", e)
+            print("Camera stopped via _stop_camera_if_running")
 
-                photo = ImageTk.PhotoImage(img)
+    def _handle_result(self, result):
+        """Dipanggil di thread inferensi: logging, logika alert & update status"""
+        ear_value, status = result.ear, result.status
+        # Waktu tangkap frame (perf_counter), bukan saat hasil ditangani:
+        # jendela PERCLOS & durasi tertutup tidak ikut jitter antrian
+        now_ts = result.captured_at
+
+        # Analisis temporal juga perlu tahu saat wajah hilang
+        state = self.temporal.update(ear_value, now_ts, self.face_detector.threshold)
+        self.temporal_state = state
+        features = result.features
+        self.last_features = features
+        self.nods.update(features.pitch if features is not None else None, now_ts)
+
+        # Mata tertutup terlalu lama / PERCLOS tinggi / kepala mengangguk.
+        # Level & pengulangan diatur AlertEngine (tanpa blocking)
+        reason = state.reason or self.nods.reason
+        self.alerts.update(reason is not None, reason, result.captured_at)
+        if ear_value is None:
+            return
 
-                # schedule image update in main thread
-                self.master.after(0, self._update_camera_image, photo, self.current_frame)
+        # Kalibrasi berjalan: kumpulkan statistik streaming
+        calibrator = self.calibrator
+        if calibrator is not None:
+            calibrator.add(ear_value)
+            if calibrator.done:
+                self.calibrator = None
+                self.mailbox.push_event("calibration_done", calibrator)
 
-                # periodic plot update (every 5 seconds)
-                if time.time() - last_plot_update >= 5:
-                    last_plot_update = time.time()
-                    self.master.after(0, self.update_plot)
+        # Append to CSV (include status)
+        try:
+            self.ear_logger.append(ear_value, status)
+        except Exception as e:
+            print("Logger append error:", e)
 
-                # sleep to target ~10 Hz
-                time.sleep(0.1)
+        # State terbaru untuk label status (yang lama langsung tertimpa)
+        self.mailbox.post(ear=ear_value, status=status)
+        self.mailbox.add_history((datetime.now().strftime("%H:%M:%S"), ear_value, status))
 
-            except Exception as e:
-                print("Error in camera loop:", e)
-                break
+        # sampel untuk grafik realtime (diambil oleh _schedule_plot_refresh)
+        self._plot_seq += 1
+        self._plot_samples.append((self._plot_seq, ear_value))
 
-        # cleanup when loop ends
-        try:
-            if self.cap:
-                self.cap.release()
-        except Exception:
-            pass
-        self.is_camera_running = False
-        print("Camera loop ended")
+    def _render_result(self, result):
+        """Dipanggil di thread render: resize ke buffer tampilan halaman aktif"""
+        display = self.display
+        if display is not None:
+            display.submit(result.frame)
 
     # ---------------------------------------------------------------------
     # GUI updates & helpers
     # ---------------------------------------------------------------------
-    def _update_camera_image(self, photo, mode):
-        """Update camera display depending on mode"""
-        if mode != self.current_frame:
-            # ignore old frame updates when mode switched
-            return
-        if mode == "developer":
-            self.camera_label.configure(image=photo)
-            self.camera_label.image = photo
-        elif mode == "user":
-            self.user_camera_label.configure(image=photo)
-            self.user_camera_label.image = photo
+
+    def _poll_ui(self):
+        """
+        Loop refresh thread Tk: ambil state/event terbaru dari mailbox dan
+        terapkan dalam satu batch, lalu gambar frame kamera terbaru.
+        """
+        try:
+            state, events, rows, self._history_seq = self.mailbox.take(self._history_seq)
+            if "status" in state:
+                self._update_status_ui(state["ear"], state["status"])
+            if rows and self.current_frame == "developer":
+                self._insert_history(rows)
+            for name, args in events:
+                self._handle_ui_event(name, args)
+            if self.display is not None:
+                self.display.draw()
+        except Exception as e:
+            print("UI refresh error:", e)
+        self.master.after(self.ui_refresh_ms, self._poll_ui)
+
+    def _handle_ui_event(self, name, args):
+        if name == "alert":
+            self._show_alert(*args)
+        elif name == "calibration_done":
+            self._finish_calibration(*args)
+        elif name == "camera_opened":
+            self._on_camera_opened(*args)
+        elif name == "assets_ready":
+            self._show_home_logo()
+        elif name == "load_stage":
+            self.load_stage = args[0]
+            self._update_ready_label()
+        elif name == "components_ready":
+            self._on_components_ready(*args)
+        elif name == "components_failed":
+            self._on_components_failed(*args)
+
+    def _insert_history(self, rows):
+        """Tambah baris baru di atas tabel; baris tertua dihapus (maks 20, tanpa get_children)"""
+        try:
+            for ts, ear_value, status in rows:
+                if len(self._history_items) == self._history_items.maxlen:
+                    self.history_tree.delete(self._history_items.popleft())
+                self._history_items.append(
+                    self.history_tree.insert("", 0, values=(ts, f"{ear_value:.3f}", status)))
+        except tk.TclError as e:
+            print("History insert error:", e)
 
     def _update_status_ui(self, ear_value, status):
-        """Update status labels and history tree"""
+        """Update status labels (dipanggil sekali per refresh dengan state terbaru)"""
         if self.current_frame == "developer":
-            # status label & time
             self.status_label.config(text=f"Status: {status}", fg="red" if status == "Mengantuk" else "green")
-            # insert history top
-            ts = datetime.now().strftime("%H:%M:%S")
-            try:
-                self.history_tree.insert("", 0, values=(ts, f"{ear_value:.3f}", status))
-                # maintain only last 20 rows
-                children = self.history_tree.get_children()
-                if len(children) > 20:
-                    self.history_tree.delete(children[-1])
-            except Exception as e:
-                print("History insert error:", e)
         elif self.current_frame == "user":
             try:
                 self.ear_label.config(text=f"EAR: {ear_value:.3f}")
@@ -491,20 +753,94 @@ class MainApplication(tk.Frame):
             else:
                 self.status_indicator.config(text="NORMAL\nSELAMAT BERKENDARA", bg="green")
 
-    def _trigger_alert_ui(self):
-        """Show alert popup on main thread"""
-        if self.current_frame == "user":
-            messagebox.showwarning("PERINGATAN MENGANTUK",
-                                   "⚠️ KONDISI MENGANTUK TERDETEKSI! ⚠️\n\nSegera istirahat dan berhenti berkendara!")
+    def _show_alert(self, alert):
+        """Tampilkan / sembunyikan banner peringatan (tanpa dialog modal)"""
+        from app.alerts import LEVEL_CLEAR, LEVEL_TONE, LEVEL_ALARM
+
+        if alert.level == LEVEL_CLEAR:
+            self.alert_banner.pack_forget()
+            return
+        if alert.level >= LEVEL_ALARM:
+            text, bg = "⚠️ BAHAYA MENGANTUK! SEGERA BERHENTI DAN ISTIRAHAT! ⚠️", "red"
+        elif alert.level >= LEVEL_TONE:
+            text, bg = "⚠️ KONDISI MENGANTUK TERDETEKSI - segera istirahat", "#E65100"
         else:
-            messagebox.showwarning("Peringatan Mengantuk", "Kondisi mengantuk terdeteksi! EAR ≤ threshold.")
+            text, bg = "Kondisi mengantuk terdeteksi", "orange"
+        if alert.reason:
+            text += f"\n({alert.reason})"
+        self.alert_banner.config(text=text, bg=bg)
+        if not self.alert_banner.winfo_ismapped():
+            self.alert_banner.pack(fill=tk.X, before=self.container)
+
+    # ---------------------------------------------------------------------
+    # Kalibrasi pengemudi
+    # ---------------------------------------------------------------------
+    def start_calibration(self):
+        """Muat profil pengemudi atau mulai kalibrasi threshold baru"""
+        name = simpledialog.askstring("Kalibrasi", "Nama pengemudi:")
+        if not name:
+            return
+
+        profile = DriverProfile.load(name)
+        if profile is not None and not messagebox.askyesno(
+                "Kalibrasi",
+                f"Profil '{profile.name}' ditemukan (threshold {profile.threshold:.3f}).\n"
+                "Kalibrasi ulang?"):
+            self._apply_profile(profile)
+            return
+
+        self.driver_profile = DriverProfile(name, self.face_detector.threshold)
+        self.calibrator = Calibrator(duration=self.calibration_seconds)
+        messagebox.showinfo("Kalibrasi",
+                            f"Lihat ke depan dengan mata terbuka seperti biasa selama "
+                            f"{self.calibration_seconds} detik.")
+
+    def _finish_calibration(self, calibrator):
+        name = self.driver_profile.name if self.driver_profile else "default"
+        profile = calibrator.build_profile(name)
+        if profile.threshold is None:
+            messagebox.showerror("Kalibrasi", "Kalibrasi gagal: wajah tidak terdeteksi.")
+            return
+        try:
+            profile.save()
+        except Exception as e:
+            print("Profile save error:", e)
+        self._apply_profile(profile)
+        messagebox.showinfo("Kalibrasi",
+                            f"Kalibrasi selesai untuk {profile.name}.\n"
+                            f"EAR normal: {profile.baseline_median:.3f}\n"
+                            f"Threshold baru: {profile.threshold:.3f}")
+
+    def _apply_profile(self, profile):
+        """Pakai threshold profil di detector, grafik, dan grafik realtime"""
+        self.driver_profile = profile
+        self.face_detector.threshold = profile.threshold
+        self.plotter.set_threshold(profile.threshold)
+        if self.live_plot is not None:
+            self.live_plot.set_threshold(profile.threshold)
+        print(f"Profil {profile.name}: threshold {profile.threshold:.3f}")
 
     def _schedule_update_time(self):
         if self.current_frame == "developer":
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.time_label.config(text=f"Waktu: {now}")
+            if self.pipeline:
+                a = self.alerts.stats()
+                self.perf_label.config(text=f"{self.pipeline.format_stats()} | alert {a['sent']}x, "
+                                            f"latensi {a['latency_ms']:.0f} ms (maks {a['max_latency_ms']:.0f})")
+            self.features_label.config(text=self._format_features())
             self.master.after(1000, self._schedule_update_time)
 
+    def _format_features(self):
+        """Ringkasan MAR, pose kepala & anggukan untuk halaman developer"""
+        feats = self.last_features
+        if feats is None:
+            return "MAR: --  Pose: --"
+        text = f"MAR: {feats.mar:.2f}{' (menguap)' if feats.yawning else ''}"
+        if feats.pitch is not None:
+            text += f"  Pitch: {feats.pitch:+.0f}°  Yaw: {feats.yaw:+.0f}°"
+        return text + f"  Angguk: {self.nods.recent_nods}"
+
     def _schedule_update_user_time(self):
         if self.current_frame == "user":
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -512,27 +848,86 @@ class MainApplication(tk.Frame):
             self.master.after(1000, self._schedule_update_user_time)
 
     def update_plot(self):
-        """Regenerate plot and show on developer page (if open)"""
+        """Bangun ulang grafik realtime dari riwayat EAR di memori (developer page)"""
+        if self.current_frame != "developer":
+            return
         try:
-            self.plotter.generate_plot()
-            if os.path.exists("ear_plot.png") and self.current_frame == "developer":
-                img = Image.open("ear_plot.png").resize((380, 260), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                self.plot_label.configure(image=photo)
-                self.plot_label.image = photo
+            if self.live_plot is None:
+                from app.plotter import LivePlot
+
+                self.live_plot = LivePlot(threshold=self.face_detector.threshold)
+            # list(deque) disalin atomik walau thread inferensi sedang append
+            samples = list(self._plot_samples)
+            self.live_plot.set_samples([ear for _, ear in samples])
+            self._plot_drawn = samples[-1][0] if samples else self._plot_drawn
+            self._show_live_plot()
         except Exception as e:
             print("Update plot error:", e)
 
+    def _schedule_plot_refresh(self):
+        """Tambahkan sampel baru ke grafik realtime dan render (tanpa file I/O)"""
+        if self.current_frame != "developer":
+            return
+        try:
+            samples = [item for item in list(self._plot_samples) if item[0] > self._plot_drawn]
+            if samples and self.live_plot is not None:
+                self.live_plot.add_samples([ear for _, ear in samples])
+                self._plot_drawn = samples[-1][0]
+                self._show_live_plot()
+        except Exception as e:
+            print("Plot refresh error:", e)
+        self.master.after(self.plot_refresh_ms, self._schedule_plot_refresh)
+
+    def _show_live_plot(self):
+        from PIL import Image, ImageTk
+
+        img = Image.fromarray(self.live_plot.render())
+        photo = self._plot_photo
+        if photo is None or (photo.width(), photo.height()) != img.size:
+            self._plot_photo = photo = ImageTk.PhotoImage(img)
+        else:
+            # Perbarui PhotoImage yang sama di tempat (tanpa image Tk baru)
+            photo.paste(img)
+        if getattr(self.plot_label, "image", None) is not photo:
+            # Label baru setiap kali halaman developer dibangun
+            self.plot_label.configure(image=photo)
+            self.plot_label.image = photo
+
     # -------------------------
     # Utilities
     # -------------------------
     def _clear_container(self):
+        # Frame yang masih antre tidak boleh digambar ke label halaman lama
+        if self.display is not None:
+            self.display.close()
+            self.display = None
         for w in self.container.winfo_children():
             w.destroy()
 
+    def _close_components(self):
+        """Tutup komponen yang sudah dibangun (aman dipanggil sebelum siap)"""
+        if not self._pipeline_idle(timeout=2.0):
+            # Thread pipeline masih di dalam process_frame / read(): detector &
+            # kamera dibiarkan, dilepas saat proses keluar
+            print("Thread pipeline belum berhenti; detector & kamera tidak ditutup")
+        else:
+            if self.face_detector is not None:
+                self.face_detector.close()
+            if self.camera is not None:
+                self.camera.close()
+        if self.alerts is not None:
+            self.alerts.close()
+        if self.ear_logger is not None:
+            try:
+                self.ear_logger.close()
+            except Exception as e:
+                print("Logger close error:", e)
+
     def _on_close(self):
         """Cleanup and close application"""
+        self._closing = True
         self._stop_camera_if_running()
+        self._close_components()
         try:
             self.master.destroy()
         except Exception:
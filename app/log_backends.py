@@ -0,0 +1,596 @@
+"""
+app/log_backends.py
+Backend penyimpanan untuk EarLogger.
+
+Semua backend menerima baris (timestamp_ns, ear, status) dari thread flusher
+EarLogger dan mengembalikan DataFrame dengan kolom timestamp (datetime lokal),
+ear, status, sama seperti yang dipakai GUI dan Plotter.
+
+ - CsvBackend    : format lama data/ear_log.csv (pembacaan inkremental)
+ - BinaryBackend : record biner lebar tetap, dibaca zero-copy via numpy.memmap
+ - SqliteBackend : SQLite (WAL) dengan indeks waktu dan tabel sesi kamera
+"""
+
+import csv
+import io
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from time import time_ns
+
+import numpy as np
+import pandas as pd
+from dateutil import tz as dateutil_tz
+
+LOG_COLUMNS = ['timestamp', 'ear', 'status']
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Zona waktu lokal untuk konversi epoch → datetime (CSV menyimpan waktu lokal).
+# tzlocal() mengikuti aturan DST sistem per timestamp, sama seperti
+# datetime.fromtimestamp di CsvBackend (bukan offset tetap saat import)
+LOCAL_TZ = dateutil_tz.tzlocal()
+
+
+def empty_frame():
+    return pd.DataFrame(columns=LOG_COLUMNS)
+
+
+# Perpindahan offset zona waktu selalu jatuh di kelipatan 15 menit UTC
+_OFFSET_BLOCK_NS = 900 * 1_000_000_000
+
+
+def ns_to_local(ns):
+    """Array epoch-nanodetik (UTC) → datetime64 lokal tanpa zona waktu"""
+    ns = np.asarray(ns, dtype=np.int64)
+    # tz_convert(tzlocal) memanggil Python per elemen (~500x lebih lambat);
+    # offset cukup dihitung sekali per blok 15 menit yang muncul di data
+    blocks, inverse = np.unique(ns // _OFFSET_BLOCK_NS, return_inverse=True)
+    offsets = np.array([
+        datetime.fromtimestamp(int(b) * (_OFFSET_BLOCK_NS // 1_000_000_000), LOCAL_TZ)
+        .utcoffset().total_seconds() * 1_000_000_000
+        for b in blocks
+    ], dtype=np.int64)
+    return pd.to_datetime(ns + offsets[inverse.reshape(-1)], unit='ns')
+
+
+def local_to_ns(timestamps):
+    """Datetime lokal (naive) → array epoch-nanodetik (UTC)"""
+    # Jam yang tidak ada (DST maju) digeser maju; jam ganda (DST mundur)
+    # pada deret log yang urut waktu disimpulkan dari urutannya
+    if isinstance(timestamps, (pd.Timestamp, datetime)):
+        return pd.Timestamp(timestamps).tz_localize(LOCAL_TZ, ambiguous=False,
+                                                    nonexistent='shift_forward').value
+    ts = pd.DatetimeIndex(timestamps)
+    try:
+        local = ts.tz_localize(LOCAL_TZ, ambiguous='infer', nonexistent='shift_forward')
+    except Exception:
+        local = ts.tz_localize(LOCAL_TZ, ambiguous=np.zeros(len(ts), dtype=bool),
+                               nonexistent='shift_forward')
+    # Resolusi hasil parse bisa detik/mikrodetik (pandas >= 2); samakan ke ns
+    return local.tz_convert('UTC').as_unit('ns').asi8
+
+
+def create_backend(filename, backend=None):
+    """
+    Pilih backend berdasarkan nama ("csv" / "binary") atau ekstensi file.
+    Objek backend yang sudah jadi dikembalikan apa adanya.
+    """
+    if backend is None:
+        ext = os.path.splitext(filename)[1].lower()
+        if ext in BinaryBackend.EXTENSIONS:
+            backend = "binary"
+        elif ext in SqliteBackend.EXTENSIONS:
+            backend = "sqlite"
+        else:
+            backend = "csv"
+    if not isinstance(backend, str):
+        return backend
+
+    backends = {"csv": CsvBackend, "binary": BinaryBackend, "sqlite": SqliteBackend}
+    if backend not in backends:
+        raise ValueError(f"Backend log tidak dikenal: {backend}")
+    return backends[backend](filename)
+
+
+class CsvBackend:
+    """
+    Backend CSV (timestamp, ear, status).
+
+    Pembacaan inkremental: offset byte terakhir disimpan; hanya baris baru
+    yang di-parse lalu disimpan sebagai chunk DataFrame di cache. Baris
+    terakhir yang belum lengkap (tanpa newline) ditunda ke pembacaan berikut.
+    """
+
+    # Ukuran blok saat membaca file mundur dari akhir (tail / jendela waktu)
+    TAIL_BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = None
+        self._lock = threading.RLock()
+        self._columns = None
+        self._read_offset = 0
+        self._chunks = []
+
+        # Jika file belum ada → buat baru dengan header standar
+        if not os.path.exists(self.filename):
+            self.create_csv_file()
+
+    def create_csv_file(self):
+        """Buat CSV baru dengan header sesuai struktur GUI"""
+        with open(self.filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(LOG_COLUMNS)
+
+    # ------------------------------------------------------------------
+    # Tulis
+    # ------------------------------------------------------------------
+    def write_rows(self, rows):
+        if self._file is None:
+            self._file = open(self.filename, 'a', newline='', encoding='utf-8')
+        csv.writer(self._file).writerows(
+            (datetime.fromtimestamp(ts / 1e9).strftime(TIMESTAMP_FORMAT), ear, status)
+            for ts, ear, status in rows)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------------
+    # Baca
+    # ------------------------------------------------------------------
+    def _refresh(self):
+        """Parse hanya baris yang ditambahkan sejak pembacaan terakhir"""
+        size = os.path.getsize(self.filename)
+        if size < self._read_offset:
+            # File dipotong / dibuat ulang → mulai dari awal
+            self._reset_cache()
+
+        with open(self.filename, 'rb') as f:
+            if self._read_offset == 0:
+                header = f.readline()
+                if not header.endswith(b'\n'):
+                    return
+                self._columns = self._parse_header(header)
+                self._read_offset = f.tell()
+
+            f.seek(self._read_offset)
+            data = f.read()
+
+        end = data.rfind(b'\n')
+        if end < 0:
+            return
+        data = data[:end + 1]
+        self._read_offset += len(data)
+
+        chunk = self._parse_rows(data)
+        if not chunk.empty:
+            self._chunks.append(chunk)
+
+    def _reset_cache(self):
+        self._read_offset = 0
+        self._chunks = []
+
+    @staticmethod
+    def _parse_header(header):
+        columns = header.decode('utf-8').strip().split(',')
+        # Backward Compatibility:
+        # Jika file lama pakai ear_value, rename agar GUI tidak error
+        columns = ["ear" if c == "ear_value" else c for c in columns]
+        if "ear" not in columns:
+            raise KeyError("Kolom 'ear' tidak ditemukan.")
+        return columns
+
+    def _parse_rows(self, data):
+        """Parse potongan CSV (tanpa header) menjadi DataFrame bertipe"""
+        if not data:
+            return pd.DataFrame(columns=self._columns)
+        df = pd.read_csv(io.BytesIO(data), header=None, names=self._columns,
+                         on_bad_lines='skip')
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format="ISO8601", errors="coerce")
+        df['ear'] = pd.to_numeric(df['ear'], errors="coerce")
+        return df
+
+    def _frame(self):
+        """Gabungkan chunk cache menjadi satu DataFrame (hanya jika perlu)"""
+        if not self._chunks:
+            return pd.DataFrame(columns=self._columns or LOG_COLUMNS)
+        if len(self._chunks) > 1:
+            self._chunks = [pd.concat(self._chunks, ignore_index=True)]
+        return self._chunks[0]
+
+    def _read_tail_bytes(self, n=None, cutoff=None):
+        """
+        Baca baris dari akhir file secara mundur per blok (tanpa scan penuh)
+        sampai terkumpul n baris atau timestamp baris pertama < cutoff.
+        """
+        with open(self.filename, 'rb') as f:
+            header = f.readline()
+            if self._columns is None:
+                self._columns = self._parse_header(header)
+            start = len(header)
+            pos = f.seek(0, os.SEEK_END)
+            data = b''
+
+            while pos > start:
+                step = min(self.TAIL_BLOCK_SIZE, pos - start)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+
+                first_nl = data.find(b'\n')
+                if n is not None and data.count(b'\n') > n:
+                    break
+                if cutoff is not None and first_nl >= 0:
+                    # Format timestamp ISO → bisa dibandingkan sebagai string
+                    first_ts = data[first_nl + 1:first_nl + 20].decode('utf-8', 'replace')
+                    if first_ts and first_ts < cutoff:
+                        break
+
+            if pos > start:
+                # Buang baris pertama yang terpotong
+                data = data[data.find(b'\n') + 1:]
+            end = data.rfind(b'\n')
+            return data[:end + 1] if end >= 0 else b''
+
+    def read_all(self):
+        with self._lock:
+            self._refresh()
+            return self._frame().copy()
+
+    def tail(self, n):
+        with self._lock:
+            if self._read_offset == 0:
+                # Cache belum dimuat: seek dari akhir file, bukan parse penuh
+                df = self._parse_rows(self._read_tail_bytes(n=n))
+                return df.tail(n).reset_index(drop=True)
+
+            self._refresh()
+            parts, count = [], 0
+            for chunk in reversed(self._chunks):
+                parts.append(chunk.tail(n - count))
+                count += len(parts[-1])
+                if count >= n:
+                    break
+            if not parts:
+                return self._frame().copy()
+            return pd.concat(parts[::-1], ignore_index=True)
+
+    def read_since(self, cutoff):
+        """Baris dengan timestamp >= cutoff (pd.Timestamp lokal)"""
+        with self._lock:
+            if self._read_offset == 0:
+                # Cache belum dimuat: baca mundur dari akhir file sampai cutoff
+                df = self._parse_rows(self._read_tail_bytes(cutoff=cutoff.strftime(TIMESTAMP_FORMAT)))
+                return df[df['timestamp'] >= cutoff].reset_index(drop=True)
+
+            self._refresh()
+            # Timestamp log monoton naik → cari batas dengan binary search
+            # hanya pada chunk yang masih berada di dalam jendela waktu
+            parts = []
+            for chunk in reversed(self._chunks):
+                ts = chunk['timestamp'].values
+                if len(ts) == 0:
+                    continue
+                i = ts.searchsorted(cutoff.to_datetime64(), side='left')
+                parts.append(chunk.iloc[i:])
+                if i > 0:
+                    break
+            if not parts:
+                return self._frame().iloc[0:0].copy()
+            return pd.concat(parts[::-1], ignore_index=True)
+
+
+# Kode status 1 byte untuk format biner
+STATUS_CODES = {"Normal": 0, "Mengantuk": 1, "Tidak Terdeteksi": 2}
+STATUS_NAMES = np.array(["Normal", "Mengantuk", "Tidak Terdeteksi"] + ["Unknown"] * 253, dtype=object)
+UNKNOWN_STATUS = 255
+
+
+class BinaryBackend:
+    """
+    Backend biner kolom lebar tetap (13 byte per record):
+        int64 epoch-nanodetik (UTC) | float32 EAR | uint8 kode status
+
+    File diawali header 64 byte (magic, versi, ukuran record, jumlah record)
+    dan dialokasikan di muka per GROW_RECORDS record. Data ditulis dan dibaca
+    lewat numpy.memmap sehingga query tidak perlu mem-parse teks.
+    """
+
+    EXTENSIONS = (".bin", ".earlog")
+    MAGIC = b"EARLOG1\0"
+    VERSION = 1
+    HEADER_SIZE = 64
+    GROW_RECORDS = 65536
+
+    RECORD_DTYPE = np.dtype([('ts', '<i8'), ('ear', '<f4'), ('status', 'u1')])
+    HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4'),
+                             ('count', '<u8'), ('reserved', 'V40')])
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.RLock()
+        self._header = None
+        self._records = None
+
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0:
+            self._create_file()
+        self._map()
+
+    def _create_file(self):
+        header = np.zeros(1, dtype=self.HEADER_DTYPE)
+        header['magic'] = self.MAGIC
+        header['version'] = self.VERSION
+        header['record_size'] = self.RECORD_DTYPE.itemsize
+        with open(self.filename, 'wb') as f:
+            f.write(header.tobytes())
+            f.truncate(self.HEADER_SIZE + self.GROW_RECORDS * self.RECORD_DTYPE.itemsize)
+
+    def _map(self):
+        self._header = np.memmap(self.filename, dtype=self.HEADER_DTYPE, mode='r+', shape=(1,))
+        if self._header['magic'][0] != self.MAGIC.rstrip(b"\0"):
+            raise ValueError(f"Bukan file log EAR biner: {self.filename}")
+        if int(self._header['record_size'][0]) != self.RECORD_DTYPE.itemsize:
+            raise ValueError("Ukuran record log biner tidak cocok")
+
+        capacity = (os.path.getsize(self.filename) - self.HEADER_SIZE) // self.RECORD_DTYPE.itemsize
+        self._records = np.memmap(self.filename, dtype=self.RECORD_DTYPE, mode='r+',
+                                  offset=self.HEADER_SIZE, shape=(capacity,))
+
+    @property
+    def count(self):
+        return int(self._header['count'][0])
+
+    @property
+    def capacity(self):
+        return len(self._records)
+
+    # ------------------------------------------------------------------
+    # Tulis
+    # ------------------------------------------------------------------
+    def write_rows(self, rows):
+        if not rows:
+            return
+        ts, ear, status = zip(*rows)
+        batch = np.empty(len(rows), dtype=self.RECORD_DTYPE)
+        batch['ts'] = ts
+        batch['ear'] = np.array(ear, dtype=np.float64)
+        batch['status'] = [STATUS_CODES.get(s, UNKNOWN_STATUS) for s in status]
+        self.write_records(batch)
+
+    def write_records(self, batch):
+        with self._lock:
+            start = self.count
+            end = start + len(batch)
+            if end > self.capacity:
+                self._grow(end)
+            self._records[start:end] = batch
+            self._records.flush()
+            # Jumlah record diperbarui setelah data tertulis
+            self._header['count'] = end
+            self._header.flush()
+
+    def _grow(self, min_records):
+        grow = self.GROW_RECORDS
+        capacity = ((min_records + grow - 1) // grow) * grow
+        self._unmap()
+        with open(self.filename, 'r+b') as f:
+            f.truncate(self.HEADER_SIZE + capacity * self.RECORD_DTYPE.itemsize)
+        self._map()
+
+    def _unmap(self):
+        """
+        Flush lalu lepas kedua memmap. Windows menolak truncate() file yang
+        masih dipetakan (PermissionError), jadi ini wajib sebelum resize.
+        """
+        for view in (self._records, self._header):
+            if view is not None:
+                view.flush()
+        # Mapping ditutup begitu referensi terakhir ke memmap hilang
+        self._records = None
+        self._header = None
+
+    def close(self):
+        with self._lock:
+            if self._records is not None:
+                self._records.flush()
+                self._header.flush()
+
+    # ------------------------------------------------------------------
+    # Baca
+    # ------------------------------------------------------------------
+    def records(self):
+        """View zero-copy (memmap) dari semua record yang sudah tertulis"""
+        with self._lock:
+            return self._records[:self.count]
+
+    def _to_frame(self, records):
+        return pd.DataFrame({
+            'timestamp': ns_to_local(records['ts']),
+            'ear': records['ear'].astype(np.float64),
+            'status': STATUS_NAMES[records['status']],
+        }, columns=LOG_COLUMNS)
+
+    # Query memegang lock sampai DataFrame (salinan) jadi, agar view memmap
+    # tidak lagi hidup saat _grow() melepas mapping
+    def read_all(self):
+        with self._lock:
+            return self._to_frame(self.records())
+
+    def tail(self, n):
+        with self._lock:
+            return self._to_frame(self.records()[-n:] if n > 0 else self.records()[:0])
+
+    def read_since(self, cutoff):
+        with self._lock:
+            records = self.records()
+            i = records['ts'].searchsorted(local_to_ns(cutoff), side='left')
+            return self._to_frame(records[i:])
+
+    # ------------------------------------------------------------------
+    # Konversi CSV
+    # ------------------------------------------------------------------
+    def import_csv(self, csv_path):
+        """Tambahkan isi log CSV lama ke file biner. Return jumlah record."""
+        df = CsvBackend(csv_path).read_all().dropna(subset=['timestamp'])
+        batch = np.empty(len(df), dtype=self.RECORD_DTYPE)
+        batch['ts'] = local_to_ns(df['timestamp'])
+        batch['ear'] = df['ear'].to_numpy(dtype=np.float64, na_value=np.nan)
+        batch['status'] = [STATUS_CODES.get(s, UNKNOWN_STATUS) for s in df['status']]
+        self.write_records(batch)
+        return len(batch)
+
+    def export_csv(self, csv_path):
+        """Tulis seluruh isi log biner ke CSV format lama"""
+        df = self.read_all()
+        df['timestamp'] = df['timestamp'].dt.strftime(TIMESTAMP_FORMAT)
+        df.to_csv(csv_path, index=False)
+        return len(df)
+
+
+class SqliteBackend:
+    """
+    Backend SQLite dengan mode WAL.
+
+    Tabel ear_log diindeks pada ts_ns sehingga query jendela waktu dan tail
+    memakai indeks, bukan scan penuh. Tabel sessions mencatat setiap kali
+    kamera dimulai/dihentikan; baris log menunjuk ke sesi yang aktif.
+    """
+
+    EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_ns INTEGER NOT NULL,
+            ended_ns INTEGER,
+            label TEXT
+        );
+        CREATE TABLE IF NOT EXISTS ear_log (
+            id INTEGER PRIMARY KEY,
+            ts_ns INTEGER NOT NULL,
+            ear REAL,
+            status TEXT,
+            session_id INTEGER REFERENCES sessions(id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_ear_log_ts ON ear_log(ts_ns);
+        CREATE INDEX IF NOT EXISTS idx_ear_log_session ON ear_log(session_id, ts_ns);
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.RLock()
+        self.session_id = None
+
+        # Satu koneksi dipakai thread flusher & thread GUI (dijaga oleh _lock)
+        self._conn = sqlite3.connect(self.filename, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Sesi
+    # ------------------------------------------------------------------
+    def start_session(self, label=None, started_ns=None):
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO sessions (started_ns, label) VALUES (?, ?)",
+                (started_ns or time_ns(), label))
+            self.session_id = cur.lastrowid
+        return self.session_id
+
+    def end_session(self, ended_ns=None):
+        with self._lock, self._conn:
+            if self.session_id is None:
+                return None
+            self._conn.execute("UPDATE sessions SET ended_ns = ? WHERE id = ?",
+                               (ended_ns or time_ns(), self.session_id))
+            ended, self.session_id = self.session_id, None
+        return ended
+
+    def list_sessions(self):
+        """Daftar sesi beserta jumlah baris log"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT s.id, s.label, s.started_ns, s.ended_ns, "
+                "       (SELECT COUNT(*) FROM ear_log l WHERE l.session_id = s.id) AS rows "
+                "FROM sessions s ORDER BY s.id", self._conn)
+        for col in ('started', 'ended'):
+            # ended_ns bisa NULL (sesi masih berjalan) → NaT
+            ts = pd.to_datetime(df.pop(f'{col}_ns'), unit='ns', utc=True)
+            df[col] = ts.dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
+        return df
+
+    # ------------------------------------------------------------------
+    # Tulis
+    # ------------------------------------------------------------------
+    def write_rows(self, rows):
+        with self._lock, self._conn:
+            # Satu transaksi per batch dari flusher
+            self._conn.executemany(
+                "INSERT INTO ear_log (ts_ns, ear, status, session_id) VALUES (?, ?, ?, ?)",
+                ((int(ts), None if ear is None else float(ear), status, self.session_id)
+                 for ts, ear, status in rows))
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            if self.session_id is not None:
+                self.end_session()
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # Baca
+    # ------------------------------------------------------------------
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if not rows:
+            return empty_frame()
+        ts, ear, status = zip(*rows)
+        return pd.DataFrame({
+            'timestamp': ns_to_local(ts),
+            'ear': np.array(ear, dtype=np.float64),
+            'status': list(status),
+        }, columns=LOG_COLUMNS)
+
+    def read_all(self):
+        return self._query("SELECT ts_ns, ear, status FROM ear_log ORDER BY ts_ns")
+
+    def tail(self, n):
+        df = self._query("SELECT ts_ns, ear, status FROM ear_log ORDER BY ts_ns DESC LIMIT ?", (n,))
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def read_since(self, cutoff):
+        return self._query("SELECT ts_ns, ear, status FROM ear_log WHERE ts_ns >= ? ORDER BY ts_ns",
+                           (int(local_to_ns(cutoff)),))
+
+    def read_session(self, session_id):
+        return self._query("SELECT ts_ns, ear, status FROM ear_log WHERE session_id = ? "
+                           "ORDER BY ts_ns", (session_id,))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Konversi log EAR CSV <-> biner")
+    parser.add_argument("command", choices=["import", "export"],
+                        help="import: CSV → biner, export: biner → CSV")
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        n = BinaryBackend(args.target).import_csv(args.source)
+    else:
+        n = BinaryBackend(args.source).export_csv(args.target)
+    print(f"{n} baris dikonversi: {args.source} → {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+app/mailbox.py
+Kotak surat thread-safe antara thread pipeline dan thread Tk.
+
+Thread worker hanya menimpa state terbaru (status, EAR, ...), menambah baris
+histori ke deque berukuran tetap, atau mengirim event satu kali (alert,
+kalibrasi selesai). Thread Tk mengambil semuanya sekaligus pada laju
+tampilan dan menerapkannya dalam satu refresh, sehingga tidak ada antrian
+after(0) yang bisa menumpuk saat mainloop tertinggal: memori dan latensi UI
+tetap datar berapa pun laju frame.
+"""
+
+import threading
+from collections import deque
+
+
+class UiMailbox:
+    """
+    Args:
+        history (int): Jumlah baris histori terakhir yang disimpan
+
+    Event satu kali (components_ready, camera_opened, alert, ...) tidak
+    dibatasi: jumlahnya sedikit, dan membuang satu saja bisa membuat UI
+    menunggu selamanya. Hanya state & histori yang berukuran tetap.
+    """
+
+    def __init__(self, history=20):
+        self._lock = threading.Lock()
+        self._state = {}
+        self._events = deque()
+        self.history = deque(maxlen=history)    # (seq, row)
+        self._seq = 0
+        self.posted = 0
+        self.overwritten = 0
+
+    def post(self, **values):
+        """Timpa state terbaru; nilai yang belum diambil Tk dihitung overwritten"""
+        with self._lock:
+            for key, value in values.items():
+                if key in self._state:
+                    self.overwritten += 1
+                self._state[key] = value
+            self.posted += 1
+
+    def push_event(self, name, *args):
+        """Event satu kali yang harus dijalankan di thread Tk"""
+        with self._lock:
+            self._events.append((name, args))
+
+    def add_history(self, row):
+        with self._lock:
+            self._seq += 1
+            self.history.append((self._seq, row))
+
+    def take(self, since_seq=0):
+        """
+        Ambil semua perubahan sekaligus (dipanggil di thread Tk).
+
+        Returns:
+            (state dict, daftar event, baris histori dengan seq > since_seq,
+             seq terakhir)
+        """
+        with self._lock:
+            state, self._state = self._state, {}
+            events = list(self._events)
+            self._events.clear()
+            rows = [row for seq, row in self.history if seq > since_seq]
+            return state, events, rows, self._seq
+
+    def snapshot_history(self):
+        """Baris histori saat ini (lama -> baru) untuk membangun ulang tabel"""
+        with self._lock:
+            return [row for _, row in self.history], self._seq
@@ -0,0 +1,330 @@
+"""
+app/multi_stream.py
+Mesin deteksi multi-kamera / multi-wajah untuk rig uji armada.
+
+Setiap stream (mis. kamera pengemudi + kamera kabin) punya FrameSource,
+FaceDetector (instance FaceMesh sendiri) dan CameraPipeline sendiri, sehingga
+N stream diproses bersamaan oleh thread pipeline masing-masing (OpenCV &
+MediaPipe melepas GIL selama inferensi; jumlah thread = 2-3 per sumber yang
+diberikan, tanpa pool bersama). Dengan max_num_faces > 1 setiap wajah diberi
+ID pelacakan yang stabil antar frame, dan log EAR ditulis per stream per
+wajah. Throughput agregat dilaporkan untuk menentukan kebutuhan hardware.
+
+Jalankan headless:
+    python -m app.multi_stream camera:0 camera:1 --faces 2 --duration 60
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.ear_logger import EarLogger
+from app.frame_source import CaptureConfig, create_source
+from app.pipeline import CameraPipeline
+
+
+def box_iou(boxes_a, boxes_b):
+    """Matriks IoU (len(a), len(b)) untuk kotak (x0, y0, x1, y1)"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(1, -1, 4)
+    ix = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    iy = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = ix * iy
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, inter / union, 0.0)
+
+
+class FaceTracker:
+    """
+    ID wajah stabil antar frame dengan pencocokan greedy berbasis IoU kotak.
+
+    Args:
+        min_iou (float): IoU minimum agar wajah dianggap sama dengan track lama
+        max_missed (int): Track dihapus setelah tidak terlihat sebanyak ini frame
+    """
+
+    def __init__(self, min_iou=0.3, max_missed=15):
+        self.min_iou = min_iou
+        self.max_missed = max_missed
+        self.reset()
+
+    def reset(self):
+        self._tracks = {}       # track_id -> [box, missed]
+        self._next_id = 1
+        self.expired = []       # track_id yang dihapus pada update() terakhir
+
+    def update(self, faces):
+        """Isi face.track_id untuk setiap DetectedFace; mengembalikan faces"""
+        track_ids = list(self._tracks)
+        matched_tracks, matched_faces = set(), set()
+        self.expired = []
+
+        if track_ids and faces:
+            iou = box_iou([self._tracks[t][0] for t in track_ids], [f.box for f in faces])
+            # Pasangan dengan IoU tertinggi dipilih lebih dulu
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                ti, fi = divmod(int(flat), len(faces))
+                if iou[ti, fi] < self.min_iou:
+                    break
+                if ti in matched_tracks or fi in matched_faces:
+                    continue
+                matched_tracks.add(ti)
+                matched_faces.add(fi)
+                faces[fi].track_id = track_ids[ti]
+                self._tracks[track_ids[ti]] = [faces[fi].box, 0]
+
+        for ti, track_id in enumerate(track_ids):
+            if ti not in matched_tracks:
+                self._tracks[track_id][1] += 1
+                if self._tracks[track_id][1] > self.max_missed:
+                    del self._tracks[track_id]
+                    self.expired.append(track_id)
+
+        for fi, face in enumerate(faces):
+            if fi not in matched_faces:
+                face.track_id = self._next_id
+                self._tracks[self._next_id] = [face.box, 0]
+                self._next_id += 1
+        return faces
+
+    @property
+    def active(self):
+        return len(self._tracks)
+
+
+class StreamWorker:
+    """
+    Satu stream: FrameSource -> CameraPipeline (detector sendiri) -> log per wajah.
+
+    Args:
+        name (str): Nama stream (dipakai sebagai awalan file log)
+        config (CaptureConfig): Konfigurasi sumber frame
+        detector: FaceDetector milik stream ini
+        log_dir (str): Folder log; None = tanpa logging
+        log_ext (str): Ekstensi log (".csv", ".bin", ".db") yang menentukan backend
+    """
+
+    def __init__(self, name, config, detector, log_dir=None, log_ext=".csv"):
+        self.name = name
+        self.config = config
+        self.detector = detector
+        self.log_dir = log_dir
+        self.log_ext = log_ext
+        self.tracker = FaceTracker()
+        self.source = None
+        self.pipeline = None
+        self.loggers = {}          # track_id -> EarLogger
+        self.faces_seen = 0
+        self.last_faces = []
+        self.error = None
+
+    def start(self):
+        # Graph FaceMesh dipanaskan sebelum sumber dibuka (juga me-reset tracking)
+        self.detector.warmup()
+        started_at = time.perf_counter()
+        self.source = create_source(self.config)
+        if not self.source.open():
+            self.error = f"Sumber {self.source.describe()} tidak bisa dibuka"
+            print(f"[{self.name}] {self.error}")
+            return False
+        self.tracker.reset()
+        self.pipeline = CameraPipeline(self.source, self.detector, on_result=self._handle_result)
+        self.pipeline.start(started_at=started_at)
+        return True
+
+    def stop(self):
+        if self.pipeline is not None and not self.pipeline.stop(timeout=2.0):
+            # Thread inferensi masih memakai detector / sumber frame
+            print(f"[{self.name}] Thread pipeline belum berhenti; sumber & detector tidak ditutup")
+        else:
+            if self.source is not None:
+                self.source.release()
+            self.detector.close()
+        for track_id in list(self.loggers):
+            self._close_logger(track_id)
+
+    def _handle_result(self, result):
+        """Thread inferensi stream: ID wajah + log per wajah"""
+        # result.faces None saat detektor error / tidak mengisi daftar wajah
+        faces = self.tracker.update(result.faces or [])
+        self.faces_seen += len(faces)
+        self.last_faces = faces
+        # Wajah yang kembali mendapat ID baru: logger track lama ditutup
+        # agar thread flusher & file handle tidak menumpuk
+        for track_id in self.tracker.expired:
+            self._close_logger(track_id)
+        if self.log_dir is None:
+            return
+        for face in faces:
+            if face.ear is None:
+                # Tier "haar": hanya keberadaan wajah, tidak ada EAR untuk dicatat
+                continue
+            try:
+                self._logger_for(face.track_id).append(face.ear, face.status)
+            except Exception as e:
+                print(f"[{self.name}] Logger append error:", e)
+
+    def _close_logger(self, track_id):
+        logger = self.loggers.pop(track_id, None)
+        if logger is None:
+            return
+        try:
+            logger.close()
+        except Exception as e:
+            print(f"[{self.name}] Logger close error:", e)
+
+    def _logger_for(self, track_id):
+        logger = self.loggers.get(track_id)
+        if logger is None:
+            filename = os.path.join(self.log_dir, f"{self.name}_face{track_id}{self.log_ext}")
+            logger = EarLogger(filename)
+            self.loggers[track_id] = logger
+        return logger
+
+    def stats(self):
+        stats = self.pipeline.stats() if self.pipeline is not None else {"fps": 0.0, "frames": 0}
+        stats.update({
+            "faces": len(self.last_faces),
+            "tracks": self.tracker.active,
+            "faces_seen": self.faces_seen,
+            "open_logs": len(self.loggers),
+            "error": self.error,
+        })
+        return stats
+
+
+class MultiStreamEngine:
+    """
+    Menjalankan beberapa StreamWorker bersamaan dan melaporkan throughput agregat.
+
+    Args:
+        configs (dict): Nama stream -> CaptureConfig
+        max_num_faces (int): Wajah maksimum per frame (per stream)
+        threshold (float): Ambang EAR
+        log_dir (str): Folder log per stream per wajah (None = tanpa log)
+        log_ext (str): Ekstensi file log (menentukan backend EarLogger)
+        detector_factory: Callable() -> detector; default FaceDetector headless
+        tier (str): Tier deteksi FaceDetector default ("mesh", "tiered", "haar")
+        roi_mode (bool): FaceMesh hanya di ROI wajah (hanya untuk max_num_faces=1)
+    """
+
+    def __init__(self, configs, max_num_faces=1, threshold=0.21, log_dir="data/streams",
+                 log_ext=".csv", detector_factory=None, tier="mesh", roi_mode=False):
+        self.max_num_faces = max_num_faces
+        self.tier = tier
+        self.roi_mode = roi_mode
+        self.threshold = threshold
+        self.detector_factory = detector_factory or self._default_detector
+        self.workers = [StreamWorker(name, config, self.detector_factory(), log_dir, log_ext)
+                        for name, config in configs.items()]
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    def _default_detector(self):
+        from app.face_detector import FaceDetector
+
+        return FaceDetector(threshold=self.threshold, draw_overlay=False,
+                            max_num_faces=self.max_num_faces, tier=self.tier,
+                            roi_mode=self.roi_mode)
+
+    def start(self):
+        with self._lock:
+            started = [w.start() for w in self.workers]
+            self._started_at = time.perf_counter()
+        return all(started)
+
+    def stop(self):
+        with self._lock:
+            for w in self.workers:
+                w.stop()
+
+    def stats(self):
+        """Metrik per stream + agregat (frame/detik dan wajah/detik total)"""
+        per_stream = {w.name: w.stats() for w in self.workers}
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        frames = sum(s["frames"] for s in per_stream.values())
+        faces = sum(s["faces_seen"] for s in per_stream.values())
+        return {
+            "streams": per_stream,
+            "elapsed_s": elapsed,
+            "frames": frames,
+            "faces": faces,
+            "fps_total": sum(s["fps"] for s in per_stream.values()),
+            "throughput_fps": frames / elapsed if elapsed > 0 else 0.0,
+            "faces_per_s": faces / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        lines = [f"{name}: {st['fps']:.1f} FPS | wajah {st['faces']} (track {st['tracks']}) | "
+                 f"inferensi {st.get('inference_ms', 0.0):.1f} ms | drop {st.get('dropped_frames', 0)}"
+                 + (f" | EAR pertama {st['first_ear_ms']:.0f} ms" if st.get("first_ear_ms") is not None else "")
+                 for name, st in s["streams"].items()]
+        lines.append(f"Total: {len(self.workers)} stream, {s['throughput_fps']:.1f} frame/detik, "
+                     f"{s['faces_per_s']:.1f} wajah/detik ({s['frames']} frame, {s['elapsed_s']:.1f} s)")
+        return "\n".join(lines)
+
+
+def parse_source(spec):
+    """'camera:1' | 'file:rekaman.mp4' | 'synthetic' | 'gstreamer:<pipeline>' -> CaptureConfig"""
+    kind, _, device = spec.partition(":")
+    if kind not in ("camera", "file", "synthetic", "gstreamer"):
+        # Path file tanpa awalan
+        return CaptureConfig(kind="file", device=spec)
+    if kind == "camera":
+        device = int(device or 0) if str(device or 0).isdigit() else device
+    return CaptureConfig(kind=kind, device=device)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Deteksi EAR multi-kamera / multi-wajah (headless)")
+    parser.add_argument("sources", nargs="+",
+                        help="Sumber frame: camera:0, file:video.mp4, synthetic, gstreamer:<pipeline>")
+    parser.add_argument("--faces", type=int, default=1, help="Wajah maksimum per frame")
+    parser.add_argument("--tier", choices=("mesh", "tiered", "haar"), default="mesh",
+                        help="Tier deteksi (lihat app.face_detector.TIERS)")
+    parser.add_argument("--roi", action="store_true",
+                        help="FaceMesh hanya di ROI wajah (hanya dengan --faces 1)")
+    parser.add_argument("--threshold", type=float, default=0.21, help="Ambang batas EAR")
+    parser.add_argument("--duration", type=float, default=30.0, help="Lama berjalan (detik)")
+    parser.add_argument("--interval", type=float, default=5.0, help="Interval laporan (detik)")
+    parser.add_argument("--log-dir", default="data/streams",
+                        help="Folder log per stream per wajah ('' = tanpa log)")
+    parser.add_argument("--log-ext", default=".csv", help="Ekstensi log: .csv, .bin, atau .db")
+    return parser
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.roi and args.faces > 1:
+        parser.error("--roi hanya bisa dipakai dengan --faces 1")
+    configs = {f"stream{i}": parse_source(spec) for i, spec in enumerate(args.sources)}
+
+    engine = MultiStreamEngine(configs, max_num_faces=args.faces, threshold=args.threshold,
+                               tier=args.tier, roi_mode=args.roi,
+                               log_dir=args.log_dir or None, log_ext=args.log_ext)
+    if not engine.start():
+        print("Sebagian stream gagal dibuka")
+
+    deadline = time.perf_counter() + args.duration
+    try:
+        while time.perf_counter() < deadline:
+            time.sleep(min(args.interval, max(0.0, deadline - time.perf_counter())))
+            print(engine.format_stats())
+            print("-" * 40)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+    print(engine.format_stats())
+
+
+if __name__ == "__main__":
+    main()
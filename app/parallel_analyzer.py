@@ -0,0 +1,135 @@
+"""
+app/parallel_analyzer.py
+Analisis offline multi-proses untuk rekaman panjang / banyak file.
+
+Setiap video dipotong menjadi chunk yang bisa di-seek. Setiap proses worker
+memiliki FaceDetector (FaceMesh) sendiri. Sebelum chunk dimulai, worker
+membaca beberapa frame "warm-up" milik chunk sebelumnya agar state tracking
+FaceMesh sudah stabil; frame warm-up tidak dicatat sehingga tidak ada frame
+yang terhitung dua kali. Hasil digabung kembali sesuai urutan frame.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import pandas as pd
+
+from app.video_analyzer import RESULT_COLUMNS, count_frames, iter_frames
+
+# Detector per proses worker (dibuat sekali oleh _init_worker)
+_worker_detector = None
+
+
+def plan_chunks(paths, chunk_frames=3000, warmup_frames=30):
+    """
+    Membagi input menjadi chunk (path, start, end, warmup_start).
+
+    Video yang jumlah frame-nya tidak diketahui diproses sebagai satu chunk.
+    """
+    chunks = []
+    for path in paths:
+        total = count_frames(path)
+        if total <= 0 or chunk_frames <= 0:
+            chunks.append((path, 0, None, 0))
+            continue
+
+        for start in range(0, total, chunk_frames):
+            end = min(start + chunk_frames, total)
+            # Chunk terakhir dibuka sampai habis (metadata frame count bisa meleset)
+            if end == total:
+                end = None
+            chunks.append((path, start, end, max(0, start - warmup_frames)))
+    return chunks
+
+
+def _init_worker(threshold, tier="mesh", roi_mode=False):
+    """Initializer ProcessPoolExecutor: satu FaceDetector per proses"""
+    global _worker_detector
+    from app.face_detector import FaceDetector
+
+    # Satu proses = satu core; cegah OpenCV membuat thread pool sendiri
+    cv2.setNumThreads(1)
+    _worker_detector = FaceDetector(threshold=threshold, draw_overlay=False, tier=tier,
+                                    roi_mode=roi_mode)
+
+
+def _run_chunk(chunk, fps=None):
+    path, start, end, warmup_start = chunk
+    detector = _worker_detector
+
+    # Chunk baru tidak boleh mewarisi tracking dari chunk lain
+    detector.reset_tracking()
+
+    rows = []
+    skipped_before = detector.mesh_skipped
+    t0 = time.perf_counter()
+    for idx, ts, frame in iter_frames(path, warmup_start, end, fps):
+        _, ear_value, status = detector.process_frame(frame)
+        if idx >= start:
+            rows.append((idx, ts, ear_value, status))
+    return path, rows, time.perf_counter() - t0, detector.mesh_skipped - skipped_before
+
+
+def analyze_parallel(paths, workers=None, chunk_frames=3000, warmup_frames=30,
+                     threshold=0.21, fps=None, tier="mesh", roi_mode=False):
+    """
+    Analisis EAR paralel untuk satu atau banyak video / folder frame.
+
+    Args:
+        paths (list | str): File video atau folder frame
+        workers (int): Jumlah proses (default: jumlah core)
+        chunk_frames (int): Panjang chunk per tugas
+        warmup_frames (int): Frame sebelum chunk yang dipakai untuk
+            memanaskan tracking (tidak ikut dicatat)
+        threshold (float): Ambang batas EAR
+        fps (float): FPS untuk folder frame / override metadata video
+        tier (str): Tier deteksi FaceDetector ("mesh", "tiered", "haar")
+        roi_mode (bool): FaceMesh hanya di ROI wajah setelah wajah ditemukan
+
+    Returns:
+        pd.DataFrame: Kolom source + RESULT_COLUMNS, urut per input lalu
+        frame_index. Statistik ada di df.attrs.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    workers = workers or os.cpu_count() or 1
+    chunks = plan_chunks(paths, chunk_frames, warmup_frames)
+
+    start = time.perf_counter()
+    frames = []
+    worker_time = 0.0
+    mesh_skipped = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(threshold, tier, roi_mode)) as pool:
+        # map() menjaga urutan chunk → hasil sudah urut frame per file
+        for path, rows, elapsed, skipped in pool.map(_run_chunk, chunks, [fps] * len(chunks)):
+            worker_time += elapsed
+            mesh_skipped += skipped
+            df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+            frames.append(df.assign(source=path))
+    elapsed = time.perf_counter() - start
+
+    if frames:
+        result = pd.concat(frames, ignore_index=True)
+        # Seek yang meleset bisa menghasilkan frame ganda di batas chunk
+        result = result.drop_duplicates(subset=["source", "frame_index"], keep="first")
+        result = result.reset_index(drop=True)
+    else:
+        result = pd.DataFrame(columns=["source"] + RESULT_COLUMNS)
+    result = result[["source"] + RESULT_COLUMNS]
+
+    result.attrs.update({
+        "frames": len(result),
+        "chunks": len(chunks),
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "worker_time_s": worker_time,
+        "tier": tier,
+        "mesh_skipped": mesh_skipped,
+        "processing_fps": len(result) / elapsed if elapsed > 0 else 0.0,
+        # Efisiensi paralel: 1.0 = skala linear sempurna terhadap jumlah proses
+        "parallel_efficiency": worker_time / (elapsed * workers) if elapsed > 0 else 0.0,
+    })
+    return result
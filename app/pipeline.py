@@ -0,0 +1,331 @@
+"""
+app/pipeline.py
+Pipeline kamera bertahap (capture -> inferensi -> render) dengan antrian
+berukuran satu. Setiap tahap berjalan di thread sendiri; frame lama yang belum
+sempat diproses langsung dibuang sehingga yang diproses selalu frame terbaru.
+Modul ini tidak bergantung pada Tkinter sehingga bisa dipakai headless.
+"""
+
+import threading
+import time
+
+
+class LatestSlot:
+    """
+    Antrian berkapasitas 1: put() menimpa item yang belum diambil.
+    Item yang tertimpa dihitung sebagai frame yang dibuang (dropped).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._has_item:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Ambil item terbaru, atau None jika timeout"""
+        with self._cond:
+            if not self._has_item:
+                self._cond.wait(timeout)
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+    def clear(self):
+        with self._cond:
+            self._item = None
+            self._has_item = False
+
+    def __len__(self):
+        return 1 if self._has_item else 0
+
+
+class StageStats:
+    """Statistik latensi satu tahap (rata-rata eksponensial, dalam detik)"""
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.count = 0
+        self.last = 0.0
+        self.mean = 0.0
+
+    def add(self, seconds):
+        self.last = seconds
+        self.mean = seconds if self.count == 0 else self.mean + self.alpha * (seconds - self.mean)
+        self.count += 1
+
+    @property
+    def mean_ms(self):
+        return self.mean * 1000.0
+
+
+class FrameResult:
+    """Hasil inferensi satu frame yang diteruskan ke tahap render"""
+
+    __slots__ = ("frame_id", "captured_at", "frame", "ear", "status", "inferred", "features",
+                 "faces")
+
+    def __init__(self, frame_id, captured_at, frame, ear, status, inferred=True, features=None,
+                 faces=None):
+        self.frame_id = frame_id
+        self.captured_at = captured_at
+        self.frame = frame
+        self.ear = ear
+        self.status = status
+        # False = frame dilewati scheduler (hanya ditampilkan, tanpa FaceMesh)
+        self.inferred = inferred
+        # FaceFeatures (MAR, pose kepala) jika detector menyediakannya
+        self.features = features
+        # Semua wajah (DetectedFace) jika detector melacak lebih dari satu
+        self.faces = faces if faces is not None else []
+
+
+class CameraPipeline:
+    """
+    Pipeline capture -> inferensi -> render.
+
+    Args:
+        cap: Objek dengan read() -> (ret, frame), mis. cv2.VideoCapture
+        detector: FaceDetector (process_frame(frame) -> (frame, ear, status))
+        on_result: Callback(FrameResult) di thread inferensi (logging, alert)
+        on_render: Callback(FrameResult) di thread render (tampilan)
+        scheduler: AdaptiveScheduler opsional; frame yang dilewati tetap
+            dirender tetapi tidak diproses FaceMesh / on_result
+        max_read_failures (int): Gagal baca berturut-turut sebelum pipeline
+            berhenti sendiri (kamera dicabut / video habis); None = terus mencoba.
+            Pemanggil memantau is_running untuk membuka ulang kamera.
+    """
+
+    def __init__(self, cap, detector, on_result=None, on_render=None, scheduler=None,
+                 max_read_failures=None):
+        self.cap = cap
+        self.detector = detector
+        self.on_result = on_result
+        self.on_render = on_render
+        self.scheduler = scheduler
+        self.max_read_failures = max_read_failures
+
+        self._frames = LatestSlot()
+        self._results = LatestSlot()
+        self._threads = []
+        self._running = False
+
+        self.capture_stats = StageStats()
+        self.inference_stats = StageStats()
+        self.render_stats = StageStats()
+        self.latency_stats = StageStats()      # capture -> selesai render (frame terinferensi)
+        self.skip_latency_stats = StageStats() # idem untuk frame yang dilewati scheduler
+        self.inference_busy_s = 0.0            # total waktu di process_frame
+        self.interval_stats = StageStats()     # jarak antar hasil inferensi
+        self.read_failures = 0
+        # Waktu (perf_counter) sejak kamera dimulai sampai frame / EAR pertama
+        self.started_at = None
+        self.first_frame_at = None
+        self.first_ear_at = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def is_running(self):
+        return self._running
+
+    def start(self, started_at=None):
+        """
+        Args:
+            started_at (float): perf_counter saat kamera mulai diminta (mis.
+                sebelum kamera dibuka); default saat start() dipanggil. Dipakai
+                untuk mengukur waktu sampai EAR pertama.
+        """
+        if self._running:
+            return
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.first_frame_at = self.first_ear_at = None
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="pipeline-inference", daemon=True),
+        ]
+        if self.on_render is not None:
+            self._threads.append(
+                threading.Thread(target=self._render_loop, name="pipeline-render", daemon=True))
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout=1.0):
+        """
+        Hentikan semua stage dan tunggu thread-nya (maks. timeout per thread).
+
+        Returns:
+            bool: True jika semua thread sudah selesai. False = masih ada
+            thread (mis. inferensi di dalam process_frame) yang berjalan;
+            detector / kamera belum aman di-reset atau ditutup. stop() boleh
+            dipanggil lagi untuk menunggu lebih lama.
+        """
+        self._running = False
+        current = threading.current_thread()
+        for t in self._threads:
+            if t is not current and t.is_alive():
+                t.join(timeout=timeout)
+        self._threads = [t for t in self._threads if t is not current and t.is_alive()]
+        self._frames.clear()
+        self._results.clear()
+        return not self._threads
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+    def _capture_loop(self):
+        frame_id = 0
+        failures = 0
+        while self._running:
+            t0 = time.perf_counter()
+            try:
+                ret, frame = self.cap.read()
+            except Exception as e:
+                print("Capture error:", e)
+                ret, frame = False, None
+            t1 = time.perf_counter()
+
+            if not ret:
+                self.read_failures += 1
+                failures += 1
+                if self.max_read_failures is not None and failures >= self.max_read_failures:
+                    print(f"Kamera gagal mengirim frame {failures}x berturut-turut; pipeline berhenti")
+                    self._running = False
+                    break
+                time.sleep(0.05)
+                continue
+            failures = 0
+
+            self.capture_stats.add(t1 - t0)
+            if self.first_frame_at is None:
+                self.first_frame_at = t1
+            frame_id += 1
+            self._frames.put((frame_id, t1, frame))
+
+    def _inference_loop(self):
+        last_done = None
+        while self._running:
+            item = self._frames.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, captured_at, frame = item
+
+            if self.scheduler is not None and not self.scheduler.should_process(captured_at):
+                if self.on_render is not None:
+                    self._results.put(FrameResult(frame_id, captured_at, frame, None, None,
+                                                  inferred=False))
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                processed, ear_value, status = self.detector.process_frame(frame)
+            except Exception as e:
+                print("Inference error:", e)
+                continue
+            t1 = time.perf_counter()
+            self.inference_stats.add(t1 - t0)
+            self.inference_busy_s += t1 - t0
+            if last_done is not None:
+                self.interval_stats.add(t1 - last_done)
+            last_done = t1
+            if ear_value is not None and self.first_ear_at is None:
+                self.first_ear_at = t1
+
+            if self.scheduler is not None:
+                self.scheduler.update(ear_value, self.detector.threshold, t1)
+
+            result = FrameResult(frame_id, captured_at, processed, ear_value, status,
+                                 features=getattr(self.detector, "last_features", None),
+                                 faces=getattr(self.detector, "last_faces", None))
+            if self.on_result is not None:
+                try:
+                    self.on_result(result)
+                except Exception as e:
+                    print("Result handler error:", e)
+
+            if self.on_render is not None:
+                self._results.put(result)
+            else:
+                self.latency_stats.add(time.perf_counter() - captured_at)
+
+    def _render_loop(self):
+        while self._running:
+            result = self._results.get(timeout=0.1)
+            if result is None:
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                self.on_render(result)
+            except Exception as e:
+                print("Render error:", e)
+                continue
+            t1 = time.perf_counter()
+            self.render_stats.add(t1 - t0)
+            # Frame tanpa FaceMesh tidak boleh menurunkan latensi deteksi
+            if result.inferred:
+                self.latency_stats.add(t1 - result.captured_at)
+            else:
+                self.skip_latency_stats.add(t1 - result.captured_at)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    @property
+    def fps(self):
+        """FPS hasil inferensi yang tercapai (termasuk jeda scheduler)"""
+        return 1.0 / self.interval_stats.mean if self.interval_stats.mean > 0 else 0.0
+
+    def _since_start_ms(self, at):
+        if at is None or self.started_at is None:
+            return None
+        return (at - self.started_at) * 1000.0
+
+    def stats(self):
+        """Ringkasan metrik pipeline (latensi dalam milidetik)"""
+        stats = {
+            "fps": self.fps,
+            "capture_ms": self.capture_stats.mean_ms,
+            "inference_ms": self.inference_stats.mean_ms,
+            "render_ms": self.render_stats.mean_ms,
+            "latency_ms": self.latency_stats.mean_ms,
+            "skip_latency_ms": self.skip_latency_stats.mean_ms,
+            "frames": self.inference_stats.count,
+            "dropped_frames": self._frames.dropped,
+            "dropped_renders": self._results.dropped,
+            "frame_queue": len(self._frames),
+            "render_queue": len(self._results),
+            "read_failures": self.read_failures,
+            "first_frame_ms": self._since_start_ms(self.first_frame_at),
+            "first_ear_ms": self._since_start_ms(self.first_ear_at),
+        }
+        if self.scheduler is not None:
+            stats.update(self.scheduler.stats(self.inference_stats.mean, self.inference_busy_s))
+        tier_stats = getattr(self.detector, "tier_stats", None)
+        if tier_stats is not None:
+            stats.update(tier_stats())
+        return stats
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"FPS: {s['fps']:.1f} | capture {s['capture_ms']:.1f} ms | "
+                f"inferensi {s['inference_ms']:.1f} ms | render {s['render_ms']:.1f} ms | "
+                f"latensi {s['latency_ms']:.1f} ms | drop {s['dropped_frames']}"
+                + (f" | EAR pertama {s['first_ear_ms']:.0f} ms" if s["first_ear_ms"] is not None else "")
+                + (f" | inferensi {s['effective_rate']:.1f} Hz ({s['mode']}), "
+                   f"hemat CPU {s['cpu_saved_s']:.1f} s" if self.scheduler is not None else "")
+                + (f" | tier {s['tier']}: FaceMesh dihindari {s['mesh_skipped']}x"
+                   if s.get("tier", "mesh") != "mesh" else ""))
@@ -2,59 +2,239 @@
 app/plotter.py
 Modul untuk membuat grafik EAR dan menyimpannya sebagai PNG.
 Kompatibel dengan GUI dan EarLogger terbaru.
+
+Histori panjang didecimate min/max per bucket piksel sebelum digambar
+sehingga waktu render tetap terbatas berapa pun panjang log, dan penurunan
+EAR di bawah threshold tidak hilang.
+
+LivePlot menyimpan satu figure & satu line artist yang datanya diperbarui
+di tempat; redraw memakai blitting dan hasilnya langsung berupa buffer RGBA
+di memori (tanpa file PNG).
 """
 
 import matplotlib
 matplotlib.use("Agg")  # NON-GUI backend
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.dates as mdates
+import numpy as np
 import pandas as pd
 import os
 
+def decimate_minmax(y, n_buckets):
+    """
+    Decimation min/max per bucket (level-of-detail).
+
+    Data dibagi menjadi n_buckets bucket berurutan; dari tiap bucket diambil
+    titik minimum dan maksimum (urutan asli dipertahankan). Puncak dan lembah,
+    termasuk kedipan/penurunan EAR singkat, tetap terlihat.
+
+    Args:
+        y (np.ndarray): Nilai (1D)
+        n_buckets (int): Jumlah bucket, biasanya = lebar plot dalam piksel
+
+    Returns:
+        np.ndarray: Indeks titik yang dipertahankan (naik), panjang <= 2*n_buckets
+    """
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    k = -(-n // n_buckets)  # ceil(n / n_buckets)
+    rows = -(-n // k)
+    padded = np.full(rows * k, np.nan, dtype=np.float64)
+    padded[:n] = y
+    padded = padded.reshape(rows, k)
+
+    # NaN (padding / data kosong) tidak boleh terpilih sebagai min/max
+    imin = np.where(np.isnan(padded), np.inf, padded).argmin(axis=1)
+    imax = np.where(np.isnan(padded), -np.inf, padded).argmax(axis=1)
+
+    base = np.arange(rows) * k
+    idx = np.sort(np.stack([base + imin, base + imax], axis=1), axis=1).ravel()
+    idx = idx[idx < n]
+    return idx[np.concatenate(([True], np.diff(idx) > 0))]
+
+
 class Plotter:
-    def __init__(self, ear_logger, out_path="ear_plot.png"):
+    def __init__(self, ear_logger, out_path="ear_plot.png", x_axis="time", max_points=None,
+                 threshold=0.21):
+        """
+        Args:
+            ear_logger (EarLogger): Sumber data
+            out_path (str): Lokasi PNG untuk generate_plot()
+            threshold (float): Garis threshold (hasil kalibrasi pengemudi)
+            x_axis (str): "time" (timestamp log) atau "index" (nomor sampel)
+            max_points (int): Jumlah bucket decimation. None = lebar plot (piksel)
+        """
         self.ear_logger = ear_logger
         self.out_path = out_path
+        self.x_axis = x_axis
+        self.max_points = max_points
+        self.threshold = threshold
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+
+    def _build_figure(self, df, dpi=120):
+        """Buat figure grafik EAR dari DataFrame log (atau placeholder)"""
+        fig = Figure(figsize=(8, 3), dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+
+        # Jika tidak ada data → tampilkan placeholder
+        if df is None or df.empty:
+            ax.text(0.5, 0.5, "BELUM ADA DATA EAR",
+                    fontsize=16, ha="center", va="center")
+            ax.set_axis_off()
+            return fig
+
+        # BACKWARD COMPATIBILITY:
+        # Kalau file lama masih pakai ear_value → rename
+        if "ear" not in df.columns:
+            if "ear_value" in df.columns:
+                df.rename(columns={"ear_value": "ear"}, inplace=True)
+            else:
+                raise KeyError("Kolom 'ear' tidak ditemukan dan tidak ada 'ear_value'.")
+
+        # Decimation: maksimal 2 titik per piksel lebar plot
+        ear = df["ear"].to_numpy(dtype=np.float64, na_value=np.nan)
+        n_buckets = self.max_points or int(fig.get_figwidth() * fig.dpi)
+        idx = decimate_minmax(ear, n_buckets)
+
+        use_time = (self.x_axis == "time" and "timestamp" in df.columns
+                    and pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+                    and df["timestamp"].notna().all())
+
+        # Plot grafik EAR
+        if use_time:
+            x = df["timestamp"].to_numpy()[idx]
+            ax.plot(x, ear[idx], label="EAR", linewidth=1.6)
+            locator = mdates.AutoDateLocator()
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        else:
+            ax.plot(idx, ear[idx], label="EAR", linewidth=1.6)
+
+        # Threshold (default 0.21 atau hasil kalibrasi)
+        ax.axhline(self.threshold, color="red", linestyle="--", linewidth=1.3,
+                   label=f"Threshold {self.threshold:.2f}")
+
+        ax.set_title("Grafik EAR (Eye Aspect Ratio)", fontsize=12)
+        ax.set_xlabel("Waktu" if use_time else "Index Sampel")
+        ax.set_ylabel("EAR")
+
+        ax.grid(True, linestyle="--", alpha=0.6)
+        ax.legend()
+
+        fig.tight_layout()
+        return fig
 
     def generate_plot(self):
         """Generate grafik EAR dan simpan sebagai PNG."""
         try:
-            df = self.ear_logger.read_all()
-
-            # Jika tidak ada data → tampilkan placeholder
-            if df is None or df.empty:
-                fig, ax = plt.subplots(figsize=(8, 3))
-                ax.text(0.5, 0.5, "BELUM ADA DATA EAR",
-                        fontsize=16, ha="center", va="center")
-                ax.set_axis_off()
+            fig = self._build_figure(self.ear_logger.read_all(), dpi=120)
+            if fig.axes[0].axison:
+                fig.savefig(self.out_path, dpi=120)
+            else:
                 fig.savefig(self.out_path, bbox_inches="tight")
-                plt.close()
-                return
 
-            # BACKWARD COMPATIBILITY:
-            # Kalau file lama masih pakai ear_value → rename
-            if "ear" not in df.columns:
-                if "ear_value" in df.columns:
-                    df.rename(columns={"ear_value": "ear"}, inplace=True)
-                else:
-                    raise KeyError("Kolom 'ear' tidak ditemukan dan tidak ada 'ear_value'.")
+        except Exception as e:
+            print("Error generating plot:", e)
+
+    def render(self, dpi=100):
+        """
+        Render grafik EAR langsung ke memori.
 
-            # Plot grafik EAR
-            fig, ax = plt.subplots(figsize=(8, 3))
-            ax.plot(df["ear"].values, label="EAR", linewidth=1.6)
+        Returns:
+            np.ndarray: Gambar RGBA (tinggi, lebar, 4), atau None jika gagal
+        """
+        try:
+            fig = self._build_figure(self.ear_logger.read_all(), dpi=dpi)
+            fig.canvas.draw()
+            return np.asarray(fig.canvas.buffer_rgba()).copy()
 
-            # Threshold 0.21
-            ax.axhline(0.21, color="red", linestyle="--", linewidth=1.3, label="Threshold 0.21")
+        except Exception as e:
+            print("Error rendering plot:", e)
+            return None
 
-            ax.set_title("Grafik EAR (Eye Aspect Ratio)", fontsize=12)
-            ax.set_xlabel("Index Sampel")
-            ax.set_ylabel("EAR")
 
-            ax.grid(True, linestyle="--", alpha=0.6)
-            ax.legend()
+class LivePlot:
+    """
+    Grafik EAR realtime dengan satu figure persisten.
 
-            fig.tight_layout()
-            fig.savefig(self.out_path, dpi=120)
-            plt.close()
+    Sampel baru dimasukkan ke ring buffer berukuran tetap (window); hanya
+    ydata line yang diganti. Sumbu dibuat tetap sehingga latar (grid, label,
+    garis threshold) cukup digambar sekali lalu di-blit untuk tiap update.
+    """
 
-        except Exception as e:
-            print("Error generating plot:", e)
+    def __init__(self, window=300, threshold=0.21, size=(3.8, 2.6), dpi=100, ylim=(0.0, 0.5)):
+        self.window = window
+        self.threshold = threshold
+        self._y = np.full(window, np.nan, dtype=np.float32)
+
+        self.figure = Figure(figsize=size, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+
+        self.ax.set_xlim(0, window - 1)
+        self.ax.set_ylim(*ylim)
+        self.ax.set_ylabel("EAR", fontsize=8)
+        self.ax.tick_params(labelsize=7)
+        self.ax.set_xticks([])
+        self.ax.grid(True, linestyle="--", alpha=0.6)
+        self.threshold_line = self.ax.axhline(threshold, color="red", linestyle="--",
+                                              linewidth=1.1, label=f"Threshold {threshold:.2f}")
+        self.line, = self.ax.plot(np.arange(window), self._y, linewidth=1.4,
+                                  label="EAR", animated=True)
+        self.ax.legend(loc="lower left", fontsize=7)
+        self.figure.tight_layout()
+
+        self._background = None
+
+    def add_samples(self, values):
+        """Tambahkan sampel EAR baru ke kanan grafik (yang lama bergeser ke kiri)"""
+        values = np.asarray(values, dtype=np.float32)[-self.window:]
+        k = len(values)
+        if k == 0:
+            return
+        if k < self.window:
+            self._y[:-k] = self._y[k:]
+        self._y[-k:] = values
+
+        # Nilai di luar sumbu → perbesar sumbu dan gambar ulang latar
+        top = np.nanmax(values) if np.isfinite(values).any() else 0.0
+        if top > self.ax.get_ylim()[1]:
+            self.ax.set_ylim(self.ax.get_ylim()[0], top * 1.1)
+            self._background = None
+
+    def set_samples(self, values):
+        """Ganti seluruh isi grafik (mis. dari EarLogger.tail)"""
+        self._y[:] = np.nan
+        self.add_samples(values)
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+        self.threshold_line.set_ydata([threshold, threshold])
+        self.threshold_line.set_label(f"Threshold {threshold:.2f}")
+        self.ax.legend(loc="lower left", fontsize=7)
+        self._background = None
+
+    def render(self):
+        """
+        Gambar ulang line dengan blitting.
+
+        Returns:
+            np.ndarray: View RGBA (tinggi, lebar, 4) dari buffer canvas. Buffer
+            dipakai ulang pada render berikutnya.
+        """
+        if self._background is None:
+            # Gambar penuh sekali (tanpa line animated) lalu simpan latarnya
+            self.canvas.draw()
+            self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        else:
+            self.canvas.restore_region(self._background)
+
+        self.line.set_ydata(self._y)
+        self.ax.draw_artist(self.line)
+        return np.asarray(self.canvas.buffer_rgba())
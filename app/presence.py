@@ -0,0 +1,68 @@
+"""
+app/presence.py
+Cek keberadaan wajah yang murah dengan Haar cascade OpenCV.
+
+Dipakai FaceDetector (tier "tiered" / "haar") untuk melewati FaceMesh saat
+tidak ada wajah di kamera, dan sebagai mode darurat di hardware lemah.
+Deteksi dilakukan pada frame grayscale yang diperkecil sehingga biayanya
+jauh di bawah satu panggilan FaceMesh.
+"""
+
+import os
+
+import cv2
+
+from app.utils import resource_path
+
+CASCADE_FILE = os.path.join("app", "resources", "haarcascade_frontalface_default.xml")
+
+
+class HaarFacePresence:
+    """
+    Args:
+        cascade_path (str): File XML cascade (default: resource bawaan aplikasi)
+        width (int): Lebar frame setelah diperkecil sebelum deteksi
+        scale_factor (float): scaleFactor detectMultiScale
+        min_neighbors (int): minNeighbors detectMultiScale
+        min_size (int): Ukuran wajah minimum (piksel, di frame yang diperkecil)
+    """
+
+    def __init__(self, cascade_path=None, width=160, scale_factor=1.15, min_neighbors=3,
+                 min_size=20):
+        path = cascade_path or resource_path(CASCADE_FILE)
+        self.cascade = cv2.CascadeClassifier(path)
+        if self.cascade.empty():
+            raise RuntimeError(f"Haar cascade tidak bisa dimuat: {path}")
+        self.width = width
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+        self.runs = 0
+        self.hits = 0
+
+    def detect(self, frame):
+        """
+        Return daftar kotak wajah (x0, y0, x1, y1) dalam koordinat frame asli.
+        """
+        self.runs += 1
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.width / float(w))
+        if scale < 1.0:
+            small = cv2.resize(frame, (self.width, max(1, int(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = frame
+        gray = small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.equalizeHist(gray)
+
+        found = self.cascade.detectMultiScale(
+            gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+            minSize=(self.min_size, self.min_size))
+        if len(found):
+            self.hits += 1
+        inv = 1.0 / scale
+        return [(x * inv, y * inv, (x + bw) * inv, (y + bh) * inv) for x, y, bw, bh in found]
+
+    def present(self, frame):
+        """True jika setidaknya satu wajah terdeteksi"""
+        return len(self.detect(frame)) > 0
@@ -0,0 +1,120 @@
+"""
+app/scheduler.py
+Penjadwal inferensi adaptif.
+
+Saat EAR stabil jauh di atas threshold, inferensi diturunkan ke laju rendah
+(mis. 5 Hz) untuk menghemat CPU/baterai. Begitu EAR mendekati threshold atau
+wajah hilang, inferensi langsung kembali ke laju penuh kamera. Karena kantuk
+baru dinyatakan setelah mata tertutup beberapa ratus milidetik, jeda maksimal
+1/low_rate detik pada mode hemat tidak menunda deteksi.
+"""
+
+import time
+
+MODE_FULL = "full"
+MODE_LOW = "low"
+
+
+class AdaptiveScheduler:
+    """
+    Args:
+        low_rate (float): Laju inferensi (Hz) saat kondisi aman
+        margin (float): EAR <= threshold * (1 + margin) dianggap "mendekati"
+        stable_time (float): Lama EAR harus aman (detik) sebelum turun ke mode hemat
+    """
+
+    def __init__(self, low_rate=5.0, margin=0.25, stable_time=2.0):
+        self.low_rate = low_rate
+        self.margin = margin
+        self.stable_time = stable_time
+
+        self.mode = MODE_FULL
+        self._stable_since = None
+        self._last_run = None
+
+        self.frames_seen = 0
+        self.frames_processed = 0
+        self._started = None
+
+    def should_process(self, now=None):
+        """Apakah frame yang datang saat `now` perlu diproses FaceMesh"""
+        now = time.perf_counter() if now is None else now
+        if self._started is None:
+            self._started = now
+        self.frames_seen += 1
+
+        run = (self.mode == MODE_FULL or self._last_run is None
+               or now - self._last_run >= 1.0 / self.low_rate)
+        if run:
+            self._last_run = now
+            self.frames_processed += 1
+        return run
+
+    def update(self, ear, threshold, now=None):
+        """Perbarui mode berdasarkan hasil inferensi terakhir"""
+        now = time.perf_counter() if now is None else now
+
+        if ear is None or ear <= threshold * (1.0 + self.margin):
+            # Wajah hilang / mata mendekati tertutup → laju penuh segera
+            self.mode = MODE_FULL
+            self._stable_since = None
+            return
+
+        if self._stable_since is None:
+            self._stable_since = now
+        elif now - self._stable_since >= self.stable_time:
+            self.mode = MODE_LOW
+
+    def reset(self):
+        self.mode = MODE_FULL
+        self._stable_since = None
+        self._last_run = None
+
+    @property
+    def skipped(self):
+        return self.frames_seen - self.frames_processed
+
+    def effective_rate(self, now=None):
+        """Laju inferensi rata-rata (Hz) sejak mulai"""
+        now = time.perf_counter() if now is None else now
+        if self._started is None or now <= self._started:
+            return 0.0
+        return self.frames_processed / (now - self._started)
+
+    def cpu_saved(self, inference_seconds, busy_seconds=None, now=None):
+        """
+        Perkiraan waktu sibuk thread inferensi yang dihemat (detik).
+
+        Tanpa scheduler, thread inferensi paling banyak sibuk sepanjang waktu
+        berjalan: frame yang tidak sempat diproses dibuang LatestSlot, bukan
+        diinferensi. Jadi penghematan = min(waktu berjalan, semua frame x
+        biaya inferensi) dikurangi waktu sibuk sebenarnya.
+
+        Args:
+            inference_seconds (float): Rata-rata biaya satu inferensi
+            busy_seconds (float): Total waktu inferensi terukur; default
+                frames_processed x inference_seconds
+        """
+        now = time.perf_counter() if now is None else now
+        if self._started is None:
+            return 0.0
+        elapsed = max(0.0, now - self._started)
+        if busy_seconds is None:
+            busy_seconds = self.frames_processed * inference_seconds
+        without_scheduler = min(elapsed, self.frames_seen * inference_seconds)
+        return max(0.0, without_scheduler - busy_seconds)
+
+    def stats(self, inference_seconds=0.0, busy_seconds=None):
+        """
+        Args:
+            inference_seconds (float): Rata-rata biaya satu inferensi
+            busy_seconds (float): Total waktu inferensi terukur (lihat cpu_saved)
+        """
+        seen = self.frames_seen or 1
+        return {
+            "mode": self.mode,
+            "effective_rate": self.effective_rate(),
+            "skipped_frames": self.skipped,
+            "skipped_ratio": self.skipped / seen,
+            "cpu_saved_s": self.cpu_saved(inference_seconds, busy_seconds),
+        }
@@ -0,0 +1,290 @@
+"""
+app/temporal.py
+Analisis temporal EAR berbasis timestamp (bukan jumlah frame).
+
+ - Smoothing: median sampel dalam jendela waktu pendek (default 0.1 detik,
+   menolak jitter satu frame) lalu EMA dengan konstanta waktu tau detik.
+   Keduanya berbasis waktu, sehingga respons sama di 10 Hz maupun 60 Hz.
+ - Segmentasi kedipan: mata dianggap tertutup saat EAR halus <= threshold;
+   setiap kedipan menghasilkan BlinkEvent dengan durasinya.
+ - PERCLOS: persentase waktu mata tertutup dalam jendela geser (default
+   60 detik) yang disimpan di ring buffer dengan jumlah berjalan.
+
+Semua operasi O(1) (amortized) per frame.
+
+NodDetector melengkapi analisis EAR dengan deteksi mengangguk (kepala
+turun lalu naik kembali) dari sudut pitch FaceDetector.
+"""
+
+import math
+from collections import deque
+
+
+class BlinkEvent:
+    """Satu episode mata tertutup"""
+
+    __slots__ = ("start", "end", "duration")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.duration = end - start
+
+    def __repr__(self):
+        return f"BlinkEvent(duration={self.duration:.3f}s)"
+
+
+class TemporalState:
+    """Hasil TemporalAnalyzer.update untuk satu frame"""
+
+    __slots__ = ("timestamp", "ear", "smoothed", "closed", "closure_duration",
+                 "blink", "perclos", "drowsy", "reason")
+
+    def __init__(self, timestamp, ear, smoothed, closed, closure_duration, blink,
+                 perclos, drowsy, reason):
+        self.timestamp = timestamp
+        self.ear = ear
+        self.smoothed = smoothed
+        self.closed = closed
+        self.closure_duration = closure_duration
+        self.blink = blink
+        self.perclos = perclos
+        self.drowsy = drowsy
+        self.reason = reason
+
+
+class TemporalAnalyzer:
+    """
+    Args:
+        threshold (float): Ambang EAR mata tertutup (bisa diganti per update)
+        tau (float): Konstanta waktu EMA (detik)
+        median_window (float): Panjang jendela median sebelum EMA (detik)
+        long_closure (float): Mata tertutup terus-menerus selama ini (detik)
+            dianggap mengantuk (microsleep); kedipan normal < 0.4 detik
+        perclos_window (float): Panjang jendela PERCLOS (detik)
+        perclos_limit (float): PERCLOS >= nilai ini dianggap mengantuk
+        min_coverage (float): Data minimal di jendela (detik) sebelum PERCLOS dipakai
+        max_gap (float): Jeda antar sampel lebih dari ini (wajah hilang / lag)
+            tidak dihitung sebagai waktu mata terbuka/tertutup
+        max_samples (int): Batas ukuran ring buffer PERCLOS
+    """
+
+    def __init__(self, threshold=0.21, tau=0.1, median_window=0.1, long_closure=0.5,
+                 perclos_window=60.0, perclos_limit=0.15, min_coverage=10.0, max_gap=0.5,
+                 max_samples=10000):
+        self.threshold = threshold
+        self.tau = tau
+        self.median_window = median_window
+        self.long_closure = long_closure
+        self.perclos_window = perclos_window
+        self.perclos_limit = perclos_limit
+        self.min_coverage = min_coverage
+        self.max_gap = max_gap
+        self.max_samples = max_samples
+        self.reset()
+
+    def reset(self):
+        # (timestamp, ear) dalam jendela median
+        self._median_buf = deque()
+        self._smoothed = None
+        self._last_ts = None
+        self._closed_since = None
+        # Ring buffer PERCLOS: (timestamp, dt, dt_tertutup) + jumlah berjalan
+        self._window = deque()
+        self._total_time = 0.0
+        self._closed_time = 0.0
+        self.blink_count = 0
+        self.last_blink = None
+
+    # ------------------------------------------------------------------
+    def update(self, ear, timestamp, threshold=None):
+        """
+        Proses satu sampel EAR.
+
+        Args:
+            ear (float | None): EAR mentah (None = wajah tidak terdeteksi)
+            timestamp (float): Waktu sampel (detik, monoton; mis.
+                FrameResult.captured_at dari time.perf_counter())
+            threshold (float): Override threshold (mis. hasil kalibrasi)
+
+        Returns:
+            TemporalState
+        """
+        if threshold is not None:
+            self.threshold = threshold
+
+        dt = 0.0 if self._last_ts is None else timestamp - self._last_ts
+        gap = dt > self.max_gap or dt < 0
+        self._last_ts = timestamp
+
+        if ear is None:
+            # Wajah hilang: episode tertutup yang sedang berjalan dihentikan
+            self._closed_since = None
+            self._median_buf.clear()
+            self._smoothed = None
+            return self._state(timestamp, None, False, None, False, None)
+
+        # Median sampel dalam median_window detik terakhir lalu EMA berbasis waktu
+        if gap:
+            self._median_buf.clear()
+        self._median_buf.append((timestamp, ear))
+        self._evict_median(timestamp)
+        med = self._median()
+        if self._smoothed is None or gap:
+            self._smoothed = med
+        else:
+            alpha = 1.0 - math.exp(-dt / self.tau) if self.tau > 0 else 1.0
+            self._smoothed += alpha * (med - self._smoothed)
+
+        closed = self._smoothed <= self.threshold
+
+        # Segmentasi kedipan
+        blink = None
+        if closed and self._closed_since is None:
+            self._closed_since = timestamp
+        elif not closed and self._closed_since is not None:
+            blink = BlinkEvent(self._closed_since, timestamp)
+            self._closed_since = None
+            self.blink_count += 1
+            self.last_blink = blink
+
+        # PERCLOS: waktu sejak sampel sebelumnya dihitung dengan status saat ini
+        if not gap and dt > 0:
+            self._push(timestamp, dt, dt if closed else 0.0)
+        self._evict(timestamp - self.perclos_window)
+
+        closure = timestamp - self._closed_since if self._closed_since is not None else 0.0
+        return self._state(timestamp, ear, closed, blink, True, closure)
+
+    def _evict_median(self, timestamp):
+        # Toleransi kecil agar sampel tepat di tepi jendela (mis. 10 Hz) tetap ikut
+        cutoff = timestamp - self.median_window - 1e-6
+        buf = self._median_buf
+        while len(buf) > 1 and buf[0][0] < cutoff:
+            buf.popleft()
+
+    def _median(self):
+        values = sorted(ear for _, ear in self._median_buf)
+        mid = len(values) // 2
+        if len(values) % 2:
+            return values[mid]
+        return (values[mid - 1] + values[mid]) / 2.0
+
+    def _push(self, timestamp, dt, closed_dt):
+        if len(self._window) >= self.max_samples:
+            _, old_dt, old_closed = self._window.popleft()
+            self._total_time -= old_dt
+            self._closed_time -= old_closed
+        self._window.append((timestamp, dt, closed_dt))
+        self._total_time += dt
+        self._closed_time += closed_dt
+
+    def _evict(self, cutoff):
+        window = self._window
+        while window and window[0][0] < cutoff:
+            _, dt, closed_dt = window.popleft()
+            self._total_time -= dt
+            self._closed_time -= closed_dt
+
+    @property
+    def perclos(self):
+        """Rasio waktu mata tertutup di jendela, None jika data belum cukup"""
+        if self._total_time < self.min_coverage or self._total_time <= 0:
+            return None
+        return max(0.0, self._closed_time / self._total_time)
+
+    def _state(self, timestamp, ear, closed, blink, has_face, closure):
+        perclos = self.perclos
+        reason = None
+        if has_face and closure is not None and closure >= self.long_closure:
+            reason = "mata tertutup %.1f detik" % closure
+        elif perclos is not None and perclos >= self.perclos_limit:
+            reason = "PERCLOS %.0f%%" % (perclos * 100)
+        return TemporalState(timestamp, ear, self._smoothed, closed, closure or 0.0, blink,
+                             perclos, reason is not None, reason)
+
+
+class NodDetector:
+    """
+    Deteksi anggukan kantuk dari pitch kepala (derajat, positif = menunduk).
+
+    Baseline pitch mengikuti posisi kepala normal lewat EMA lambat (hanya
+    diperbarui saat kepala tidak sedang turun). Anggukan = pitch turun lebih
+    dari drop derajat di bawah baseline lalu kembali dalam max_duration
+    detik. Kepala yang tetap tertunduk lebih dari max_duration dilaporkan
+    lewat head_down.
+
+    Args:
+        drop (float): Selisih pitch dari baseline untuk dianggap turun
+        max_duration (float): Batas lama satu anggukan (detik)
+        tau (float): Konstanta waktu EMA baseline (detik)
+        window (float): Jendela hitung anggukan (detik)
+        nod_limit (int): Jumlah anggukan di jendela yang dianggap mengantuk
+    """
+
+    def __init__(self, drop=15.0, max_duration=2.0, tau=5.0, window=60.0, nod_limit=3):
+        self.drop = drop
+        self.max_duration = max_duration
+        self.tau = tau
+        self.window = window
+        self.nod_limit = nod_limit
+        self.reset()
+
+    def reset(self):
+        self.baseline = None
+        self._last_ts = None
+        self._down_since = None
+        self._nods = deque()
+        self.nod_count = 0
+        self.head_down = False
+
+    def update(self, pitch, timestamp):
+        """
+        Proses satu sampel pitch (None = pose tidak tersedia).
+
+        Returns:
+            bool: True jika satu anggukan baru saja selesai di sampel ini
+        """
+        dt = 0.0 if self._last_ts is None else timestamp - self._last_ts
+        self._last_ts = timestamp
+        while self._nods and self._nods[0] < timestamp - self.window:
+            self._nods.popleft()
+
+        if pitch is None:
+            self._down_since = None
+            self.head_down = False
+            return False
+
+        if self.baseline is None:
+            self.baseline = pitch
+            return False
+
+        nodded = False
+        if pitch - self.baseline >= self.drop:
+            if self._down_since is None:
+                self._down_since = timestamp
+            self.head_down = timestamp - self._down_since > self.max_duration
+        else:
+            if self._down_since is not None and timestamp - self._down_since <= self.max_duration:
+                self._nods.append(timestamp)
+                self.nod_count += 1
+                nodded = True
+            self._down_since = None
+            self.head_down = False
+            if dt > 0 and self.tau > 0:
+                self.baseline += (1.0 - math.exp(-dt / self.tau)) * (pitch - self.baseline)
+        return nodded
+
+    @property
+    def recent_nods(self):
+        """Jumlah anggukan dalam jendela terakhir"""
+        return len(self._nods)
+
+    @property
+    def reason(self):
+        """Alasan peringatan berbasis pose kepala, None jika normal"""
+        if self.head_down:
+            return "kepala tertunduk"
+        if len(self._nods) >= self.nod_limit:
+            return "mengangguk %d kali" % len(self._nods)
+        return None
@@ -33,13 +33,41 @@ def ensure_directories():
     for directory in directories:
         os.makedirs(directory, exist_ok=True)
 
-def check_camera_permission():
+def default_log_path():
+    """
+    Lokasi file log EAR. Bisa diganti lewat variabel lingkungan EAR_LOG_FILE;
+    ekstensi menentukan backend (.csv, .bin, .db).
+    """
+    return os.environ.get("EAR_LOG_FILE", os.path.join("data", "ear_log.csv"))
+
+def default_detector_tier():
+    """
+    Tier deteksi wajah untuk aplikasi dari variabel lingkungan
+    EAR_DETECTOR_TIER: mesh (default), tiered, atau haar (hardware lemah).
+    """
+    return os.environ.get("EAR_DETECTOR_TIER", "mesh")
+
+def default_detector_roi():
+    """
+    Mode ROI FaceMesh dari variabel lingkungan EAR_DETECTOR_ROI
+    (1 / true / yes = aktif). Default nonaktif.
+    """
+    return os.environ.get("EAR_DETECTOR_ROI", "").strip().lower() in ("1", "true", "yes", "on")
+
+def check_camera_permission(camera_manager=None):
     """
     Memeriksa apakah aplikasi memiliki akses ke kamera
     
+    Args:
+        camera_manager (CameraManager): Jika diberikan, sesi kamera yang sudah
+            terbuka dipakai ulang (tidak membuka perangkat dua kali)
+
     Returns:
         bool: True jika kamera dapat diakses
     """
+    if camera_manager is not None:
+        return camera_manager.probe()
+
     import cv2
     try:
         cap = cv2.VideoCapture(0)
@@ -49,4 +77,4 @@ def check_camera_permission():
             return ret
         return False
     except:
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,226 @@
+"""
+app/video_analyzer.py
+Analisis offline (headless) untuk rekaman video atau folder berisi frame.
+Tidak memakai Tkinter dan tidak ada jeda antar frame: frame diproses
+secepat CPU mampu oleh FaceDetector dalam mode video/tracking.
+
+Contoh CLI:
+    python -m app.video_analyzer rekaman.mp4 -o data/rekaman_ear.csv
+    python -m app.video_analyzer folder_frame/ --fps 30
+"""
+
+import argparse
+import os
+import time
+
+import cv2
+import pandas as pd
+
+from app.face_detector import TIERS, FaceDetector
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+RESULT_COLUMNS = ["frame_index", "timestamp_ms", "ear", "status"]
+
+
+def list_image_frames(directory):
+    """Daftar file gambar di folder, diurutkan berdasarkan nama"""
+    names = sorted(n for n in os.listdir(directory) if n.lower().endswith(IMAGE_EXTENSIONS))
+    return [os.path.join(directory, n) for n in names]
+
+
+def count_frames(path):
+    """Jumlah frame pada video atau folder frame"""
+    if os.path.isdir(path):
+        return len(list_image_frames(path))
+
+    cap = cv2.VideoCapture(path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def iter_frames(path, start_frame=0, end_frame=None, fps=None):
+    """
+    Membaca frame dari file video atau folder frame.
+
+    Args:
+        path (str): File video atau folder berisi gambar
+        start_frame (int): Indeks frame pertama yang dibaca (seek)
+        end_frame (int): Indeks frame terakhir (eksklusif), None = sampai habis
+        fps (float): FPS untuk menghitung timestamp. Wajib untuk folder frame
+            (default 10), opsional untuk video (default dari metadata)
+
+    Yields:
+        (frame_index, timestamp_ms, frame)
+    """
+    if os.path.isdir(path):
+        fps = fps or 10.0
+        files = list_image_frames(path)[start_frame:end_frame]
+        for offset, file in enumerate(files):
+            frame = cv2.imread(file)
+            if frame is None:
+                continue
+            idx = start_frame + offset
+            yield idx, idx * 1000.0 / fps, frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Gagal membuka video: {path}")
+
+    try:
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or None
+        idx = 0
+        if start_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            # Seek pada sebagian codec mendarat di keyframe sebelumnya atau
+            # diabaikan (posisi 0). Indeks selalu dari posisi yang dilaporkan;
+            # frame di depan start_frame di-grab (tanpa decode) sampai pas
+            idx = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            if idx > start_frame:
+                raise IOError(f"Seek ke frame {start_frame} mendarat di frame {idx}: {path}")
+            while idx < start_frame:
+                if not cap.grab():
+                    return
+                idx += 1
+        while end_frame is None or idx < end_frame:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            # Timestamp media dari container, fallback ke indeks / FPS
+            ts = cap.get(cv2.CAP_PROP_POS_MSEC)
+            if (not ts and idx) and fps:
+                ts = idx * 1000.0 / fps
+            yield idx, ts, frame
+            idx += 1
+    finally:
+        cap.release()
+
+
+def analyze_frames(frames, detector):
+    """
+    Menjalankan detector pada iterable (frame_index, timestamp_ms, frame).
+
+    Returns:
+        list: Baris [frame_index, timestamp_ms, ear, status]
+    """
+    rows = []
+    for idx, ts, frame in frames:
+        _, ear_value, status = detector.process_frame(frame)
+        rows.append((idx, ts, ear_value, status))
+    return rows
+
+
+def analyze_video(path, threshold=0.21, start_frame=0, end_frame=None, fps=None, detector=None,
+                  tier="mesh", roi_mode=False):
+    """
+    Analisis EAR per frame untuk satu video / folder frame tanpa GUI.
+
+    Returns:
+        pd.DataFrame: Kolom frame_index, timestamp_ms, ear, status.
+        Statistik ada di df.attrs (frames, elapsed_s, processing_fps,
+        mesh_skipped = frame yang tidak perlu FaceMesh berkat tier deteksi).
+    """
+    if detector is None:
+        detector = FaceDetector(threshold=threshold, draw_overlay=False, tier=tier,
+                                roi_mode=roi_mode)
+
+    skipped_before = detector.mesh_skipped
+    start = time.perf_counter()
+    rows = analyze_frames(iter_frames(path, start_frame, end_frame, fps), detector)
+    elapsed = time.perf_counter() - start
+
+    df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    df.attrs.update({
+        "source": path,
+        "frames": len(df),
+        "elapsed_s": elapsed,
+        "processing_fps": len(df) / elapsed if elapsed > 0 else 0.0,
+        "tier": detector.tier,
+        "mesh_skipped": detector.mesh_skipped - skipped_before,
+    })
+    return df
+
+
+def summarize(df):
+    """Ringkasan satu baris untuk hasil analisis"""
+    detected = df["ear"].notna().sum()
+    drowsy = (df["status"] == "Mengantuk").sum()
+    return (f"{df.attrs.get('source', '-')}: {len(df)} frame, "
+            f"{detected} wajah terdeteksi, {drowsy} frame mengantuk, "
+            f"{df.attrs.get('elapsed_s', 0.0):.2f} s "
+            f"({df.attrs.get('processing_fps', 0.0):.1f} frame/detik)"
+            + (f", FaceMesh dihindari {df.attrs['mesh_skipped']} frame"
+               if df.attrs.get("tier", "mesh") != "mesh" else ""))
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Analisis EAR offline untuk video / folder frame")
+    parser.add_argument("inputs", nargs="+", help="File video atau folder berisi frame")
+    parser.add_argument("-o", "--output", help="Simpan hasil ke CSV (kolom 'source' ditambahkan)")
+    parser.add_argument("--threshold", type=float, default=0.21, help="Ambang batas EAR")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="FPS untuk timestamp folder frame / override metadata video")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Jumlah proses paralel (>1 memakai app.parallel_analyzer)")
+    parser.add_argument("--chunk-frames", type=int, default=3000,
+                        help="Ukuran potongan video per proses (mode paralel)")
+    parser.add_argument("--tier", choices=TIERS, default="mesh",
+                        help="Tier deteksi: mesh (FaceMesh tiap frame), tiered (cek Haar dulu "
+                             "saat wajah tidak terlacak), haar (keberadaan wajah saja)")
+    parser.add_argument("--roi", action="store_true",
+                        help="Setelah wajah ditemukan, FaceMesh hanya dijalankan di ROI wajah")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    if args.workers > 1:
+        from app.parallel_analyzer import analyze_parallel
+
+        df = analyze_parallel(args.inputs, workers=args.workers, chunk_frames=args.chunk_frames,
+                              threshold=args.threshold, fps=args.fps, tier=args.tier,
+                              roi_mode=args.roi)
+        print(f"Total: {df.attrs['frames']} frame, {df.attrs['elapsed_s']:.2f} s, "
+              f"{df.attrs['processing_fps']:.1f} frame/detik dengan {df.attrs['workers']} proses")
+        if args.tier != "mesh":
+            print(f"FaceMesh dihindari: {df.attrs['mesh_skipped']} frame")
+        if args.output:
+            _save_csv(df, args.output)
+        return
+
+    detector = FaceDetector(threshold=args.threshold, draw_overlay=False, tier=args.tier,
+                            roi_mode=args.roi)
+    results = []
+    total_frames, total_elapsed = 0, 0.0
+
+    for path in args.inputs:
+        df = analyze_video(path, fps=args.fps, detector=detector)
+        # Tracking FaceMesh tidak boleh terbawa dari video sebelumnya
+        detector.reset_tracking()
+        print(summarize(df))
+
+        total_frames += df.attrs["frames"]
+        total_elapsed += df.attrs["elapsed_s"]
+        results.append(df.assign(source=path))
+
+    if total_elapsed > 0:
+        print(f"Total: {total_frames} frame, {total_frames / total_elapsed:.1f} frame/detik")
+
+    if args.output and results:
+        _save_csv(pd.concat(results, ignore_index=True), args.output)
+
+
+def _save_csv(df, path):
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    df.to_csv(path, index=False)
+    print(f"Hasil disimpan ke {path}")
+
+
+if __name__ == "__main__":
+    main()
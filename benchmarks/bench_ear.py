@@ -0,0 +1,134 @@
+"""
+Microbenchmark perhitungan EAR per frame.
+
+Membandingkan implementasi lama (loop Python + int() + 6x scipy euclidean)
+dengan jalur vektor FaceDetector (buffer (12, 2) float32 + satu norm batch).
+Juga mengukur biaya fitur tambahan (MAR + pose kepala solvePnP) yang
+dihitung dari pass FaceMesh yang sama. Landmark dibuat sintetis sehingga
+FaceMesh/kamera tidak diperlukan.
+
+Jalankan dari root repo:
+    python benchmarks/bench_ear.py [--frames 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.spatial import distance as dist
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.face_detector import FaceDetector, compute_ear
+
+
+class _Landmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y):
+        self.x, self.y, self.z = x, y, 0.0
+
+
+class _FaceLandmarks:
+    """Meniru struktur NormalizedLandmarkList milik MediaPipe"""
+
+    def __init__(self, rng, n=478):
+        self.landmark = [_Landmark(*rng.uniform(0.2, 0.8, size=2)) for _ in range(n)]
+
+
+def _legacy_ear(landmarks, left_idx, right_idx, w, h):
+    def eye_points(indexes):
+        points = []
+        for idx in indexes:
+            lm = landmarks.landmark[idx]
+            points.append((int(lm.x * w), int(lm.y * h)))
+        return points
+
+    def ear(p):
+        p1, p2, p3, p4, p5, p6 = p
+        horizontal = dist.euclidean(p1, p4)
+        if horizontal == 0:
+            return 0.0
+        return (dist.euclidean(p2, p6) + dist.euclidean(p3, p5)) / (2.0 * horizontal)
+
+    return (ear(eye_points(left_idx)) + ear(eye_points(right_idx))) / 2.0
+
+
+def _vector_ear(detector, landmarks, w, h):
+    points = detector._get_points(landmarks, w, h)
+    left, right = compute_ear(points.reshape(2, 6, 2))
+    return float(left + right) / 2.0
+
+
+def _features_detector(base):
+    """Detector tiruan dengan buffer titik mata + mulut + pose (tanpa FaceMesh)"""
+    detector = FaceDetector.__new__(FaceDetector)
+    detector.left_eye_idx = base.left_eye_idx
+    detector.right_eye_idx = base.right_eye_idx
+    detector.mar_threshold = 0.6
+    detector._pose_rvec = detector._pose_tvec = None
+
+    rows = {}
+    for idx in base.eye_idx + FaceDetector.MOUTH_IDX + FaceDetector.POSE_IDX:
+        rows.setdefault(idx, len(rows))
+    detector.point_idx = tuple(rows)
+    detector._points = np.empty((len(rows), 2), dtype=np.float32)
+    detector._mouth_rows = np.array([rows[i] for i in FaceDetector.MOUTH_IDX])
+    detector._pose_rows = np.array([rows[i] for i in FaceDetector.POSE_IDX])
+    return detector
+
+
+def _vector_features(detector, landmarks, w, h):
+    points = detector._get_points(landmarks, w, h)
+    left, right = compute_ear(points[:12].reshape(2, 6, 2))
+    ear = float(left + right) / 2.0
+    return detector._compute_features(points, (h, w), ear, float(left), float(right))
+
+
+def _bench(fn, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    w, h = 640, 480
+    rng = np.random.default_rng(0)
+    landmarks = _FaceLandmarks(rng)
+
+    # Hindari inisialisasi FaceMesh: benchmark hanya mengukur jalur EAR
+    detector = FaceDetector.__new__(FaceDetector)
+    detector.left_eye_idx = [33, 160, 158, 133, 153, 144]
+    detector.right_eye_idx = [362, 385, 387, 263, 373, 380]
+    detector.eye_idx = tuple(detector.left_eye_idx + detector.right_eye_idx)
+    detector.point_idx = detector.eye_idx
+    detector._points = np.empty((12, 2), dtype=np.float32)
+
+    legacy = _legacy_ear(landmarks, detector.left_eye_idx, detector.right_eye_idx, w, h)
+    vector = _vector_ear(detector, landmarks, w, h)
+
+    t_legacy = _bench(lambda: _legacy_ear(landmarks, detector.left_eye_idx,
+                                          detector.right_eye_idx, w, h), args.frames)
+    t_vector = _bench(lambda: _vector_ear(detector, landmarks, w, h), args.frames)
+
+    print(f"Frames          : {args.frames}")
+    print(f"Legacy (scipy)  : {t_legacy:8.2f} us/frame  EAR={legacy:.5f}")
+    print(f"Vector (numpy)  : {t_vector:8.2f} us/frame  EAR={vector:.5f}")
+    print(f"Speedup         : {t_legacy / t_vector:8.2f}x")
+    print(f"Selisih EAR (kuantisasi int): {abs(legacy - vector):.5f}")
+
+    feat_detector = _features_detector(detector)
+    t_features = _bench(lambda: _vector_features(feat_detector, landmarks, w, h), args.frames)
+    print(f"EAR+MAR+pose    : {t_features:8.2f} us/frame  "
+          f"(fitur tambahan {t_features - t_vector:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
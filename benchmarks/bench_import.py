@@ -0,0 +1,133 @@
+"""
+Benchmark waktu import (`python -X importtime`) untuk startup aplikasi.
+
+Mengukur waktu kumulatif `import app` dan `import app.gui` di interpreter
+baru, menampilkan modul termahal, dan memeriksa bahwa:
+  - waktu import tidak melebihi anggaran (ms),
+  - modul berat (cv2, mediapipe, numpy, pandas, matplotlib, PIL, scipy)
+    belum termuat setelah `import app.gui` (dimuat di thread latar GUI),
+  - `import app` tidak mencetak apa pun dan tidak membuat folder di CWD.
+
+Pengecekan yang sama dijalankan pytest di tests/test_import_budget.py;
+`--check` memberi exit code 1 jika ada yang gagal (untuk skrip / CI).
+
+Jalankan dari root repo:
+    python benchmarks/bench_import.py [--runs 3] [--top 10] [--check]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Anggaran waktu import kumulatif (ms), nilai terbaik dari beberapa run
+BUDGETS_MS = {
+    "app": 50.0,
+    "app.gui": 400.0,
+}
+
+HEAVY_MODULES = ("cv2", "mediapipe", "numpy", "pandas", "matplotlib", "PIL", "scipy")
+
+
+def _python(code, cwd=ROOT, importtime=False):
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run(args + ["-c", code], cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def parse_importtime(stderr):
+    """
+    Parse keluaran -X importtime.
+
+    Returns:
+        dict nama modul -> (self_us, cumulative_us)
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return times
+
+
+def measure(module, runs):
+    """Waktu kumulatif terbaik (ms) dan rincian run terakhir"""
+    best, times = None, {}
+    for _ in range(runs):
+        result = _python(f"import {module}", importtime=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} gagal:\n{result.stderr[-2000:]}")
+        times = parse_importtime(result.stderr)
+        total = times.get(module, (0, 0))[1] / 1000.0
+        best = total if best is None else min(best, total)
+    return best, times
+
+
+def heavy_modules_loaded(module):
+    code = (f"import sys, {module}\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = _python(code)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} gagal:\n{result.stderr[-2000:]}")
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def import_side_effects():
+    """Keluaran stdout & isi CWD setelah `import app` di direktori kosong"""
+    with tempfile.TemporaryDirectory() as cwd:
+        result = _python("import app", cwd=cwd)
+        if result.returncode != 0:
+            raise RuntimeError(f"import app gagal:\n{result.stderr[-2000:]}")
+        return result.stdout, sorted(os.listdir(cwd))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Jumlah run per modul (diambil terbaik)")
+    parser.add_argument("--top", type=int, default=10, help="Jumlah modul termahal yang ditampilkan")
+    parser.add_argument("--check", action="store_true", help="Exit 1 jika anggaran / pengecekan gagal")
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget in BUDGETS_MS.items():
+        total, times = measure(module, args.runs)
+        ok = total <= budget
+        print(f"import {module:8s}: {total:7.1f} ms (anggaran {budget:.0f} ms) {'OK' if ok else 'LEWAT'}")
+        if not ok:
+            failures.append(f"import {module} {total:.1f} ms > {budget:.0f} ms")
+
+        top = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+        for name, (self_us, cumulative_us) in top:
+            print(f"    {self_us / 1000.0:7.2f} ms self  {cumulative_us / 1000.0:7.2f} ms kumulatif  {name}")
+
+    heavy = heavy_modules_loaded("app.gui")
+    print("Modul berat setelah import app.gui:", ", ".join(heavy) or "tidak ada")
+    if heavy:
+        failures.append("import app.gui memuat " + ", ".join(heavy))
+
+    stdout, created = import_side_effects()
+    print(f"import app: stdout {len(stdout)} karakter, isi CWD {created or 'kosong'}")
+    if stdout:
+        failures.append(f"import app mencetak: {stdout.strip()[:80]!r}")
+    if created:
+        failures.append("import app membuat " + ", ".join(created))
+
+    for failure in failures:
+        print("GAGAL:", failure)
+    if args.check and failures:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Benchmark throughput EarLogger (baris/detik).
+
+Membandingkan cara lama (open -> csv.writer -> tulis 1 baris -> close per
+frame) dengan EarLogger ber-buffer (append ke memori, flush batch oleh thread
+latar). Semua file ditulis ke folder sementara.
+
+Jalankan dari root repo:
+    python benchmarks/bench_logger.py [--rows 20000]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ear_logger import EarLogger
+
+
+def _legacy_append(filename, ear, status):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(filename, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([timestamp, ear, status])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, "legacy.csv")
+        t0 = time.perf_counter()
+        for i in range(args.rows):
+            _legacy_append(legacy_file, 0.25 + (i % 10) * 0.001, "Normal")
+        t_legacy = time.perf_counter() - t0
+
+        logger = EarLogger(os.path.join(tmp, "buffered.csv"))
+        t0 = time.perf_counter()
+        for i in range(args.rows):
+            logger.append(0.25 + (i % 10) * 0.001, "Normal")
+        t_append = time.perf_counter() - t0
+        logger.close()
+        t_total = time.perf_counter() - t0
+
+    print(f"Baris               : {args.rows}")
+    print(f"Lama (open/close)   : {args.rows / t_legacy:12.0f} baris/detik "
+          f"({t_legacy / args.rows * 1e6:.1f} us/baris di thread kamera)")
+    print(f"Buffer (append)     : {args.rows / t_append:12.0f} baris/detik "
+          f"({t_append / args.rows * 1e6:.1f} us/baris di thread kamera)")
+    print(f"Buffer (s.d. close) : {args.rows / t_total:12.0f} baris/detik")
+    print(f"Baris dibuang       : {logger.dropped_rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark mode ROI FaceDetector (crop di sekitar wajah) vs frame penuh.
+
+Frame dibaca sekali ke memori dari video / folder frame, lalu diproses oleh
+dua FaceDetector (roi_mode=False dan roi_mode=True) sehingga yang terukur
+hanya biaya inferensi per frame.
+
+Jalankan dari root repo:
+    python benchmarks/bench_roi.py rekaman.mp4 [--frames 600] [--roi-size 256]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.face_detector import FaceDetector
+from app.video_analyzer import iter_frames
+
+
+def _run(detector, frames):
+    ears = []
+    start = time.perf_counter()
+    for frame in frames:
+        _, ear, _ = detector.process_frame(frame)
+        ears.append(np.nan if ear is None else ear)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(frames) * 1000.0, np.array(ears)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", help="File video atau folder frame berisi wajah")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--roi-size", type=int, default=256)
+    args = parser.parse_args()
+
+    frames = [f for _, _, f in iter_frames(args.video, 0, args.frames)]
+    if not frames:
+        print("Tidak ada frame yang terbaca")
+        return 1
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frame {w}x{h}")
+
+    full = FaceDetector(draw_overlay=False)
+    roi = FaceDetector(draw_overlay=False, roi_mode=True, roi_size=args.roi_size)
+
+    # Pemanasan graph agar inisialisasi tidak ikut terukur
+    for detector in (full, roi):
+        for frame in frames[:10]:
+            detector.process_frame(frame.copy())
+        detector.reset_tracking()
+    roi.roi_hits = roi.full_frame_runs = 0
+
+    t_full, ear_full = _run(full, [f.copy() for f in frames])
+    t_roi, ear_roi = _run(roi, [f.copy() for f in frames])
+
+    both = ~np.isnan(ear_full) & ~np.isnan(ear_roi)
+    print(f"Frame penuh : {t_full:7.2f} ms/frame, wajah di {np.count_nonzero(~np.isnan(ear_full))} frame")
+    print(f"ROI         : {t_roi:7.2f} ms/frame, wajah di {np.count_nonzero(~np.isnan(ear_roi))} frame "
+          f"(ROI {roi.roi_hits}x, frame penuh {roi.full_frame_runs}x)")
+    print(f"Hemat       : {(1 - t_roi / t_full) * 100:6.1f} %")
+    if both.any():
+        print(f"Selisih EAR : rata-rata {np.mean(np.abs(ear_full[both] - ear_roi[both])):.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Benchmark tier deteksi FaceDetector: "mesh" vs "tiered" vs "haar".
+
+Rekaman yang sebagian frame-nya tanpa wajah (pengemudi keluar kabin, kamera
+tertutup) menunjukkan berapa panggilan FaceMesh yang dihindari tier "tiered"
+dan biaya rata-rata per frame tiap tier.
+
+Jalankan dari root repo:
+    python benchmarks/bench_tier.py rekaman.mp4 [--frames 600]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.face_detector import TIERS, FaceDetector
+from app.video_analyzer import iter_frames
+
+
+def _run(detector, frames):
+    ears = []
+    start = time.perf_counter()
+    for frame in frames:
+        _, ear, _ = detector.process_frame(frame)
+        ears.append(np.nan if ear is None else ear)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(frames) * 1000.0, np.array(ears)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", help="File video atau folder frame")
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    frames = [f for _, _, f in iter_frames(args.video, 0, args.frames)]
+    if not frames:
+        print("Tidak ada frame yang terbaca")
+        return 1
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frame {w}x{h}")
+
+    for tier in TIERS:
+        detector = FaceDetector(draw_overlay=False, tier=tier)
+        # Pemanasan graph agar inisialisasi tidak ikut terukur
+        for frame in frames[:10]:
+            detector.process_frame(frame.copy())
+        detector.reset_tracking()
+        detector.mesh_frames = detector.mesh_skipped = 0
+
+        t, ears = _run(detector, [f.copy() for f in frames])
+        stats = detector.tier_stats()
+        print(f"{tier:7s}: {t:7.2f} ms/frame, EAR di {np.count_nonzero(~np.isnan(ears))} frame, "
+              f"FaceMesh {stats['mesh_frames']}x, dihindari {stats['mesh_skipped']}x "
+              f"({stats['mesh_skip_ratio'] * 100:.0f} %)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
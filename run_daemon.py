@@ -0,0 +1,14 @@
+"""
+Script untuk menjalankan Sistem Deteksi Mengantuk tanpa GUI (unit tanpa layar)
+"""
+import sys
+import os
+
+# Tambahkan root directory ke Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app.daemon import main
+
+if __name__ == "__main__":
+    main()
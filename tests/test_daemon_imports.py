@@ -0,0 +1,41 @@
+"""Mode headless tidak boleh memuat pustaka GUI (tkinter, matplotlib)"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_daemon_and_detector_do_not_load_gui_modules():
+    # Interpreter baru: modul yang sudah dimuat test lain tidak ikut terhitung
+    code = ("import sys\n"
+            "import app.daemon, app.face_detector\n"
+            "print(','.join(m for m in ('matplotlib', 'tkinter') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_face_mesh_still_available_after_import():
+    from app.face_detector import mp_face_mesh
+
+    assert hasattr(mp_face_mesh, "FaceMesh")
+
+
+def test_real_drawing_utils_still_importable():
+    # Interpreter baru: placeholder hanya aktif saat mediapipe pertama kali di-import
+    code = ("import app.face_detector\n"
+            "import mediapipe as mp\n"
+            "from mediapipe.python.solutions import drawing_styles, drawing_utils\n"
+            "assert hasattr(drawing_utils, 'draw_landmarks')\n"
+            "assert mp.solutions.drawing_utils is drawing_utils\n"
+            "assert drawing_styles.DrawingSpec is drawing_utils.DrawingSpec\n")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,77 @@
+"""DetectionService membuka ulang kamera saat pipeline berhenti sendiri"""
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from app.daemon import DetectionService
+
+
+class _DyingCapture:
+    """Mengirim beberapa frame lalu gagal terus (kamera dicabut)"""
+
+    def __init__(self, frames=5):
+        self.frames = frames
+
+    def read(self):
+        time.sleep(0.01)
+        if self.frames <= 0:
+            return False, None
+        self.frames -= 1
+        return True, np.zeros((48, 64, 3), np.uint8)
+
+    def describe(self):
+        return "test"
+
+    def release(self):
+        pass
+
+
+class _FakeCamera:
+    def __init__(self):
+        self.cap = None
+        self.error = None
+        self.opens = 0
+
+    def open(self, timeout=None):
+        self.opens += 1
+        self.cap = _DyingCapture()
+        return True
+
+    def close(self):
+        self.cap = None
+
+
+def test_pipeline_stop_reopens_camera_with_new_session(tmp_path):
+    service = DetectionService(log_file=str(tmp_path / "log.csv"), alert_sinks=[],
+                               max_read_failures=3, retry_interval=0.1)
+    service.camera = _FakeCamera()
+    sessions = []
+    start_session = service.logger.start_session
+
+    def _start_session(*args, **kwargs):
+        # Sesi harus sudah dibuka sebelum pipeline berjalan
+        sessions.append(service.pipeline.is_running if service.pipeline is not None else None)
+        return start_session(*args, **kwargs)
+
+    service.logger.start_session = _start_session
+    thread = threading.Thread(target=service.run, daemon=True)
+    thread.start()
+    try:
+        deadline = time.perf_counter() + 10.0
+        while service.camera.opens < 2 and time.perf_counter() < deadline:
+            time.sleep(0.05)
+    finally:
+        service.stop()
+        thread.join(timeout=10.0)
+        service.shutdown()
+
+    assert not thread.is_alive()
+    assert service.camera.opens >= 2
+    assert len(sessions) >= 2
+    # Pipeline lama sudah berhenti, pipeline baru belum dimulai saat sesi dibuka
+    assert all(running in (None, False) for running in sessions)
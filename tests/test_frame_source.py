@@ -0,0 +1,32 @@
+"""Pipeline GStreamer yang dibangun dari CaptureConfig (tanpa kamera)"""
+import pytest
+
+pytest.importorskip("cv2")
+
+from app.frame_source import CaptureConfig, GStreamerSource
+
+
+def _pipeline(**kwargs):
+    return GStreamerSource(CaptureConfig(kind="gstreamer", **kwargs)).build_pipeline()
+
+
+def test_yuyv_maps_to_gstreamer_yuy2():
+    pipeline = _pipeline(device=0, width=640, height=480, fps=30, fourcc="YUYV")
+    assert "video/x-raw,format=YUY2,width=640,height=480,framerate=30/1" in pipeline
+    assert "YUYV" not in pipeline
+    assert pipeline.startswith("v4l2src device=/dev/video0 ! ")
+
+
+def test_unmapped_fourcc_is_passed_through():
+    assert "video/x-raw,format=UYVY ! videoconvert" in _pipeline(device=0, fourcc="uyvy")
+
+
+def test_mjpg_default_uses_jpegdec():
+    pipeline = _pipeline(device="/dev/video2", width=1280)
+    assert "image/jpeg,width=1280 ! jpegdec" in pipeline
+    assert pipeline.endswith("appsink drop=true max-buffers=1 sync=false")
+
+
+def test_explicit_pipeline_is_used_as_is():
+    custom = "videotestsrc ! videoconvert ! appsink"
+    assert _pipeline(device=custom) == custom
@@ -0,0 +1,26 @@
+"""Anggaran waktu import & import tanpa efek samping (benchmarks/bench_import.py)"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import bench_import  # noqa: E402
+
+
+@pytest.mark.parametrize("module", sorted(bench_import.BUDGETS_MS))
+def test_import_time_within_budget(module):
+    total, _ = bench_import.measure(module, runs=3)
+    assert total <= bench_import.BUDGETS_MS[module]
+
+
+def test_gui_import_does_not_load_heavy_modules():
+    assert bench_import.heavy_modules_loaded("app.gui") == []
+
+
+def test_import_app_has_no_side_effects():
+    stdout, created = bench_import.import_side_effects()
+    assert stdout == ""
+    assert created == []
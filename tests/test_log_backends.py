@@ -0,0 +1,81 @@
+"""BinaryBackend: tulis -> baca -> ekspor CSV, melewati GROW_RECORDS dan DST"""
+import csv
+import time
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+dateutil_tz = pytest.importorskip("dateutil.tz")
+
+from app import log_backends
+from app.log_backends import TIMESTAMP_FORMAT, BinaryBackend
+
+# 2024-03-30 23:00 UTC: DST Eropa Tengah mulai 2024-03-31 01:00 UTC
+START_S = 1711839600
+
+
+@pytest.fixture
+def berlin_tz(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset tidak tersedia di platform ini")
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    monkeypatch.setattr(log_backends, "LOCAL_TZ", dateutil_tz.tzlocal())
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _rows(n, step_s=1):
+    statuses = ["Normal", "Mengantuk", "Tidak Terdeteksi"]
+    return [((START_S + i * step_s) * 1_000_000_000, 0.1 + (i % 30) / 100.0, statuses[i % 3])
+            for i in range(n)]
+
+
+def test_binary_round_trip_across_growth_and_dst(tmp_path, berlin_tz):
+    n = BinaryBackend.GROW_RECORDS + 10
+    rows = _rows(n)
+    backend = BinaryBackend(str(tmp_path / "log.bin"))
+    # Dua batch agar write_records harus memperbesar file di tengah jalan
+    backend.write_rows(rows[:n // 2])
+    backend.write_rows(rows[n // 2:])
+    assert backend.count == n
+    assert backend.capacity >= n
+
+    df = backend.read_all()
+    assert len(df) == n
+    expected = [datetime.fromtimestamp(ts / 1e9) for ts, _, _ in rows]
+    # Sama dengan waktu lokal CsvBackend di kedua sisi perpindahan DST
+    assert list(df["timestamp"].dt.to_pydatetime()) == expected
+    assert np.allclose(df["ear"].to_numpy(), [ear for _, ear, _ in rows], atol=1e-6)
+    assert list(df["status"]) == [status for _, _, status in rows]
+
+    cutoff = datetime.fromtimestamp(START_S + 7200)   # setelah DST mulai
+    assert len(backend.read_since(cutoff)) == n - 7200
+
+    csv_path = tmp_path / "export.csv"
+    assert backend.export_csv(str(csv_path)) == n
+    with open(csv_path, newline="") as f:
+        exported = list(csv.DictReader(f))
+    assert [r["timestamp"] for r in exported[:3]] == [t.strftime(TIMESTAMP_FORMAT) for t in expected[:3]]
+    assert exported[-1]["timestamp"] == expected[-1].strftime(TIMESTAMP_FORMAT)
+
+    # Impor balik: epoch sama persis (presisi detik format CSV)
+    backend.close()
+    reimported = BinaryBackend(str(tmp_path / "reimport.bin"))
+    assert reimported.import_csv(str(csv_path)) == n
+    assert np.array_equal(reimported.records()["ts"], np.array([ts for ts, _, _ in rows]))
+    reimported.close()
+
+
+def test_reopen_keeps_records(tmp_path):
+    path = str(tmp_path / "log.bin")
+    backend = BinaryBackend(path)
+    backend.write_rows(_rows(5))
+    backend.close()
+
+    reopened = BinaryBackend(path)
+    assert reopened.count == 5
+    assert list(reopened.tail(2)["status"]) == ["Normal", "Mengantuk"]
@@ -0,0 +1,30 @@
+"""UiMailbox: event satu kali tidak boleh hilang walau Tk tertinggal"""
+from app.mailbox import UiMailbox
+
+
+def test_events_are_not_dropped_during_a_stall():
+    mailbox = UiMailbox(history=20)
+    # Jauh lebih banyak dari batas lama (32) tanpa take() di antaranya
+    for i in range(500):
+        mailbox.push_event("alert", i)
+    mailbox.push_event("components_ready", 1.5)
+
+    _, events, _, _ = mailbox.take()
+    assert len(events) == 501
+    assert [args[0] for _, args in events[:-1]] == list(range(500))
+    assert events[-1] == ("components_ready", (1.5,))
+    assert mailbox.take()[1] == []
+
+
+def test_state_overwrites_and_history_is_bounded():
+    mailbox = UiMailbox(history=3)
+    mailbox.post(ear=0.30, status="Normal")
+    mailbox.post(ear=0.15, status="Mengantuk")
+    for i in range(5):
+        mailbox.add_history(i)
+
+    state, _, rows, seq = mailbox.take()
+    assert state == {"ear": 0.15, "status": "Mengantuk"}
+    assert mailbox.overwritten == 2
+    assert rows == [2, 3, 4]
+    assert mailbox.take(since_seq=seq)[2] == []
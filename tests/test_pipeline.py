@@ -0,0 +1,35 @@
+"""CameraPipeline.stop melaporkan thread yang belum selesai"""
+import threading
+import time
+
+from app.pipeline import CameraPipeline
+
+
+class _Capture:
+    def read(self):
+        time.sleep(0.01)
+        return True, object()
+
+
+class _SlowDetector:
+    threshold = 0.21
+
+    def __init__(self):
+        self.entered = threading.Event()
+
+    def process_frame(self, frame):
+        self.entered.set()
+        time.sleep(1.0)
+        return frame, 0.3, "Normal"
+
+
+def test_stop_reports_inference_thread_still_running():
+    detector = _SlowDetector()
+    pipeline = CameraPipeline(_Capture(), detector)
+    pipeline.start()
+    assert detector.entered.wait(2.0)
+
+    # Inferensi masih di dalam process_frame: belum aman reset / close detector
+    assert pipeline.stop(timeout=0.1) is False
+    assert pipeline.stop(timeout=3.0) is True
+    assert not pipeline.is_running
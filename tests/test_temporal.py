@@ -0,0 +1,44 @@
+"""TemporalAnalyzer: keputusan kedipan / mata tertutup sama di 10 Hz dan 30 Hz"""
+import pytest
+
+from app.temporal import TemporalAnalyzer
+
+OPEN, CLOSED = 0.30, 0.10
+
+
+def _run(hz, closures, duration=4.0):
+    """Umpankan EAR sintetis; closures = [(mulai, lama)] dalam detik"""
+    analyzer = TemporalAnalyzer()
+    blinks, first_drowsy = [], None
+    for i in range(int(round(duration * hz))):
+        t = i / hz
+        closed = any(start <= t + 1e-9 < start + length for start, length in closures)
+        state = analyzer.update(CLOSED if closed else OPEN, t)
+        if state.blink is not None:
+            blinks.append(state.blink)
+        if state.drowsy and first_drowsy is None:
+            first_drowsy = state
+    return blinks, first_drowsy
+
+
+@pytest.mark.parametrize("hz", [10, 30])
+def test_long_closure_alerts_while_eyes_still_closed(hz):
+    blinks, drowsy = _run(hz, [(1.0, 0.2), (2.0, 0.6)])
+
+    assert len(blinks) == 2
+    assert blinks[0].duration == pytest.approx(0.2, abs=1e-6)
+    assert blinks[1].duration == pytest.approx(0.6, abs=1e-6)
+    # Peringatan muncul sebelum episode 0.6 detik berakhir, bukan setelahnya
+    assert drowsy is not None and drowsy.closed
+    assert drowsy.timestamp < blinks[1].end
+    assert drowsy.timestamp == pytest.approx(2.6, abs=1e-6)
+
+
+def test_same_decisions_at_10_and_30_hz():
+    closures = [(0.5, 0.2), (1.2, 0.4), (2.0, 0.6), (3.0, 0.3)]
+    slow_blinks, slow_drowsy = _run(10, closures)
+    fast_blinks, fast_drowsy = _run(30, closures)
+
+    assert [round(b.start, 3) for b in slow_blinks] == [round(b.start, 3) for b in fast_blinks]
+    assert [round(b.duration, 3) for b in slow_blinks] == [round(b.duration, 3) for b in fast_blinks]
+    assert slow_drowsy.timestamp == pytest.approx(fast_drowsy.timestamp, abs=1e-6)